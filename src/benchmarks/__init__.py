@@ -0,0 +1,3 @@
+"""
+Paquete de benchmarks de rendimiento y calidad.
+"""
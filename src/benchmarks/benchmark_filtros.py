@@ -0,0 +1,191 @@
+"""
+Benchmark de calidad y velocidad de los filtros de restauración.
+
+Recorre tipo/nivel de ruido × filtro × parámetros y reporta PSNR/SSIM junto
+con tiempo de pared, throughput (MP/s) y pico de memoria. Los resultados se
+guardan en JSON para compararlos contra una corrida de referencia.
+
+Uso:
+    python -m src.benchmarks.benchmark_filtros --salida filtros.json
+    python -m src.benchmarks.benchmark_filtros --referencia filtros.json
+"""
+
+import argparse
+import itertools
+import sys
+
+import cv2
+
+from src.benchmarks.medicion import (
+    imagen_sintetica, medir, guardar_resultados, cargar_resultados, comparar_resultados
+)
+from src.funciones import instrumentacion
+from src.funciones.funciones_procesamiento import (
+    filtro_promediador, filtro_promediador_pesado, filtro_mediana, filtro_gaussiano,
+    filtro_moda, filtro_minimo, filtro_maximo, filtro_bilateral,
+    barrido_configuraciones
+)
+from src.funciones.funciones_ruido import agregar_ruido_sal_pimienta, agregar_ruido_gaussiano
+from src.funciones.metricas_calidad import psnr, ssim
+
+
+# Filtro -> (función, rejilla de parámetros)
+FILTROS = {
+    'promediador': (filtro_promediador, {'kernel_size': [3, 5, 7]}),
+    'promediador_pesado': (filtro_promediador_pesado, {'n': [5, 9, 12]}),
+    'mediana': (filtro_mediana, {'kernel_size': [3, 5, 7]}),
+    'gaussiano': (filtro_gaussiano, {'kernel_size': [3, 5, 7], 'sigma': [0.8, 1.5]}),
+    'moda': (filtro_moda, {'kernel_size': [3, 5]}),
+    'minimo': (filtro_minimo, {'kernel_size': [3, 5]}),
+    'maximo': (filtro_maximo, {'kernel_size': [3, 5]}),
+    'bilateral': (filtro_bilateral, {'d': [5, 9], 'sigma_color': [50, 75], 'sigma_space': [75]}),
+}
+
+# Métrica -> (sentido, tolerancia) usada al comparar contra la referencia
+TOLERANCIAS = {
+    'tiempo_ms': ('menor', 0.25),
+    'psnr': ('mayor', 0.05),
+    'ssim': ('mayor', 0.002),
+}
+
+
+def _combinaciones(rejilla):
+    """Expande una rejilla {parámetro: valores} en diccionarios individuales."""
+    nombres = list(rejilla)
+    for valores in itertools.product(*(rejilla[n] for n in nombres)):
+        yield dict(zip(nombres, valores))
+
+
+def _contaminar(imagen, configuracion, semilla):
+    """Aplica una configuración de ruido de barrido_configuraciones."""
+    parametros = {k: v for k, v in configuracion.items() if k != 'tipo'}
+    if configuracion['tipo'] == 'sal_pimienta':
+        return agregar_ruido_sal_pimienta(imagen, semilla=semilla, **parametros)
+    return agregar_ruido_gaussiano(imagen, semilla=semilla, **parametros)
+
+
+def _nivel(configuracion):
+    """Retorna el parámetro que identifica el nivel de ruido."""
+    return configuracion.get('cantidad', configuracion.get('sigma'))
+
+
+def clave_resultado(resultado):
+    """Identificador de un caso del benchmark para comparar corridas."""
+    return (resultado['ruido'], resultado['nivel'], resultado['filtro'],
+            tuple(sorted(resultado['parametros'].items())))
+
+
+def ejecutar_benchmark(imagen, configuraciones=None, filtros=None, repeticiones=3, memoria=True, semilla=0):
+    """
+    Ejecuta el barrido ruido × filtro × parámetros.
+
+    Args:
+        imagen: Imagen limpia de referencia
+        configuraciones: Configuraciones de ruido (ver barrido_configuraciones)
+        filtros: Nombres de filtros a evaluar (None evalúa todos)
+        repeticiones: Ejecuciones cronometradas por caso
+        memoria: Si medir el pico de memoria con tracemalloc
+        semilla: Semilla del ruido
+
+    Returns:
+        Lista de diccionarios con un resultado por caso
+    """
+    if configuraciones is None:
+        configuraciones = barrido_configuraciones()
+    filtros = list(FILTROS) if filtros is None else filtros
+    megapixeles = imagen.shape[0] * imagen.shape[1] / 1e6
+
+    resultados = []
+    for configuracion in configuraciones:
+        ruidosa = _contaminar(imagen, configuracion, semilla)
+        psnr_ruidosa = psnr(imagen, ruidosa)
+
+        for nombre in filtros:
+            funcion, rejilla = FILTROS[nombre]
+            for parametros in _combinaciones(rejilla):
+                restaurada, tiempo, pico = medir(funcion, ruidosa, repeticiones=repeticiones,
+                                                 memoria=memoria, **parametros)
+                resultados.append({
+                    'ruido': configuracion['tipo'],
+                    'nivel': _nivel(configuracion),
+                    'filtro': nombre,
+                    'parametros': parametros,
+                    'psnr_ruidosa': psnr_ruidosa,
+                    'psnr': psnr(imagen, restaurada),
+                    'ssim': ssim(imagen, restaurada),
+                    'tiempo_ms': tiempo * 1000,
+                    'mp_s': megapixeles / tiempo if tiempo > 0 else float('inf'),
+                    'pico_mb': pico / 2**20 if pico is not None else None,
+                })
+    return resultados
+
+
+def mejores_por_ruido(resultados):
+    """Retorna el caso con mayor PSNR para cada tipo y nivel de ruido."""
+    mejores = {}
+    for resultado in resultados:
+        clave = (resultado['ruido'], resultado['nivel'])
+        if clave not in mejores or resultado['psnr'] > mejores[clave]['psnr']:
+            mejores[clave] = resultado
+    return list(mejores.values())
+
+
+def imprimir_tabla(resultados):
+    """Imprime los resultados en formato de tabla."""
+    print(f"{'ruido':<13}{'nivel':>7}  {'filtro':<19}{'parámetros':<40}"
+          f"{'PSNR':>7}{'SSIM':>7}{'ms':>9}{'MP/s':>9}{'MB':>8}")
+    for r in resultados:
+        parametros = ", ".join(f"{k}={v}" for k, v in r['parametros'].items())
+        pico = f"{r['pico_mb']:8.2f}" if r['pico_mb'] is not None else f"{'-':>8}"
+        print(f"{r['ruido']:<13}{r['nivel']:>7}  {r['filtro']:<19}{parametros:<40}"
+              f"{r['psnr']:7.2f}{r['ssim']:7.3f}{r['tiempo_ms']:9.2f}{r['mp_s']:9.1f}{pico}")
+
+
+def main(argv=None):
+    """Punto de entrada de línea de comandos."""
+    parser = argparse.ArgumentParser(description="Benchmark de filtros sobre niveles de ruido")
+    parser.add_argument('--imagen', help="Imagen de referencia (por defecto una sintética)")
+    parser.add_argument('--tamano', type=int, nargs=2, default=(512, 512), metavar=('ALTO', 'ANCHO'),
+                        help="Tamaño de la imagen sintética")
+    parser.add_argument('--filtros', nargs='+', choices=list(FILTROS), help="Filtros a evaluar")
+    parser.add_argument('--repeticiones', type=int, default=3)
+    parser.add_argument('--sin-memoria', action='store_true', help="No medir el pico de memoria")
+    parser.add_argument('--salida', help="Archivo JSON donde guardar los resultados")
+    parser.add_argument('--referencia', help="Archivo JSON de una corrida anterior para comparar")
+    parser.add_argument('--traza', help="Archivo JSON donde exportar la traza de Chrome de las operaciones")
+    args = parser.parse_args(argv)
+
+    if args.imagen:
+        imagen = cv2.imread(args.imagen)
+        if imagen is None:
+            parser.error(f"No se pudo cargar la imagen: {args.imagen}")
+    else:
+        imagen = imagen_sintetica(*args.tamano)
+
+    if args.traza:
+        instrumentacion.activar()
+    resultados = ejecutar_benchmark(imagen, filtros=args.filtros, repeticiones=args.repeticiones,
+                                    memoria=not args.sin_memoria)
+    if args.traza:
+        instrumentacion.desactivar()
+        instrumentacion.exportar_traza_chrome(args.traza)
+        print(f"Traza guardada en {args.traza}")
+    imprimir_tabla(resultados)
+
+    print("\nMejor filtro por tipo y nivel de ruido:")
+    imprimir_tabla(mejores_por_ruido(resultados))
+
+    if args.salida:
+        guardar_resultados(resultados, args.salida)
+
+    if args.referencia:
+        regresiones = comparar_resultados(resultados, cargar_resultados(args.referencia),
+                                          clave_resultado, TOLERANCIAS)
+        for r in regresiones:
+            print(f"REGRESIÓN {r['caso']}: {r['metrica']} {r['referencia']:.3f} -> {r['actual']:.3f}")
+        return 1 if regresiones else 0
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,338 @@
+"""
+Micro-benchmarks de cada función exportada por funciones_procesamiento.
+
+Cada caso se ejecuta para varios tamaños de imagen, tipos de dato y número de
+canales. Los resultados pueden guardarse como línea base y las corridas
+posteriores se comparan contra ella con un umbral de regresión.
+
+Uso:
+    python -m src.benchmarks.benchmark_procesamiento --tamanos 0.16MP 2MP
+    python -m src.benchmarks.benchmark_procesamiento --guardar-linea-base
+    python -m src.benchmarks.benchmark_procesamiento --comparar --umbral 0.15
+    python -m src.benchmarks.benchmark_procesamiento --funciones entropia_kapur
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import cv2
+import numpy as np
+
+from src.benchmarks.medicion import (
+    imagen_sintetica, medir, guardar_resultados, cargar_resultados, comparar_resultados
+)
+from src.funciones import funciones_procesamiento as fp
+from src.funciones import instrumentacion
+
+
+# Nombre -> (alto, ancho)
+TAMANOS = {
+    '0.16MP': (400, 400),
+    '2MP': (1224, 1632),
+    '12MP': (3000, 4000),
+    '50MP': (6124, 8164),
+}
+
+LINEA_BASE_DEFAULT = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'linea_base_procesamiento.json')
+
+# Tiempo mínimo acumulado por caso al decidir cuántas repeticiones hacer
+TIEMPO_OBJETIVO_S = 0.2
+MAXIMO_REPETICIONES = 20
+
+
+class Caso:
+    """Describe cómo invocar una función del benchmark."""
+
+    def __init__(self, llamada, entrada='imagen', flotante=False):
+        """
+        Args:
+            llamada: Función que recibe las entradas preparadas y ejecuta la operación
+            entrada: 'imagen' (respeta canales y tipo), 'gris', 'binaria',
+                'etiquetas' o 'histograma'
+            flotante: Si la función admite imágenes float32
+        """
+        self.llamada = llamada
+        self.entrada = entrada
+        self.flotante = flotante
+
+
+_KERNEL_GRANDE = np.ones((15, 15), np.float32) / 225
+_CENTROS_GRIS = np.linspace(16, 240, 8, dtype=np.float32)[:, None]
+
+CASOS = {
+    'ImagenMultiVersion': Caso(lambda e: fp.ImagenMultiVersion(e['imagen'])),
+    'operacion_escalar': Caso(lambda e: fp.operacion_escalar(e['imagen'], 40, 'suma'), flotante=True),
+    'operacion_entre_imagenes': Caso(lambda e: fp.operacion_entre_imagenes(e['imagen'], e['imagen2'], 'multiplicacion'),
+                                     flotante=True),
+    'operacion_logica': Caso(lambda e: fp.operacion_logica(e['imagen'], e['imagen2'], 'XOR')),
+    'etiquetar_componentes': Caso(lambda e: fp.etiquetar_componentes(e['binaria']), 'binaria'),
+    'etiquetar_componentes_paralelo': Caso(lambda e: fp.etiquetar_componentes_paralelo(e['binaria'], 8, 4), 'binaria'),
+    'extraer_componente_mas_grande': Caso(lambda e: fp.extraer_componente_mas_grande(e['etiquetas']), 'etiquetas'),
+    'colorear_etiquetas': Caso(lambda e: fp.colorear_etiquetas(e['etiquetas']), 'etiquetas'),
+    'comparar_segmentaciones': Caso(lambda e: fp.comparar_segmentaciones(e['binaria'], e['etiquetas']), 'etiquetas'),
+    'fronteras_etiquetas': Caso(lambda e: fp.fronteras_etiquetas(e['etiquetas']), 'etiquetas'),
+    'dibujar_regiones_numeradas': Caso(lambda e: fp.dibujar_regiones_numeradas(e['etiquetas']), 'etiquetas'),
+    'tabla_componentes': Caso(lambda e: fp.tabla_componentes(e['etiquetas']), 'etiquetas'),
+    'estadisticas_por_bandas': Caso(lambda e: fp.estadisticas_por_bandas(e['binaria'], 256), 'binaria'),
+    'ArbolComponentes': Caso(lambda e: fp.ArbolComponentes(e['gris']).etiquetas(127), 'gris'),
+    'ComponentesRLE': Caso(lambda e: fp.ComponentesRLE.desde_etiquetas(e['etiquetas']).areas(), 'etiquetas'),
+    'compactar_etiquetas': Caso(lambda e: fp.compactar_etiquetas(e['etiquetas']), 'etiquetas'),
+    'SecuenciaMorfologica': Caso(lambda e: fp.SecuenciaMorfologica([('cerrar', 'elipse', 3), ('abrir', 'elipse', 3)])
+                                 .aplicar(e['binaria']), 'binaria'),
+    'aplicar_secuencia_morfologica': Caso(lambda e: fp.aplicar_secuencia_morfologica(e['gris'], [('abrir', 'elipse', 31)]),
+                                          'gris'),
+    'reconstruccion_dilatacion': Caso(lambda e: fp.reconstruccion_dilatacion(cv2.subtract(e['gris'], 40), e['gris']),
+                                      'gris'),
+    'reconstruccion_erosion': Caso(lambda e: fp.reconstruccion_erosion(cv2.add(e['gris'], 40), e['gris']), 'gris'),
+    'rellenar_huecos': Caso(lambda e: fp.rellenar_huecos(e['binaria']), 'binaria'),
+    'eliminar_borde': Caso(lambda e: fp.eliminar_borde(e['binaria']), 'binaria'),
+    'maximos_regionales': Caso(lambda e: fp.maximos_regionales(e['gris']), 'gris'),
+    'separar_objetos_tocando': Caso(lambda e: fp.separar_objetos_tocando(e['binaria']), 'binaria'),
+    'descriptores_componentes': Caso(lambda e: fp.descriptores_componentes(e['etiquetas'], e['gris']), 'etiquetas'),
+    'matriz_descriptores': Caso(lambda e: fp.matriz_descriptores(fp.descriptores_componentes(e['etiquetas'])),
+                                'etiquetas'),
+    'IndiceEspacial': Caso(lambda e: fp.IndiceEspacial.desde_estadisticas(
+        fp.ComponentesRLE.desde_etiquetas(e['etiquetas']).cajas()).pares_cercanos(2), 'etiquetas'),
+    'agregar_ruido_sal_pimienta': Caso(lambda e: fp.agregar_ruido_sal_pimienta(e['imagen'], 0.05, semilla=0)),
+    'agregar_ruido_gaussiano': Caso(lambda e: fp.agregar_ruido_gaussiano(e['imagen'], 0, 20, semilla=0),
+                                    flotante=True),
+    'agregar_ruido_lote': Caso(lambda e: fp.agregar_ruido_lote([e['imagen']] * 4, semilla=0)),
+    'generadores_independientes': Caso(lambda e: fp.generadores_independientes(0, 64)),
+    'barrido_configuraciones': Caso(lambda e: fp.barrido_configuraciones()),
+    'generar_pares_ruido': Caso(lambda e: list(fp.generar_pares_ruido([e['imagen']], semilla=0))),
+    'filtro_promediador': Caso(lambda e: fp.filtro_promediador(e['imagen'], 5), flotante=True),
+    'filtro_promediador_pesado': Caso(lambda e: fp.filtro_promediador_pesado(e['imagen'], 5), flotante=True),
+    'filtro_mediana': Caso(lambda e: fp.filtro_mediana(e['imagen'], 5), flotante=True),
+    'filtro_gaussiano': Caso(lambda e: fp.filtro_gaussiano(e['imagen'], 5, 1.0), flotante=True),
+    'filtro_moda': Caso(lambda e: fp.filtro_moda(e['imagen'], 5), flotante=True),
+    'filtro_minimo': Caso(lambda e: fp.filtro_minimo(e['imagen'], 5), flotante=True),
+    'filtro_maximo': Caso(lambda e: fp.filtro_maximo(e['imagen'], 5), flotante=True),
+    'filtro_bilateral': Caso(lambda e: fp.filtro_bilateral(e['imagen'], 9, 75, 75), flotante=True),
+    'convolucion': Caso(lambda e: fp.convolucion(e['imagen'], _KERNEL_GRANDE), flotante=True),
+    'convolucion_lote': Caso(lambda e: fp.convolucion_lote([e['imagen']] * 4, _KERNEL_GRANDE), flotante=True),
+    'elegir_metodo_convolucion': Caso(lambda e: fp.elegir_metodo_convolucion(_KERNEL_GRANDE)),
+    'psnr': Caso(lambda e: fp.psnr(e['imagen'], e['imagen2']), flotante=True),
+    'ssim': Caso(lambda e: fp.ssim(e['imagen'], e['imagen2']), flotante=True),
+    'umbral_fijo': Caso(lambda e: fp.umbral_fijo(e['imagen'], 127)),
+    'umbral_adaptativo': Caso(lambda e: fp.umbral_adaptativo(e['imagen'], 11, 2)),
+    'umbral_local': Caso(lambda e: fp.umbral_local(e['gris'], 'sauvola', 51), 'gris'),
+    'ImagenIntegral': Caso(lambda e: fp.ImagenIntegral(e['gris'], 25).media_desviacion(51), 'gris'),
+    'BarridoUmbral': Caso(lambda e: fp.BarridoUmbral(e['gris']).separabilidad(), 'gris'),
+    'ecualizacion_uniforme': Caso(lambda e: fp.ecualizacion_uniforme(e['imagen'])),
+    'ecualizacion_exponencial': Caso(lambda e: fp.ecualizacion_exponencial(e['imagen'])),
+    'ecualizacion_rayleigh': Caso(lambda e: fp.ecualizacion_rayleigh(e['imagen'])),
+    'ecualizacion_hipercubica': Caso(lambda e: fp.ecualizacion_hipercubica(e['imagen'])),
+    'ecualizacion_logaritmica_hiperbolica': Caso(lambda e: fp.ecualizacion_logaritmica_hiperbolica(e['imagen'])),
+    'funcion_potencia': Caso(lambda e: fp.funcion_potencia(e['imagen'], 2)),
+    'correccion_gamma': Caso(lambda e: fp.correccion_gamma(e['imagen'], 0.5)),
+    'ecualizacion_adaptativa': Caso(lambda e: fp.ecualizacion_adaptativa(e['imagen'], 2.0)),
+    'EcualizacionAdaptativa': Caso(lambda e: [fp.EcualizacionAdaptativa(e['gris']).aplicar(limite)
+                                              for limite in (1.0, 2.0, 4.0)], 'gris'),
+    'segmentacion_otsu': Caso(lambda e: fp.segmentacion_otsu(e['imagen'])),
+    'entropia_kapur': Caso(lambda e: fp.entropia_kapur(e['histograma'], e['total']), 'histograma'),
+    'segmentacion_kapur': Caso(lambda e: fp.segmentacion_kapur(e['imagen'])),
+    'segmentacion_minimo_histograma': Caso(lambda e: fp.segmentacion_minimo_histograma(e['imagen'])),
+    'segmentacion_media': Caso(lambda e: fp.segmentacion_media(e['imagen'])),
+    'segmentacion_multiples_umbrales': Caso(lambda e: fp.segmentacion_multiples_umbrales(e['imagen'], 80, 160)),
+    'segmentacion_umbral_banda': Caso(lambda e: fp.segmentacion_umbral_banda(e['imagen'], 80, 160)),
+    'umbrales_otsu_multinivel': Caso(lambda e: fp.umbrales_otsu_multinivel(e['histograma'], 3), 'histograma'),
+    'histograma_gris': Caso(lambda e: fp.histograma_gris(e['gris']), 'gris'),
+    'suavizar_histograma': Caso(lambda e: fp.suavizar_histograma(e['histograma'], 2), 'histograma'),
+    'encontrar_picos': Caso(lambda e: fp.encontrar_picos(fp.suavizar_histograma(e['histograma'], 2)), 'histograma'),
+    'umbral_otsu_histograma': Caso(lambda e: fp.umbral_otsu_histograma(e['histograma']), 'histograma'),
+    'umbral_minimo_histograma': Caso(lambda e: fp.umbral_minimo_histograma(e['histograma']), 'histograma'),
+    'segmentacion_otsu_multinivel': Caso(lambda e: fp.segmentacion_otsu_multinivel(e['imagen'], 3)),
+    'convertir_espacio': Caso(lambda e: fp.convertir_espacio(e['imagen'], 'lab')),
+    'umbral_por_canal': Caso(lambda e: fp.umbral_por_canal(e['imagen'], (80, 120, 160))),
+    'segmentacion_rango_color': Caso(lambda e: fp.segmentacion_rango_color(e['imagen'], (170, 50, 50), (10, 255, 255))),
+    'segmentacion_distancia_color': Caso(lambda e: fp.segmentacion_distancia_color(e['imagen'], (30, 120, 200), 40)),
+    'asignar_centros': Caso(lambda e: fp.asignar_centros(e['gris'].reshape(-1, 1), _CENTROS_GRIS), 'gris'),
+    'kmeans_mini_lote': Caso(lambda e: fp.kmeans_mini_lote(e['gris'].reshape(-1, 1), 8), 'gris'),
+    'segmentacion_kmeans': Caso(lambda e: fp.segmentacion_kmeans(e['imagen'], 4)),
+    'cuantizacion_color_kmeans': Caso(lambda e: fp.cuantizacion_color_kmeans(e['imagen'], 8)),
+    'segmentacion_mean_shift': Caso(lambda e: fp.segmentacion_mean_shift(e['imagen'], 32)),
+    'cuantizacion_color_mean_shift': Caso(lambda e: fp.cuantizacion_color_mean_shift(e['imagen'], 32)),
+    'mascara_clusters': Caso(lambda e: fp.mascara_clusters(e['etiquetas'], [1, 2, 3]), 'etiquetas'),
+    'regiones_clusters': Caso(lambda e: fp.regiones_clusters(e['gris'] // 64), 'gris'),
+}
+
+# Funciones exportadas que no se miden, con el motivo
+EXCLUIDAS = {
+    'limpiar_cache_espectros': "no procesa imágenes",
+    'dtype_etiquetas': "no procesa imágenes",
+    'descomponer_elemento': "no procesa imágenes",
+    'elemento_estructurante': "no procesa imágenes",
+    'escribir_dataset_fragmentado': "dominada por E/S de disco",
+    'exportar_tabla_componentes': "dominada por E/S de disco",
+    'leer_dataset_fragmentado': "dominada por E/S de disco",
+    'activar_instrumentacion': "instrumentación",
+    'desactivar_instrumentacion': "instrumentación",
+    'instrumentar': "instrumentación",
+    'medir_operacion': "instrumentación",
+    'obtener_registros': "instrumentación",
+    'limpiar_registros': "instrumentación",
+    'resumen_registros': "instrumentación",
+    'exportar_traza_chrome': "instrumentación",
+}
+
+
+def funciones_sin_caso():
+    """Retorna las funciones exportadas que no tienen caso ni exclusión."""
+    return [nombre for nombre in fp.__all__ if nombre not in CASOS and nombre not in EXCLUIDAS]
+
+
+def preparar_entradas(tamano, dtype, canales):
+    """
+    Construye las entradas compartidas por todos los casos de una configuración.
+
+    Args:
+        tamano: Clave de TAMANOS
+        dtype: 'uint8' o 'float32'
+        canales: 1 o 3
+
+    Returns:
+        Diccionario de entradas
+    """
+    alto, ancho = TAMANOS[tamano]
+    imagen = imagen_sintetica(alto, ancho, canales, semilla=0)
+    imagen2 = imagen_sintetica(alto, ancho, canales, semilla=1)
+    gris = imagen if canales == 1 else cv2.cvtColor(imagen, cv2.COLOR_BGR2GRAY)
+    _, binaria = cv2.threshold(gris, 127, 255, cv2.THRESH_BINARY)
+    _, etiquetas = cv2.connectedComponents(binaria)
+    histograma = np.bincount(gris.ravel(), minlength=256)
+
+    if dtype == 'float32':
+        imagen = imagen.astype(np.float32)
+        imagen2 = imagen2.astype(np.float32)
+
+    return {
+        'imagen': imagen,
+        'imagen2': imagen2,
+        'gris': gris,
+        'binaria': binaria,
+        'etiquetas': etiquetas,
+        'histograma': histograma,
+        'total': gris.size,
+    }
+
+
+def _cronometrar(caso, entradas, memoria):
+    """Calibra las repeticiones para acercarse a TIEMPO_OBJETIVO_S y mide."""
+    inicio = time.perf_counter()
+    caso.llamada(entradas)
+    primera = time.perf_counter() - inicio
+    repeticiones = int(min(MAXIMO_REPETICIONES, max(1, TIEMPO_OBJETIVO_S // max(primera, 1e-6))))
+    _, tiempo, pico = medir(caso.llamada, entradas, repeticiones=repeticiones, memoria=memoria)
+    return min(tiempo, primera), repeticiones, pico
+
+
+def ejecutar_suite(funciones=None, tamanos=('0.16MP', '2MP'), dtypes=('uint8',), canales=(1, 3), memoria=False):
+    """
+    Ejecuta los micro-benchmarks seleccionados.
+
+    Las funciones que solo dependen de la imagen binaria, las etiquetas o el
+    histograma se miden una vez por tamaño, sin repetirlas por tipo y canales.
+
+    Args:
+        funciones: Nombres de funciones (None ejecuta todos los casos)
+        tamanos: Claves de TAMANOS
+        dtypes: Tipos de dato ('uint8', 'float32')
+        canales: Número de canales (1, 3)
+        memoria: Si medir el pico de memoria con tracemalloc
+
+    Returns:
+        Lista de diccionarios con un resultado por caso
+    """
+    nombres = list(CASOS) if funciones is None else funciones
+    resultados = []
+    for tamano in tamanos:
+        megapixeles = TAMANOS[tamano][0] * TAMANOS[tamano][1] / 1e6
+        for dtype in dtypes:
+            for num_canales in canales:
+                entradas = preparar_entradas(tamano, dtype, num_canales)
+                for nombre in nombres:
+                    caso = CASOS[nombre]
+                    if dtype == 'float32' and not caso.flotante:
+                        continue
+                    depende_de_imagen = caso.entrada == 'imagen'
+                    if not depende_de_imagen and (dtype, num_canales) != (dtypes[0], canales[0]):
+                        continue
+
+                    try:
+                        tiempo, repeticiones, pico = _cronometrar(caso, entradas, memoria)
+                    except Exception as e:
+                        print(f"{nombre:<38}{tamano:>8}  ERROR: {e}", flush=True)
+                        continue
+                    resultados.append({
+                        'funcion': nombre,
+                        'tamano': tamano,
+                        'dtype': dtype if depende_de_imagen else '-',
+                        'canales': num_canales if depende_de_imagen else '-',
+                        'tiempo_ms': tiempo * 1000,
+                        'mp_s': megapixeles / tiempo if tiempo > 0 else float('inf'),
+                        'repeticiones': repeticiones,
+                        'pico_mb': pico / 2**20 if pico is not None else None,
+                    })
+                    print(f"{nombre:<38}{tamano:>8}{resultados[-1]['dtype']:>9}"
+                          f"{str(resultados[-1]['canales']):>4}{tiempo * 1000:12.3f} ms", flush=True)
+    return resultados
+
+
+def clave_resultado(resultado):
+    """Identificador de un caso del benchmark para comparar corridas."""
+    return (resultado['funcion'], resultado['tamano'], resultado['dtype'], str(resultado['canales']))
+
+
+def main(argv=None):
+    """Punto de entrada de línea de comandos."""
+    parser = argparse.ArgumentParser(description="Micro-benchmarks de funciones_procesamiento")
+    parser.add_argument('--funciones', nargs='+', choices=list(CASOS), help="Funciones a medir")
+    parser.add_argument('--tamanos', nargs='+', choices=list(TAMANOS), default=['0.16MP', '2MP'])
+    parser.add_argument('--dtypes', nargs='+', choices=['uint8', 'float32'], default=['uint8'])
+    parser.add_argument('--canales', nargs='+', type=int, choices=[1, 3], default=[1, 3])
+    parser.add_argument('--memoria', action='store_true', help="Medir el pico de memoria")
+    parser.add_argument('--linea-base', default=LINEA_BASE_DEFAULT, help="Archivo JSON de línea base")
+    parser.add_argument('--guardar-linea-base', action='store_true', help="Guardar la corrida como línea base")
+    parser.add_argument('--comparar', action='store_true', help="Comparar contra la línea base")
+    parser.add_argument('--umbral', type=float, default=0.15,
+                        help="Aumento relativo de tiempo considerado regresión")
+    parser.add_argument('--salida', help="Archivo JSON donde guardar los resultados")
+    parser.add_argument('--traza', help="Archivo JSON donde exportar la traza de Chrome de las operaciones")
+    args = parser.parse_args(argv)
+    if args.comparar and not args.guardar_linea_base and not os.path.exists(args.linea_base):
+        # La línea base depende de la máquina: no se distribuye con el repositorio
+        print(f"No existe la línea base {args.linea_base}. Ejecute primero con "
+              f"--guardar-linea-base en esta máquina.", file=sys.stderr)
+        return 2
+
+    faltantes = funciones_sin_caso()
+    if faltantes:
+        print(f"Aviso: funciones exportadas sin caso de benchmark: {', '.join(faltantes)}")
+
+    if args.traza:
+        instrumentacion.activar()
+    resultados = ejecutar_suite(args.funciones, args.tamanos, args.dtypes, args.canales, args.memoria)
+    if args.traza:
+        instrumentacion.desactivar()
+        instrumentacion.exportar_traza_chrome(args.traza)
+        print(f"Traza guardada en {args.traza}")
+
+    if args.salida:
+        guardar_resultados(resultados, args.salida)
+    if args.guardar_linea_base:
+        guardar_resultados(resultados, args.linea_base)
+        print(f"Línea base guardada en {args.linea_base}")
+
+    if args.comparar:
+        regresiones = comparar_resultados(resultados, cargar_resultados(args.linea_base),
+                                          clave_resultado, {'tiempo_ms': ('menor', args.umbral)})
+        for r in regresiones:
+            print(f"REGRESIÓN {r['caso']}: {r['referencia']:.3f} ms -> {r['actual']:.3f} ms")
+        return 1 if regresiones else 0
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,145 @@
+"""
+Utilidades comunes para los benchmarks: medición, imágenes sintéticas y
+persistencia de resultados para comparar entre versiones.
+"""
+
+import json
+import platform
+import time
+import tracemalloc
+
+import cv2
+import numpy as np
+
+import src
+
+
+def imagen_sintetica(alto, ancho, canales=3, semilla=0):
+    """
+    Genera una imagen de prueba con gradientes, figuras y textura.
+
+    Args:
+        alto: Alto en píxeles
+        ancho: Ancho en píxeles
+        canales: 1 o 3
+        semilla: Semilla de la textura
+
+    Returns:
+        Imagen uint8
+    """
+    rng = np.random.default_rng(semilla)
+    y, x = np.mgrid[0:alto, 0:ancho].astype(np.float32)
+    base = 127 + 60 * np.sin(x / max(ancho, 1) * 6) * np.cos(y / max(alto, 1) * 4)
+    imagen = np.clip(base, 0, 255).astype(np.uint8)
+
+    # Figuras sólidas para que existan bordes y componentes
+    lado = min(alto, ancho)
+    for _ in range(12):
+        centro = (int(rng.integers(0, ancho)), int(rng.integers(0, alto)))
+        radio = int(rng.integers(max(lado // 40, 1), max(lado // 8, 2)))
+        cv2.circle(imagen, centro, radio, int(rng.integers(0, 256)), -1)
+
+    if canales == 3:
+        imagen = cv2.merge([imagen, cv2.flip(imagen, 1), cv2.flip(imagen, 0)])
+    return imagen
+
+
+def medir(funcion, *args, repeticiones=3, memoria=True, **kwargs):
+    """
+    Mide tiempo de pared y pico de memoria de una llamada.
+
+    El tiempo es el mínimo de las repeticiones; la memoria se mide en una
+    ejecución adicional con tracemalloc para no afectar los tiempos.
+
+    Args:
+        funcion: Función a medir
+        *args: Argumentos posicionales de la función
+        repeticiones: Número de ejecuciones cronometradas
+        memoria: Si medir el pico de memoria
+        **kwargs: Argumentos con nombre de la función
+
+    Returns:
+        Tupla (resultado, tiempo_s, pico_bytes)
+    """
+    tiempos = []
+    resultado = None
+    for _ in range(max(repeticiones, 1)):
+        inicio = time.perf_counter()
+        resultado = funcion(*args, **kwargs)
+        tiempos.append(time.perf_counter() - inicio)
+
+    pico = None
+    if memoria:
+        tracemalloc.start()
+        try:
+            funcion(*args, **kwargs)
+            _, pico = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+    return resultado, min(tiempos), pico
+
+
+def entorno():
+    """Retorna la información del entorno que acompaña a cada resultado."""
+    return {
+        'version': src.__version__,
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'opencv': cv2.__version__,
+        'plataforma': platform.platform(),
+        'fecha': time.strftime('%Y-%m-%d %H:%M:%S'),
+    }
+
+
+def guardar_resultados(resultados, ruta):
+    """Guarda los resultados y el entorno en un archivo JSON."""
+    with open(ruta, 'w', encoding='utf-8') as archivo:
+        json.dump({'entorno': entorno(), 'resultados': resultados}, archivo,
+                  ensure_ascii=False, indent=2)
+
+
+def cargar_resultados(ruta):
+    """Carga la lista de resultados de un archivo JSON."""
+    with open(ruta, encoding='utf-8') as archivo:
+        return json.load(archivo)['resultados']
+
+
+def comparar_resultados(actuales, referencia, clave, metricas):
+    """
+    Compara dos corridas y reporta las regresiones.
+
+    Args:
+        actuales: Lista de resultados de la corrida actual
+        referencia: Lista de resultados de la corrida de referencia
+        clave: Función que obtiene el identificador de un resultado
+        metricas: Diccionario {métrica: (sentido, tolerancia)}. El sentido es
+            'menor' si valores más bajos son mejores (tiempo) o 'mayor' si
+            valores más altos son mejores (PSNR). La tolerancia es relativa
+            para 'menor' y absoluta para 'mayor'.
+
+    Returns:
+        Lista de diccionarios con las regresiones encontradas
+    """
+    base = {clave(r): r for r in referencia}
+    regresiones = []
+    for resultado in actuales:
+        anterior = base.get(clave(resultado))
+        if anterior is None:
+            continue
+        for metrica, (sentido, tolerancia) in metricas.items():
+            nuevo, viejo = resultado.get(metrica), anterior.get(metrica)
+            if nuevo is None or viejo is None:
+                continue
+            if sentido == 'menor':
+                empeora = nuevo > viejo * (1 + tolerancia)
+            else:
+                empeora = nuevo < viejo - tolerancia
+            if empeora:
+                regresiones.append({
+                    'caso': clave(resultado),
+                    'metrica': metrica,
+                    'referencia': viejo,
+                    'actual': nuevo,
+                })
+    return regresiones
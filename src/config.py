@@ -24,8 +24,51 @@ FILTRO_BILATERAL_SIGMA_COLOR = 75
 FILTRO_BILATERAL_SIGMA_SPACE = 75
 FILTRO_GAUSSIANO_SIGMA = 1.0
 
+# Umbral adaptativo (nombre visible -> método de umbral_local)
+METODOS_UMBRAL_ADAPTATIVO = {
+    "Gaussiano": 'gaussiano',
+    "Media": 'media',
+    "Sauvola": 'sauvola',
+    "Niblack": 'niblack',
+    "Wolf": 'wolf',
+}
+
+# Ecualización adaptativa (CLAHE)
+CLAHE_LIMITE_DEFAULT = 2.0
+CLAHE_REJILLA_DEFAULT = 8
+
+# Segmentación en color (nombre visible -> espacio de segmentacion_color)
+ESPACIOS_SEGMENTACION_COLOR = {
+    "HSV": 'hsv',
+    "Lab": 'lab',
+    "BGR": 'bgr',
+}
+# Valor máximo de cada canal por espacio (el tono HSV de OpenCV llega a 179)
+MAXIMOS_CANALES_COLOR = {
+    'hsv': (179, 255, 255),
+    'lab': (255, 255, 255),
+    'bgr': (255, 255, 255),
+}
+KMEANS_COLORES_DEFAULT = 8
+MEAN_SHIFT_ANCHO_BANDA_DEFAULT = 32
+
 # Conectividad para componentes conexas
 CONECTIVIDAD_DEFAULT = 8
+# Separación máxima (px) entre cajas para resaltar vecinos al seleccionar una componente
+DISTANCIA_VECINOS_DEFAULT = 10
+
+# Preprocesamiento morfológico de componentes (nombre -> operaciones en orden)
+MORFOLOGIA_KERNEL_DEFAULT = 3
+SECUENCIAS_PREPROCESADO = {
+    "Cierre + Apertura": ('cerrar', 'abrir'),
+    "Apertura + Cierre": ('abrir', 'cerrar'),
+    "Apertura": ('abrir',),
+    "Cierre": ('cerrar',),
+}
+
+# Instrumentación de operaciones (tiempo por operación en la barra inferior)
+INSTRUMENTACION_ACTIVA = True
+INSTRUMENTACION_MEMORIA = False  # Pico de memoria con tracemalloc (más lento)
 
 # Colores de interfaz - Paleta Moderna Premium
 COLOR_FONDO = "#0A0E27"  # Azul oscuro profundo
@@ -0,0 +1,180 @@
+"""
+Análisis de histogramas de 256 niveles en NumPy.
+
+Suavizado gaussiano, detección de picos con su prominencia y búsqueda de
+valles sobre arreglos pequeños, sin depender de SciPy. El histograma se
+calcula una vez (np.bincount) y puede pasarse a todas las funciones.
+"""
+
+from functools import lru_cache
+
+import numpy as np
+
+from .instrumentacion import instrumentar
+
+
+def histograma_gris(imagen):
+    """
+    Histograma de 256 niveles de una imagen uint8 en grises.
+
+    Args:
+        imagen: Imagen en escala de grises uint8
+
+    Returns:
+        Arreglo int64 de 256 conteos
+    """
+    return np.bincount(imagen.ravel(), minlength=256).astype(np.int64)
+
+
+@lru_cache(maxsize=16)
+def _nucleo_gaussiano(sigma, truncar):
+    """Núcleo gaussiano normalizado de radio int(truncar·sigma + 0.5)."""
+    radio = int(truncar * sigma + 0.5)
+    x = np.arange(-radio, radio + 1)
+    nucleo = np.exp(-0.5 * (x / sigma) ** 2)
+    return nucleo / nucleo.sum()
+
+
+def suavizar_histograma(histograma, sigma=2.0, truncar=4.0):
+    """
+    Suavizado gaussiano 1D con borde reflejado (como scipy.ndimage.gaussian_filter1d).
+
+    Args:
+        histograma: Arreglo 1D
+        sigma: Desviación estándar del núcleo en niveles
+        truncar: Radio del núcleo en múltiplos de sigma
+
+    Returns:
+        Arreglo float64 del mismo tamaño
+    """
+    senal = np.asarray(histograma, dtype=np.float64)
+    if sigma <= 0:
+        return senal.copy()
+    nucleo = _nucleo_gaussiano(float(sigma), float(truncar))
+    radio = nucleo.size // 2
+    # Reflejar el borde repitiendo el último valor: d c b a | a b c d (radio < tamaño)
+    extendida = np.concatenate((senal[radio - 1::-1] if radio else senal[:0], senal, senal[:-radio - 1:-1]))
+    return np.convolve(extendida, nucleo, mode='valid')
+
+
+def maximos_locales(senal):
+    """
+    Máximos locales de una señal 1D; en una meseta se toma su centro.
+
+    Los extremos de la señal nunca son máximos (misma convención que
+    scipy.signal.find_peaks).
+
+    Args:
+        senal: Arreglo 1D
+
+    Returns:
+        Índices de los máximos en orden creciente
+    """
+    senal = np.asarray(senal)
+    if senal.size < 3:
+        return np.empty(0, dtype=np.int64)
+    # Mesetas: corridas de valores iguales [inicio, fin]
+    cambia = np.flatnonzero(senal[1:] != senal[:-1]) + 1
+    inicio = np.concatenate(([0], cambia))
+    fin = np.concatenate((cambia - 1, [senal.size - 1]))
+    interior = (inicio > 0) & (fin < senal.size - 1)
+    inicio, fin = inicio[interior], fin[interior]
+    es_pico = (senal[inicio - 1] < senal[inicio]) & (senal[fin + 1] < senal[fin])
+    return (inicio[es_pico] + fin[es_pico]) // 2
+
+
+def prominencias(senal, picos):
+    """
+    Prominencia de cada pico: altura sobre la base más alta de sus dos lados.
+
+    La base de cada lado es el mínimo hasta el primer valor estrictamente
+    mayor que el pico (o el borde).
+
+    Args:
+        senal: Arreglo 1D
+        picos: Índices de los picos
+
+    Returns:
+        Arreglo float64 de prominencias
+    """
+    senal = np.asarray(senal, dtype=np.float64)
+    picos = np.asarray(picos, dtype=np.int64)
+    if picos.size == 0:
+        return np.empty(0, dtype=np.float64)
+    indices = np.arange(senal.size)
+    altura = senal[picos][:, None]
+    mayor = senal[None, :] > altura
+
+    # Último índice más alto a la izquierda y primero a la derecha de cada pico
+    izquierda = np.where(mayor & (indices < picos[:, None]), indices, -1).max(axis=1)
+    derecha = np.where(mayor & (indices > picos[:, None]), indices, senal.size).min(axis=1)
+
+    valores = np.broadcast_to(senal, mayor.shape)
+    lado_izquierdo = (indices > izquierda[:, None]) & (indices <= picos[:, None])
+    lado_derecho = (indices >= picos[:, None]) & (indices < derecha[:, None])
+    base_izquierda = np.where(lado_izquierdo, valores, np.inf).min(axis=1)
+    base_derecha = np.where(lado_derecho, valores, np.inf).min(axis=1)
+    return senal[picos] - np.maximum(base_izquierda, base_derecha)
+
+
+def encontrar_picos(senal, prominencia_minima=0.0):
+    """
+    Picos de una señal con prominencia mínima.
+
+    Args:
+        senal: Arreglo 1D (normalmente un histograma suavizado)
+        prominencia_minima: Prominencia mínima para conservar un pico
+
+    Returns:
+        picos, prominencias: Índices de los picos y su prominencia
+    """
+    picos = maximos_locales(senal)
+    prominencia = prominencias(senal, picos)
+    conservar = prominencia >= prominencia_minima
+    return picos[conservar], prominencia[conservar]
+
+
+def umbral_otsu_histograma(histograma):
+    """
+    Umbral de Otsu a partir del histograma (misma convención que cv2.THRESH_OTSU: v > t es objeto).
+
+    Args:
+        histograma: Histograma de 256 niveles
+
+    Returns:
+        Umbral entero
+    """
+    h = np.asarray(histograma, dtype=np.float64)
+    niveles = np.arange(h.size)
+    w0 = np.cumsum(h)
+    total = w0[-1]
+    suma = np.cumsum(h * niveles)
+    w1 = total - w0
+    with np.errstate(divide='ignore', invalid='ignore'):
+        entre_clases = (suma[-1] * w0 - total * suma) ** 2 / (w0 * w1)
+    entre_clases[(w0 == 0) | (w1 == 0)] = 0
+    return int(np.argmax(entre_clases))
+
+
+@instrumentar
+def umbral_minimo_histograma(histograma, sigma=2.0, prominencia_relativa=0.1):
+    """
+    Umbral en el mínimo del histograma suavizado entre sus dos picos más prominentes.
+
+    Args:
+        histograma: Histograma de 256 niveles
+        sigma: Suavizado gaussiano previo
+        prominencia_relativa: Prominencia mínima de un pico, relativa al máximo del histograma suavizado
+
+    Returns:
+        Umbral entero (Otsu sobre el mismo histograma si no hay dos picos claros)
+    """
+    suavizado = suavizar_histograma(histograma, sigma)
+    picos, prominencia = encontrar_picos(suavizado, suavizado.max() * prominencia_relativa)
+    if picos.size < 2:
+        return umbral_otsu_histograma(histograma)
+
+    # Los dos picos más prominentes
+    principales = np.sort(picos[np.argsort(prominencia)[::-1][:2]])
+    region = suavizado[principales[0]:principales[1] + 1]
+    return int(np.argmin(region) + principales[0])
@@ -0,0 +1,568 @@
+"""
+Árbol de componentes para etiquetado incremental por umbral.
+
+El árbol se construye una sola vez activando los píxeles de mayor a menor
+nivel de gris y uniendo vecinos con union-find. Cada nodo es una componente
+conexa de {imagen >= nivel}; con él, el número de componentes y las etiquetas
+de la imagen binaria {imagen > umbral} se obtienen para cualquier umbral sin
+volver a etiquetar la imagen.
+
+Los atributos de los nodos (área, bounding box, perímetro, contraste,
+circularidad) se acumulan una vez y permiten filtrar componentes y aplicar
+aperturas por atributos en cualquier umbral reutilizando el mismo árbol.
+"""
+
+import cv2
+import numpy as np
+
+from .instrumentacion import medir_operacion
+
+
+# Filas de celdas 2x2 por bloque al calcular los aportes al perímetro
+FILAS_POR_BLOQUE_PERIMETRO = 256
+
+# Desplazamientos (dy, dx) de la vecindad según la conectividad
+VECINOS = {
+    4: ((-1, 0), (0, -1), (0, 1), (1, 0)),
+    8: ((-1, -1), (-1, 0), (-1, 1), (0, -1), (0, 1), (1, -1), (1, 0), (1, 1)),
+}
+
+
+def longitud_contorno_externo(mascara):
+    """
+    Longitud (cv2.arcLength) del contorno externo de una componente.
+
+    Args:
+        mascara: Recorte booleano o uint8 con una sola componente
+
+    Returns:
+        Longitud del contorno; 0 para un solo píxel
+    """
+    recorte = cv2.copyMakeBorder(mascara.astype(np.uint8), 1, 1, 1, 1, cv2.BORDER_CONSTANT, value=0)
+    contornos, _ = cv2.findContours(recorte, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+    return cv2.arcLength(contornos[0], True) if contornos else 0.0
+
+
+def _raices(padre, x):
+    """Busca la raíz de cada elemento de x con compresión de caminos (vectorizado)."""
+    r = padre[x]
+    while True:
+        rr = padre[r]
+        if np.array_equal(rr, r):
+            break
+        abuelo = padre[rr]
+        padre[r] = abuelo
+        r = abuelo
+    padre[x] = r
+    return r
+
+
+def _distintos(x, posicion):
+    """
+    Retorna los valores distintos de x sin ordenar.
+
+    Cada valor escribe su posición en el arreglo auxiliar y solo la posición
+    que queda registrada lo conserva: O(len(x)) sin ordenamiento ni hash.
+    """
+    indice = np.arange(x.size, dtype=posicion.dtype)
+    posicion[x] = indice
+    return x[posicion[x] == indice]
+
+
+def _numerar_en_orden_barrido(ids, indices, ancho, conectividad):
+    """
+    Renumera identificadores de componente 1..k en el orden en que OpenCV asigna etiquetas.
+
+    Con conectividad 4 OpenCV recorre píxel a píxel; con 8 recorre bloques de
+    2x2, por lo que el orden es el del primer bloque que toca cada componente.
+
+    Args:
+        ids: Identificador de componente de cada píxel de primer plano
+        indices: Índice plano de cada píxel (en orden creciente)
+        ancho: Ancho de la imagen
+        conectividad: 4 u 8
+
+    Returns:
+        ids_ordenados: identificador de la componente de cada etiqueta 1..k
+        etiquetas: etiqueta 1..k de cada píxel (int32)
+    """
+    unicos, inversa = np.unique(ids, return_inverse=True)
+    if conectividad == 8:
+        filas, columnas = np.divmod(indices, ancho)
+        clave = (filas // 2) * ((ancho + 1) // 2) + columnas // 2
+    else:
+        clave = indices
+    minima = np.full(unicos.size, np.iinfo(np.int64).max, dtype=np.int64)
+    np.minimum.at(minima, inversa, clave)
+    orden = np.argsort(minima, kind='stable')
+    rango = np.empty(unicos.size, dtype=np.int32)
+    rango[orden] = np.arange(1, unicos.size + 1, dtype=np.int32)
+    return unicos[orden], rango[inversa]
+
+
+class ArbolComponentes:
+    """
+    Árbol de componentes (max-tree) de una imagen en escala de grises.
+
+    Atributos:
+        forma: (alto, ancho) de la imagen
+        conectividad: 4 u 8
+        nivel_nodo: Nivel de gris de cada nodo
+        padre_nodo: Nodo padre de cada nodo (la raíz es su propio padre)
+        nodo_pixel: Nodo más profundo que contiene a cada píxel (aplanado)
+        conteos: conteos[t] = componentes de {imagen > t}, para t en 0..255
+    """
+
+    def __init__(self, imagen, conectividad=8):
+        """
+        Construye el árbol en O(N log N).
+
+        Args:
+            imagen: Imagen uint8 (se convierte a grises si es color)
+            conectividad: 4 u 8
+        """
+        if conectividad not in VECINOS:
+            raise ValueError("La conectividad debe ser 4 u 8")
+        if len(imagen.shape) == 3:
+            imagen = cv2.cvtColor(imagen, cv2.COLOR_BGR2GRAY)
+        if imagen.dtype != np.uint8:
+            imagen = np.clip(imagen, 0, 255).astype(np.uint8)
+
+        self.forma = imagen.shape
+        self.conectividad = conectividad
+        self.imagen = np.ascontiguousarray(imagen).ravel()
+        self._atributos = None
+        with medir_operacion("ArbolComponentes", (imagen,)):
+            self._construir()
+
+    def _construir(self):
+        alto, ancho = self.forma
+        n = self.imagen.size
+        tipo = np.int32 if n < 2**31 else np.int64
+
+        # Píxeles agrupados por nivel (ordenamiento estable por conteo)
+        orden = np.argsort(self.imagen, kind='stable').astype(tipo)
+        fin_nivel = np.cumsum(np.bincount(self.imagen, minlength=256))
+        ini_nivel = fin_nivel - np.bincount(self.imagen, minlength=256)
+
+        padre = np.arange(n, dtype=tipo)
+        posicion = np.empty(n, dtype=tipo)
+        nodo_de_raiz = np.full(n, -1, dtype=tipo)
+        self.nodo_pixel = np.empty(n, dtype=tipo)
+
+        # Cada nodo recibe al menos un píxel propio: como máximo N nodos
+        self.nivel_nodo = np.empty(n, dtype=np.uint8)
+        self.padre_nodo = np.empty(n, dtype=tipo)
+        self._bloques = []  # (nivel, primer nodo, fin) en orden de creación
+        total_nodos = 0
+        componentes = 0
+        conteo_nivel = np.zeros(256, dtype=np.int64)
+
+        for nivel in range(255, -1, -1):
+            nuevos = orden[ini_nivel[nivel]:fin_nivel[nivel]]
+            if nuevos.size == 0:
+                continue
+
+            # Aristas de los píxeles nuevos hacia vecinos ya activos (nivel >= actual)
+            filas, columnas = np.divmod(nuevos, ancho)
+            extremos_a, extremos_b = [], []
+            for dy, dx in VECINOS[self.conectividad]:
+                validos = ((filas + dy >= 0) & (filas + dy < alto) &
+                           (columnas + dx >= 0) & (columnas + dx < ancho))
+                p = nuevos[validos]
+                q = p + (dy * ancho + dx)
+                activos = self.imagen[q] >= nivel
+                extremos_a.append(p[activos])
+                extremos_b.append(q[activos])
+            a = np.concatenate(extremos_a)
+            b = np.concatenate(extremos_b)
+
+            componentes += nuevos.size
+            ra = _raices(padre, a)
+            rb = _raices(padre, b)
+
+            # Componentes del nivel anterior que tocan a los píxeles nuevos
+            previas = _distintos(np.concatenate((ra, rb)), posicion)
+            previas = previas[nodo_de_raiz[previas] >= 0]
+            nodos_previos = nodo_de_raiz[previas]
+
+            # Enganchar raíz mayor a menor hasta que no queden aristas entre árboles distintos
+            while True:
+                cruzan = ra != rb
+                if not cruzan.any():
+                    break
+                ra, rb = ra[cruzan], rb[cruzan]
+                mayor = np.maximum(ra, rb)
+                padre[mayor] = np.minimum(ra, rb)
+                componentes -= _distintos(mayor, posicion).size
+                ra = _raices(padre, ra)
+                rb = _raices(padre, rb)
+
+            # Un nodo nuevo por cada componente que recibió píxeles de este nivel
+            raices_nuevos = _raices(padre, nuevos)
+            raices_nivel = _distintos(raices_nuevos, posicion)
+            ids = np.arange(total_nodos, total_nodos + raices_nivel.size, dtype=tipo)
+            nodo_de_raiz[raices_nivel] = ids
+            self.nodo_pixel[nuevos] = nodo_de_raiz[raices_nuevos]
+
+            # Las componentes previas cuelgan del nodo que las absorbió
+            self.padre_nodo[nodos_previos] = nodo_de_raiz[_raices(padre, previas)]
+            self.nivel_nodo[ids] = nivel
+            self.padre_nodo[ids] = ids
+            self._bloques.append((nivel, total_nodos, total_nodos + ids.size))
+            total_nodos += ids.size
+            conteo_nivel[nivel] = componentes
+
+        self.nivel_nodo = self.nivel_nodo[:total_nodos].copy()
+        self.padre_nodo = self.padre_nodo[:total_nodos].copy()
+
+        # conteos[t] corresponde al menor nivel presente mayor que t
+        self.conteos = np.zeros(256, dtype=np.int64)
+        actual = 0
+        presentes = fin_nivel > ini_nivel
+        for t in range(255, -1, -1):
+            self.conteos[t] = actual
+            if presentes[t]:
+                actual = conteo_nivel[t]
+
+    @property
+    def numero_nodos(self):
+        """Número total de nodos del árbol."""
+        return self.nivel_nodo.size
+
+    def atributos(self):
+        """
+        Atributos de cada nodo, calculados una vez y reutilizados en todas las consultas.
+
+        Los valores propios de cada píxel se acumulan de hijos a padres
+        recorriendo los bloques en orden de creación (de mayor a menor nivel).
+        perimetro_contornos es la longitud de todos los contornos de la
+        componente, el externo y los de sus agujeros, por los centros de los
+        píxeles de borde (pasos de 1 y √2); euler es el número de Euler
+        (1 - agujeros). En componentes sin agujeros perimetro_contornos
+        coincide con el perímetro de tabla_componentes (cv2.arcLength del
+        contorno externo); ver _aportes_celdas. La tabla de componentes()
+        mide el contorno externo de las que tienen agujeros o, con
+        conectividad 4, celdas con solo dos píxeles en diagonal
+        (celdas_diagonales, que findContours sigue en vecindad 8).
+
+        Returns:
+            dict atributo -> numpy array de tamaño numero_nodos con las claves
+            area, suma_x, suma_y, x_min, x_max, y_min, y_max,
+            perimetro_contornos, euler, celdas_diagonales, nivel_maximo,
+            contraste, ancho, alto y circularidad_contornos
+            (4π·área / perimetro_contornos²)
+        """
+        if self._atributos is not None:
+            return self._atributos
+
+        alto, ancho = self.forma
+        m = self.numero_nodos
+        nodo = self.nodo_pixel
+        filas, columnas = np.divmod(np.arange(self.imagen.size), ancho)
+
+        area = np.bincount(nodo, minlength=m).astype(np.int64)
+        suma_x = np.bincount(nodo, weights=columnas, minlength=m)
+        suma_y = np.bincount(nodo, weights=filas, minlength=m)
+        x_min = np.full(m, ancho, dtype=np.int64)
+        y_min = np.full(m, alto, dtype=np.int64)
+        x_max = np.full(m, -1, dtype=np.int64)
+        y_max = np.full(m, -1, dtype=np.int64)
+        np.minimum.at(x_min, nodo, columnas)
+        np.maximum.at(x_max, nodo, columnas)
+        # Los píxeles están en orden de filas: la primera y última aparición bastan
+        y_min[nodo[::-1]] = filas[::-1]
+        y_max[nodo] = filas
+
+        aportes_perimetro, aportes_euler, aportes_diagonales = self._aportes_celdas()
+        perimetro = np.bincount(nodo, weights=aportes_perimetro, minlength=m)
+        euler4 = np.bincount(nodo, weights=aportes_euler, minlength=m).astype(np.int64)
+        diagonales = np.bincount(nodo, weights=aportes_diagonales, minlength=m).astype(np.int64)
+
+        nivel_maximo = self.nivel_nodo.astype(np.int64)
+
+        for _, inicio, fin in self._bloques:
+            padres = self.padre_nodo[inicio:fin]
+            hijos = np.flatnonzero(padres != np.arange(inicio, fin)) + inicio
+            padres = self.padre_nodo[hijos]
+            np.add.at(area, padres, area[hijos])
+            np.add.at(suma_x, padres, suma_x[hijos])
+            np.add.at(suma_y, padres, suma_y[hijos])
+            np.add.at(perimetro, padres, perimetro[hijos])
+            np.add.at(euler4, padres, euler4[hijos])
+            np.add.at(diagonales, padres, diagonales[hijos])
+            np.minimum.at(x_min, padres, x_min[hijos])
+            np.minimum.at(y_min, padres, y_min[hijos])
+            np.maximum.at(x_max, padres, x_max[hijos])
+            np.maximum.at(y_max, padres, y_max[hijos])
+            np.maximum.at(nivel_maximo, padres, nivel_maximo[hijos])
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            circularidad = np.where(perimetro > 0, 4 * np.pi * area / perimetro ** 2, 0.0)
+
+        self._atributos = {
+            'area': area,
+            'suma_x': suma_x,
+            'suma_y': suma_y,
+            'x_min': x_min,
+            'x_max': x_max,
+            'y_min': y_min,
+            'y_max': y_max,
+            'perimetro_contornos': perimetro,
+            'euler': euler4 // 4,
+            'celdas_diagonales': diagonales,
+            'nivel_maximo': nivel_maximo,
+            'contraste': nivel_maximo - self.nivel_nodo,
+            'ancho': x_max - x_min + 1,
+            'alto': y_max - y_min + 1,
+            'circularidad_contornos': circularidad,
+        }
+        return self._atributos
+
+    def _aportes_celdas(self):
+        """
+        Aporte de cada píxel al perímetro y al número de Euler de las componentes que lo contienen.
+
+        Cada celda de 2x2 píxeles aporta al contorno según cuántos de sus
+        píxeles están en la componente: uno 0, dos vecinos 1 (paso recto), tres
+        √2 (paso diagonal) y cuatro 0; dos en diagonal aportan 0 con
+        conectividad 4 (son componentes distintas en la celda) y 2√2 con
+        conectividad 8 (ida y vuelta). El número de Euler usa los mismos
+        patrones (Gray): 1/4 con uno, -1/4 con tres y ∓1/2 con dos en diagonal
+        (conectividad 8 / 4). Ordenando los píxeles de la celda de mayor a
+        menor nivel, el k-ésimo aporta la diferencia entre las celdas con k y
+        k - 1 píxeles, y la suma sobre el subárbol de un nodo da la longitud de
+        sus contornos (externo y agujeros) y su número de Euler. También se
+        cuentan las celdas con solo dos píxeles en diagonal; con conectividad 4
+        pueden ser de componentes distintas, por lo que la cuenta es una cota
+        superior.
+
+        Returns:
+            Arreglos aplanados del tamaño de la imagen: aportes al perímetro
+            (float64), al número de Euler multiplicados por 4 y a las celdas
+            diagonales (int64)
+        """
+        alto, ancho = self.forma
+        # Marco de -1: nunca pertenece a una componente
+        img = np.full((alto + 2, ancho + 2), -1, dtype=np.int16)
+        img[1:-1, 1:-1] = self.imagen.reshape(self.forma)
+        diagonal, euler_diagonal = (2 * np.sqrt(2), -2) if self.conectividad == 8 else (0.0, 2)
+        aportes = np.zeros((alto + 2) * (ancho + 2), dtype=np.float64)
+        euler = np.zeros((alto + 2) * (ancho + 2), dtype=np.int64)
+        diagonales = np.zeros((alto + 2) * (ancho + 2), dtype=np.int64)
+
+        # Esquinas de la celda: 0 y 3, 1 y 2 son diagonales
+        esquinas = ((0, 0), (0, 1), (1, 0), (1, 1))
+        for y0 in range(0, alto + 1, FILAS_POR_BLOQUE_PERIMETRO):
+            y1 = min(y0 + FILAS_POR_BLOQUE_PERIMETRO, alto + 1)
+            valores = np.stack([img[y0 + dy:y1 + dy, dx:ancho + 1 + dx] for dy, dx in esquinas])
+            orden = np.argsort(-valores, axis=0, kind='stable')
+            es_diagonal = (orden[0] + orden[1] == 3).astype(np.int64)
+            segundo = np.where(es_diagonal, diagonal, 1.0)
+            euler_segundo = np.where(es_diagonal, euler_diagonal, 0)
+            # Índice de cada celda dentro del bloque de filas y1 - y0 + 1
+            celda = np.arange(y1 - y0)[:, None] * (ancho + 2) + np.arange(ancho + 1)
+            bloque = aportes[y0 * (ancho + 2):(y1 + 1) * (ancho + 2)]
+            bloque_euler = euler[y0 * (ancho + 2):(y1 + 1) * (ancho + 2)]
+            bloque_diagonales = diagonales[y0 * (ancho + 2):(y1 + 1) * (ancho + 2)]
+            for k, aporte, aporte_euler, aporte_diagonal in (
+                    (0, 0.0, 1, 0), (1, segundo, euler_segundo - 1, es_diagonal),
+                    (2, np.sqrt(2) - segundo, -1 - euler_segundo, -es_diagonal), (3, -np.sqrt(2), 1, 0)):
+                indices = (celda + (orden[k] // 2) * (ancho + 2) + orden[k] % 2).ravel()
+                if k:
+                    bloque += np.bincount(indices, weights=np.broadcast_to(aporte, celda.shape).ravel(),
+                                          minlength=bloque.size)
+                bloque_euler += np.bincount(indices, weights=np.broadcast_to(aporte_euler, celda.shape).ravel(),
+                                            minlength=bloque.size).astype(np.int64)
+                if k in (1, 2):
+                    bloque_diagonales += np.bincount(indices, weights=np.ravel(aporte_diagonal),
+                                                     minlength=bloque.size).astype(np.int64)
+        interior = (slice(1, -1), slice(1, -1))
+        return tuple(arreglo.reshape(alto + 2, ancho + 2)[interior].ravel()
+                     for arreglo in (aportes, euler, diagonales))
+
+    def nodos_validos(self, area_minima=0, area_maxima=None, lado_minimo=0,
+                      circularidad_minima=0.0, contraste_minimo=0):
+        """
+        Marca los nodos que cumplen los criterios de atributos.
+
+        Args:
+            area_minima: Área mínima en píxeles
+            area_maxima: Área máxima en píxeles (None sin límite)
+            lado_minimo: Lado mayor mínimo del bounding box
+            circularidad_minima: Circularidad mínima (0-1) según circularidad_contornos;
+                en componentes con agujeros es menor que la de tabla_componentes
+            contraste_minimo: Diferencia mínima entre el nivel máximo de la componente y su nivel
+
+        Returns:
+            Arreglo booleano de tamaño numero_nodos
+        """
+        atributos = self.atributos()
+        validos = atributos['area'] >= area_minima
+        if area_maxima is not None:
+            validos &= atributos['area'] <= area_maxima
+        if lado_minimo:
+            validos &= np.maximum(atributos['ancho'], atributos['alto']) >= lado_minimo
+        if circularidad_minima:
+            validos &= atributos['circularidad_contornos'] >= circularidad_minima
+        if contraste_minimo:
+            validos &= atributos['contraste'] >= contraste_minimo
+        return validos
+
+    def apertura(self, validos):
+        """
+        Apertura por atributos sobre la imagen en grises (regla directa).
+
+        Cada píxel toma el nivel del nodo válido más cercano entre su nodo y
+        sus ancestros; la raíz siempre se conserva.
+
+        Args:
+            validos: Arreglo booleano por nodo (ver nodos_validos)
+
+        Returns:
+            Imagen filtrada uint8
+        """
+        destino = np.arange(self.numero_nodos, dtype=self.padre_nodo.dtype)
+        # De la raíz hacia las hojas: los padres se resuelven antes que los hijos
+        for _, inicio, fin in reversed(self._bloques):
+            padres = self.padre_nodo[inicio:fin]
+            propio = destino[inicio:fin]
+            destino[inicio:fin] = np.where(validos[inicio:fin] | (padres == propio), propio, destino[padres])
+        return self.nivel_nodo[destino[self.nodo_pixel]].reshape(self.forma)
+
+    def nodos_en_umbral(self, umbral):
+        """
+        Nodos que representan las componentes de {imagen > umbral}.
+
+        Son los nodos con nivel > umbral cuyo padre tiene nivel <= umbral (o
+        que son la raíz); sus atributos son los de cada componente binaria.
+
+        Args:
+            umbral: Valor de umbral (0-255)
+
+        Returns:
+            Arreglo booleano de tamaño numero_nodos
+        """
+        padres = self.padre_nodo
+        es_raiz = padres == np.arange(self.numero_nodos)
+        return (self.nivel_nodo > umbral) & (es_raiz | (self.nivel_nodo[padres] <= umbral))
+
+    def numero_componentes(self, umbral, validos=None):
+        """
+        Número de componentes de la imagen binaria {imagen > umbral}.
+
+        Args:
+            umbral: Valor de umbral (0-255)
+            validos: Arreglo booleano por nodo para contar solo componentes válidas
+
+        Returns:
+            Número de componentes (sin contar el fondo)
+        """
+        if validos is None:
+            return int(self.conteos[int(umbral)])
+        return int(np.count_nonzero(self.nodos_en_umbral(umbral) & validos))
+
+    def ancestros_en_umbral(self, umbral):
+        """
+        Para cada nodo con nivel > umbral, el ancestro que representa su componente en ese umbral.
+
+        Args:
+            umbral: Valor de umbral (0-255)
+
+        Returns:
+            Arreglo de tamaño numero_nodos (-1 en nodos con nivel <= umbral)
+        """
+        ancestro = np.full(self.numero_nodos, -1, dtype=self.padre_nodo.dtype)
+        # Los bloques se crearon de mayor a menor nivel: se recorren al revés
+        for nivel, inicio, fin in reversed(self._bloques):
+            if nivel <= umbral:
+                continue
+            padres = self.padre_nodo[inicio:fin]
+            propio = np.arange(inicio, fin, dtype=ancestro.dtype)
+            ancestro[inicio:fin] = np.where(
+                (padres != propio) & (self.nivel_nodo[padres] > umbral), ancestro[padres], propio)
+        return ancestro
+
+    def etiquetas(self, umbral, validos=None):
+        """
+        Etiqueta las componentes de {imagen > umbral} sin volver a recorrer vecindades.
+
+        Las etiquetas se numeran en el mismo orden que cv2.connectedComponents.
+
+        Args:
+            umbral: Valor de umbral (0-255)
+            validos: Arreglo booleano por nodo; las componentes no válidas pasan al fondo
+
+        Returns:
+            num_labels: número de etiquetas incluyendo el fondo
+            labels: matriz de etiquetas int32
+        """
+        num_labels, labels, _ = self.componentes(umbral, validos, con_tabla=False)
+        return num_labels, labels
+
+    def componentes(self, umbral, validos=None, con_tabla=True):
+        """
+        Etiquetas y estadísticas de las componentes en un umbral, filtradas por atributos.
+
+        Sustituye la secuencia umbral → etiquetado → filtrado → estadísticas:
+        las estadísticas salen de los atributos de los nodos ya calculados.
+
+        Args:
+            umbral: Valor de umbral (0-255)
+            validos: Arreglo booleano por nodo (ver nodos_validos)
+            con_tabla: Si calcular también la tabla de estadísticas
+
+        Returns:
+            num_labels: número de etiquetas incluyendo el fondo
+            labels: matriz de etiquetas int32
+            tabla: dict columna -> numpy array con las columnas de
+                tabla_componentes (None si con_tabla es False); el perímetro
+                de las componentes con agujeros se mide sobre su contorno
+                externo, como en tabla_componentes
+        """
+        labels = np.zeros(self.imagen.size, dtype=np.int32)
+        primer_plano = np.flatnonzero(self.imagen > umbral)
+        ids = self.ancestros_en_umbral(umbral)[self.nodo_pixel[primer_plano]]
+        if validos is not None:
+            conservar = validos[ids]
+            primer_plano, ids = primer_plano[conservar], ids[conservar]
+
+        nodos, labels[primer_plano] = _numerar_en_orden_barrido(
+            ids, primer_plano, self.forma[1], self.conectividad)
+        labels = labels.reshape(self.forma)
+        if not con_tabla:
+            return nodos.size + 1, labels, None
+
+        atributos = self.atributos()
+        area = atributos['area'][nodos]
+        ancho = atributos['ancho'][nodos]
+        alto = atributos['alto'][nodos]
+        x_min = atributos['x_min'][nodos]
+        y_min = atributos['y_min'][nodos]
+
+        # Sin agujeros los contornos son solo el externo; con agujeros (o, en
+        # conectividad 4, pasos diagonales que findContours recorre) se mide el externo
+        perimetro = atributos['perimetro_contornos'][nodos].copy()
+        medir = atributos['euler'][nodos] != 1
+        if self.conectividad == 4:
+            medir |= atributos['celdas_diagonales'][nodos] > 0
+        for i in np.flatnonzero(medir):
+            recorte = labels[y_min[i]:y_min[i] + alto[i], x_min[i]:x_min[i] + ancho[i]] == i + 1
+            perimetro[i] = longitud_contorno_externo(recorte)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            circularidad = np.where(perimetro > 0, 4 * np.pi * area / perimetro ** 2, 0.0)
+
+        tabla = {
+            'etiqueta': np.arange(1, nodos.size + 1, dtype=np.int64),
+            'area': area,
+            'perimetro': perimetro,
+            'centroide_x': atributos['suma_x'][nodos] / np.maximum(area, 1),
+            'centroide_y': atributos['suma_y'][nodos] / np.maximum(area, 1),
+            'bbox_x': x_min,
+            'bbox_y': y_min,
+            'bbox_ancho': ancho,
+            'bbox_alto': alto,
+            'aspect_ratio': ancho / np.maximum(alto, 1),
+            'circularidad': circularidad,
+        }
+        return nodos.size + 1, labels, tabla
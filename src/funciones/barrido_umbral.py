@@ -0,0 +1,138 @@
+"""
+Barrido de umbrales fijos sobre una imagen en grises.
+
+El histograma se calcula una sola vez; con su suma acumulada se obtienen
+para los 256 umbrales el número de píxeles de primer plano y la
+separabilidad de Otsu, y el número de componentes sale del árbol de
+componentes (ArbolComponentes.conteos). Para mostrar un umbral basta una
+LUT sobre una versión reducida de la imagen.
+"""
+
+import cv2
+import numpy as np
+
+from .arbol_componentes import ArbolComponentes
+from .instrumentacion import medir_operacion
+
+
+# Lado mayor de la imagen reducida usada para vistas previas y estimaciones
+LADO_PROXY_DEFAULT = 512
+
+
+class BarridoUmbral:
+    """
+    Estadísticas de la binarización {imagen > t} para todos los umbrales t en 0..255.
+
+    Attributes:
+        gris: Imagen en escala de grises uint8
+        proxy: Imagen reducida (lado mayor <= lado_proxy) para vistas previas
+        histograma: Conteo de píxeles por nivel de gris
+        total: Número de píxeles
+    """
+
+    def __init__(self, imagen, lado_proxy=LADO_PROXY_DEFAULT):
+        """
+        Precalcula histograma, acumulados e imagen reducida.
+
+        Args:
+            imagen: Imagen uint8 (se convierte a grises si es color BGR)
+            lado_proxy: Lado mayor de la imagen reducida
+        """
+        if imagen.ndim == 3:
+            imagen = cv2.cvtColor(imagen, cv2.COLOR_BGR2GRAY)
+        if imagen.dtype != np.uint8:
+            imagen = np.clip(imagen, 0, 255).astype(np.uint8)
+        self.gris = imagen
+
+        with medir_operacion("BarridoUmbral", (imagen,)):
+            self.histograma = np.bincount(imagen.ravel(), minlength=256).astype(np.int64)
+            self.total = int(imagen.size)
+            # Píxeles <= t y suma de sus niveles, para cada t
+            self._acumulado = np.cumsum(self.histograma)
+            self._suma_acumulada = np.cumsum(self.histograma * np.arange(256, dtype=np.float64))
+
+            escala = lado_proxy / max(imagen.shape)
+            if escala < 1:
+                tamano = (max(1, round(imagen.shape[1] * escala)), max(1, round(imagen.shape[0] * escala)))
+                self.proxy = cv2.resize(imagen, tamano, interpolation=cv2.INTER_AREA)
+            else:
+                self.proxy = imagen
+        self._componentes = {}
+
+    def conteo_primer_plano(self):
+        """Píxeles de primer plano (> t) para cada umbral t."""
+        return self.total - self._acumulado
+
+    def fraccion_primer_plano(self):
+        """Fracción de primer plano para cada umbral t."""
+        return self.conteo_primer_plano() / max(self.total, 1)
+
+    def separabilidad(self):
+        """
+        Separabilidad de Otsu de cada umbral: varianza entre clases / varianza total.
+
+        Returns:
+            Arreglo de 256 valores en [0, 1] (0 si una de las clases está vacía)
+        """
+        n = max(self.total, 1)
+        w0 = self._acumulado / n
+        w1 = 1 - w0
+        media_total = self._suma_acumulada[-1] / n
+        media_parcial = self._suma_acumulada / n
+        varianza_total = (self.histograma * (np.arange(256) - media_total) ** 2).sum() / n
+        with np.errstate(divide='ignore', invalid='ignore'):
+            entre_clases = (media_total * w0 - media_parcial) ** 2 / (w0 * w1)
+        entre_clases = np.where((w0 > 0) & (w1 > 0), entre_clases, 0.0)
+        return entre_clases / varianza_total if varianza_total > 0 else entre_clases
+
+    def umbral_otsu(self):
+        """Umbral que maximiza la separabilidad (el mismo que cv2.THRESH_OTSU)."""
+        return int(np.argmax(self.separabilidad()))
+
+    def componentes(self, conectividad=8, exacto=False):
+        """
+        Número de componentes de {imagen > t} para cada umbral t.
+
+        Args:
+            conectividad: 4 u 8
+            exacto: Si contar sobre la imagen completa; por defecto se estima
+                    sobre la imagen reducida (mucho más rápido)
+
+        Returns:
+            Arreglo de 256 enteros
+        """
+        clave = (conectividad, exacto or self.proxy is self.gris)
+        if clave not in self._componentes:
+            imagen = self.gris if clave[1] else self.proxy
+            self._componentes[clave] = ArbolComponentes(imagen, conectividad).conteos
+        return self._componentes[clave]
+
+    @staticmethod
+    def _lut(umbral):
+        lut = np.zeros(256, dtype=np.uint8)
+        lut[int(umbral) + 1:] = 255
+        return lut
+
+    def mascara(self, umbral):
+        """
+        Binarización de la imagen completa (igual a umbral_fijo).
+
+        Args:
+            umbral: Valor de umbral (0-255)
+
+        Returns:
+            Imagen binaria uint8 (0/255)
+        """
+        return cv2.LUT(self.gris, self._lut(umbral))
+
+    def vista_previa(self, umbral):
+        """
+        Binarización de la imagen reducida, para mostrar al mover el umbral.
+
+        Args:
+            umbral: Valor de umbral (0-255)
+
+        Returns:
+            Imagen binaria uint8 (0/255) del tamaño de proxy
+        """
+        return cv2.LUT(self.proxy, self._lut(umbral))
@@ -0,0 +1,325 @@
+"""
+Análisis de componentes conexas por bandas horizontales.
+
+Pensado para imágenes que no caben en memoria junto con su matriz de
+etiquetas: cada banda se etiqueta con OpenCV, las componentes que cruzan la
+costura con la banda anterior se unen con union-find y las estadísticas se
+acumulan por etiqueta provisional. Solo se conservan la banda actual y la
+última fila de la anterior; la matriz de etiquetas completa nunca se crea.
+
+El perímetro se acumula por celdas de 2x2 píxeles (pasos de 1 y √2, como
+cv2.arcLength) y se asigna a la componente del fondo que toca cada celda; el
+fondo se etiqueta también por bandas (vecindad 4, la dual de la vecindad 8
+con que findContours sigue los contornos) y solo cuenta el fondo que rodea a
+la componente (el que está sobre su primer píxel), no el de sus agujeros.
+"""
+
+import cv2
+import numpy as np
+
+from .arbol_componentes import _raices
+from .instrumentacion import instrumentar
+
+
+ALTO_BANDA_DEFAULT = 1024
+
+
+def _bandas(fuente, alto_banda):
+    """Recorre la fuente por bandas de filas (arreglo, np.memmap o iterable de bandas)."""
+    if hasattr(fuente, 'shape'):
+        for inicio in range(0, fuente.shape[0], alto_banda):
+            yield fuente[inicio:inicio + alto_banda]
+    else:
+        yield from fuente
+
+
+def _pares_costura(fila_anterior, fila_actual, conectividad):
+    """
+    Pares de etiquetas globales que se tocan a través de la costura entre dos bandas.
+
+    Args:
+        fila_anterior: Etiquetas globales de la última fila de la banda previa (-1 fondo)
+        fila_actual: Etiquetas globales de la primera fila de la banda actual (-1 fondo)
+        conectividad: 4 u 8
+
+    Returns:
+        a, b: Arreglos de etiquetas a unir
+        verticales: Pares verticales (a, b) sin diagonales, para el perímetro
+    """
+    ambos = (fila_anterior >= 0) & (fila_actual >= 0)
+    verticales = (fila_anterior[ambos], fila_actual[ambos])
+    a, b = [verticales[0]], [verticales[1]]
+    if conectividad == 8:
+        izquierda = (fila_anterior[:-1] >= 0) & (fila_actual[1:] >= 0)
+        derecha = (fila_anterior[1:] >= 0) & (fila_actual[:-1] >= 0)
+        a += [fila_anterior[:-1][izquierda], fila_anterior[1:][derecha]]
+        b += [fila_actual[1:][izquierda], fila_actual[:-1][derecha]]
+    return np.concatenate(a), np.concatenate(b), verticales
+
+
+def _aportes_contorno(frente, fondo):
+    """
+    Aportes al contorno externo de las celdas de 2x2 entre filas consecutivas.
+
+    El contorno se mide como cv2.findContours sobre la máscara de una
+    componente (vecindad 8). Cada píxel de fondo de la celda aporta a la
+    componente de primer plano de la celda: √2 si es el único de fondo (paso
+    diagonal), 1/2 si hay dos vecinos (paso recto entre los dos), √2 si son
+    dos en diagonal (ida y vuelta, solo si los dos píxeles de primer plano
+    son de la misma componente) y 0 en otro caso. Sumados sobre una
+    componente del fondo dan la longitud del contorno que la separa de la
+    componente. Dos píxeles de fondo en diagonal entre dos componentes
+    distintas están unidos para ambas (cada una ve a la otra como fondo);
+    esos pares se devuelven aparte para unirlos si las componentes resultan
+    distintas.
+
+    Args:
+        frente: Etiquetas provisionales de primer plano (-1 fondo), con una columna de fondo a cada lado
+        fondo: Etiquetas provisionales del fondo (-1 primer plano), misma forma
+
+    Returns:
+        aportes: Etiquetas de primer plano mayor y menor de la celda (deben
+            ser la misma componente), etiqueta de fondo y aporte de cada píxel
+            con aporte no nulo
+        diagonales: Etiquetas de primer plano y de fondo de las dos diagonales
+            de cada celda con dos píxeles de fondo en diagonal
+    """
+    # Solo las celdas con uno o dos píxeles de fondo aportan o unen fondos
+    es_fondo_img = (fondo >= 0).view(np.uint8)
+    cuenta = es_fondo_img[:-1, :-1] + es_fondo_img[:-1, 1:] + es_fondo_img[1:, :-1] + es_fondo_img[1:, 1:]
+    y, x = np.divmod(np.flatnonzero((cuenta == 1) | (cuenta == 2)), cuenta.shape[1])
+    cuenta = cuenta[y, x]
+    esquinas = [(y, x), (y, x + 1), (y + 1, x), (y + 1, x + 1)]
+    fondos = [fondo[esquina] for esquina in esquinas]
+    es_fondo = [f >= 0 for f in fondos]
+    # Dos de fondo en diagonal: las esquinas 0 y 3 (o 1 y 2) coinciden
+    diagonal = (cuenta == 2) & (es_fondo[0] == es_fondo[3])
+    peso = np.where((cuenta == 1) | diagonal, np.sqrt(2), 0.5)
+    frentes = [frente[esquina] for esquina in esquinas]
+    mayor = np.maximum.reduce(frentes)
+    menor = np.minimum.reduce([np.where(f >= 0, f, np.iinfo(np.int64).max) for f in frentes])
+
+    # Se acumula por (componente, fondo) para no guardar un registro por píxel; las
+    # celdas con dos etiquetas provisionales (costuras, diagonales) se guardan aparte
+    seleccion = np.concatenate(es_fondo)
+    mayor4, menor4 = np.tile(mayor, 4)[seleccion], np.tile(menor, 4)[seleccion]
+    fondo4, peso4 = np.concatenate(fondos)[seleccion], np.tile(peso, 4)[seleccion]
+    una = mayor4 == menor4
+    aportes = (mayor4[~una], menor4[~una], fondo4[~una], peso4[~una])
+    if una.any():
+        # Clave única con desplazamientos locales: los rangos son del orden de la banda
+        base_mayor, base_fondo = mayor4[una].min(), fondo4[una].min()
+        rango_fondo = fondo4[una].max() - base_fondo + 1
+        claves, inversa = np.unique((mayor4[una] - base_mayor) * rango_fondo + fondo4[una] - base_fondo,
+                                    return_inverse=True)
+        componente = claves // rango_fondo + base_mayor
+        aportes = tuple(np.concatenate(par) for par in zip(aportes, (
+            componente, componente, claves % rango_fondo + base_fondo,
+            np.bincount(inversa, weights=peso4[una], minlength=claves.size))))
+    # Fondo en las esquinas 1 y 2 (primer plano en 0 y 3) o al revés
+    fondo_12 = diagonal & es_fondo[1]
+    fondo_03 = diagonal & es_fondo[0]
+    diagonales = (np.concatenate((mayor[fondo_12], mayor[fondo_03])),
+                  np.concatenate((menor[fondo_12], menor[fondo_03])),
+                  np.concatenate((fondos[1][fondo_12], fondos[0][fondo_03])),
+                  np.concatenate((fondos[2][fondo_12], fondos[3][fondo_03])))
+    return aportes, diagonales
+
+
+def unir_etiquetas(total, a, b):
+    """
+    Resuelve un union-find sobre etiquetas provisionales 0..total-1.
+
+    Cada arista engancha la raíz mayor a la menor, por lo que la raíz de cada
+    conjunto es su etiqueta provisional más baja.
+
+    Args:
+        total: Número de etiquetas provisionales
+        a, b: Arreglos con los pares de etiquetas conectadas
+
+    Returns:
+        Raíz de cada etiqueta provisional
+    """
+    padre = np.arange(total, dtype=np.int64)
+    ra = _raices(padre, a.astype(np.int64))
+    rb = _raices(padre, b.astype(np.int64))
+    while True:
+        cruzan = ra != rb
+        if not cruzan.any():
+            break
+        ra, rb = ra[cruzan], rb[cruzan]
+        padre[np.maximum(ra, rb)] = np.minimum(ra, rb)
+        ra = _raices(padre, ra)
+        rb = _raices(padre, rb)
+    return _raices(padre, np.arange(total, dtype=np.int64))
+
+
+@instrumentar
+def estadisticas_por_bandas(fuente, alto_banda=ALTO_BANDA_DEFAULT, connectivity=8, umbral=0, area_minima=0):
+    """
+    Calcula las estadísticas de las componentes conexas procesando la imagen por bandas.
+
+    Las componentes se numeran en el mismo orden que cv2.connectedComponents.
+    Con conectividad 8 OpenCV recorre bloques de 2x2, por lo que un alto_banda
+    impar se redondea al par siguiente; si la fuente es un iterable, sus
+    bandas (salvo la última) deben tener alto par para conservar el orden.
+    El perímetro es la longitud del contorno externo, la misma medida que
+    tabla_componentes (cv2.arcLength), sin los contornos de los agujeros.
+
+    Args:
+        fuente: Imagen 2D (numpy array o np.memmap) o iterable de bandas 2D del mismo ancho
+        alto_banda: Filas por banda cuando la fuente es un arreglo (par con conectividad 8)
+        connectivity: 4 u 8
+        umbral: Los píxeles con valor > umbral son primer plano
+        area_minima: Área mínima de las componentes reportadas
+
+    Returns:
+        dict columna -> numpy array con las columnas de tabla_componentes
+    """
+    if alto_banda < 1:
+        raise ValueError("alto_banda debe ser al menos 1")
+    if connectivity == 8:
+        alto_banda += alto_banda % 2
+
+    trozos = {clave: [] for clave in ('area', 'suma_x', 'suma_y', 'x_min', 'y_min', 'x_max', 'y_max',
+                                      'primero', 'arriba')}
+    uniones_a, uniones_b = [], []
+    uniones_fondo_a, uniones_fondo_b = [], []
+    contornos, diagonales = [], []
+    frente_anterior = fondo_anterior = None
+    total = 0
+    # La etiqueta de fondo 0 es el exterior: filas virtuales sobre y bajo la imagen
+    total_fondo = 1
+    fila = 0
+
+    for banda in _bandas(fuente, alto_banda):
+        binaria = (np.asarray(banda) > umbral).astype(np.uint8)
+        num, labels, stats, centroides = cv2.connectedComponentsWithStats(
+            binaria, connectivity=connectivity, ltype=cv2.CV_32S)
+        k = num - 1
+        area = stats[1:, cv2.CC_STAT_AREA].astype(np.int64)
+        ancho = binaria.shape[1]
+
+        if frente_anterior is None:
+            frente_anterior = np.full(ancho + 2, -1, dtype=np.int64)
+            fondo_anterior = np.zeros(ancho + 2, dtype=np.int64)
+
+        # Etiquetas globales con la última fila de la banda anterior encima y una
+        # columna de fondo a cada lado (el fondo que toca los bordes queda unido al exterior)
+        frente = np.full((binaria.shape[0] + 1, ancho + 2), -1, dtype=np.int64)
+        frente[0] = frente_anterior
+        np.add(labels, total - 1, out=frente[1:, 1:-1])
+        frente[1:, 1:-1][labels == 0] = -1
+        num_fondo, fondo_local = cv2.connectedComponents(
+            cv2.copyMakeBorder(1 - binaria, 0, 0, 1, 1, cv2.BORDER_CONSTANT, value=1),
+            connectivity=4, ltype=cv2.CV_32S)
+        fondo = np.empty_like(frente)
+        fondo[0] = fondo_anterior
+        np.add(fondo_local, total_fondo - 1, out=fondo[1:])
+        fondo[1:][fondo_local == 0] = -1
+        del fondo_local
+
+        a, b, _ = _pares_costura(frente[0, 1:-1], frente[1, 1:-1], connectivity)
+        uniones_a.append(a)
+        uniones_b.append(b)
+        a, b, _ = _pares_costura(fondo[0], fondo[1], 4)
+        uniones_fondo_a.append(a)
+        uniones_fondo_b.append(b)
+        aportes, pares = _aportes_contorno(frente, fondo)
+        contornos.append(aportes)
+        diagonales.append(pares)
+
+        # Primer píxel de cada componente (orden de filas) y fondo justo encima
+        plano = labels.ravel()
+        indices = np.flatnonzero(plano)
+        primero = np.zeros(num, dtype=np.int64)
+        primero[plano[indices[::-1]]] = indices[::-1]
+        y, x = np.divmod(primero[1:], ancho)
+        arriba = fondo[y, x + 1]
+
+        frente_anterior, fondo_anterior = frente[-1].copy(), fondo[-1].copy()
+        trozos['area'].append(area)
+        trozos['suma_x'].append(np.rint(centroides[1:, 0] * area))
+        trozos['suma_y'].append(np.rint(centroides[1:, 1] * area) + fila * area)
+        trozos['x_min'].append(stats[1:, cv2.CC_STAT_LEFT].astype(np.int64))
+        trozos['y_min'].append(stats[1:, cv2.CC_STAT_TOP].astype(np.int64) + fila)
+        trozos['x_max'].append(trozos['x_min'][-1] + stats[1:, cv2.CC_STAT_WIDTH] - 1)
+        trozos['y_max'].append(trozos['y_min'][-1] + stats[1:, cv2.CC_STAT_HEIGHT] - 1)
+        trozos['primero'].append((y + fila) * ancho + x)
+        trozos['arriba'].append(arriba)
+
+        total += k
+        total_fondo += num_fondo - 1
+        fila += binaria.shape[0]
+
+    if frente_anterior is not None:
+        # Costura con la fila virtual de fondo bajo la imagen
+        exterior = np.zeros_like(fondo_anterior)
+        a, b, _ = _pares_costura(fondo_anterior, exterior, 4)
+        uniones_fondo_a.append(a)
+        uniones_fondo_b.append(b)
+        aportes, pares = _aportes_contorno(np.vstack((frente_anterior, np.full_like(frente_anterior, -1))),
+                                           np.vstack((fondo_anterior, exterior)))
+        contornos.append(aportes)
+        diagonales.append(pares)
+
+    datos = {clave: np.concatenate(valores) if valores else np.empty(0, np.int64) for clave, valores in trozos.items()}
+    a = np.concatenate(uniones_a) if uniones_a else np.empty(0, np.int64)
+    b = np.concatenate(uniones_b) if uniones_b else np.empty(0, np.int64)
+    raiz = unir_etiquetas(total, a, b)
+
+    # El fondo en diagonal entre dos componentes distintas queda unido
+    vacio = (np.empty(0, np.int64),) * 4
+    mayor, menor, fondo_a, fondo_b = (np.concatenate(c) for c in zip(*diagonales)) if diagonales else vacio
+    distintas = raiz[mayor] != raiz[menor]
+    uniones_fondo_a.append(fondo_a[distintas])
+    uniones_fondo_b.append(fondo_b[distintas])
+    raiz_fondo = unir_etiquetas(total_fondo, np.concatenate(uniones_fondo_a), np.concatenate(uniones_fondo_b))
+
+    # Agregar las etiquetas provisionales por componente (raíces en orden de aparición)
+    raices = np.flatnonzero(raiz == np.arange(total))
+    indice = np.searchsorted(raices, raiz)
+    m = raices.size
+    area = np.bincount(indice, weights=datos['area'], minlength=m).astype(np.int64)
+    suma_x = np.bincount(indice, weights=datos['suma_x'], minlength=m)
+    suma_y = np.bincount(indice, weights=datos['suma_y'], minlength=m)
+    x_min = np.full(m, np.iinfo(np.int64).max, dtype=np.int64)
+    y_min = np.full(m, np.iinfo(np.int64).max, dtype=np.int64)
+    x_max = np.full(m, -1, dtype=np.int64)
+    y_max = np.full(m, -1, dtype=np.int64)
+    np.minimum.at(x_min, indice, datos['x_min'].astype(np.int64))
+    np.minimum.at(y_min, indice, datos['y_min'].astype(np.int64))
+    np.maximum.at(x_max, indice, datos['x_max'].astype(np.int64))
+    np.maximum.at(y_max, indice, datos['y_max'].astype(np.int64))
+
+    # Fondo que rodea a cada componente: el que está sobre su primer píxel
+    rodea = np.zeros(m, dtype=np.int64)
+    orden = np.argsort(datos['primero'], kind='stable')[::-1]
+    rodea[indice[orden]] = raiz_fondo[datos['arriba'][orden]]
+    componente, otra, etiqueta_fondo, aporte = (np.concatenate(c) for c in zip(*contornos)) if contornos else vacio
+    componente = indice[componente]
+    externo = (raiz_fondo[etiqueta_fondo] == rodea[componente]) & (indice[otra] == componente)
+    perimetro = np.bincount(componente[externo], weights=aporte[externo], minlength=m)
+
+    conservar = area >= area_minima
+    area = area[conservar]
+    ancho = (x_max - x_min + 1)[conservar]
+    alto = (y_max - y_min + 1)[conservar]
+    perimetro = perimetro[conservar]
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        circularidad = np.where(perimetro > 0, 4 * np.pi * area / perimetro ** 2, 0.0)
+
+    return {
+        'etiqueta': np.arange(1, area.size + 1, dtype=np.int64),
+        'area': area,
+        'perimetro': perimetro,
+        'centroide_x': suma_x[conservar] / area,
+        'centroide_y': suma_y[conservar] / area,
+        'bbox_x': x_min[conservar],
+        'bbox_y': y_min[conservar],
+        'bbox_ancho': ancho,
+        'bbox_alto': alto,
+        'aspect_ratio': ancho / alto,
+        'circularidad': circularidad,
+    }
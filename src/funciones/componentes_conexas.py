@@ -2,37 +2,73 @@
 Funciones de análisis de componentes conexas.
 """
 
+import os
+from concurrent.futures import ThreadPoolExecutor
+
 import cv2
 import numpy as np
 
+from .arbol_componentes import longitud_contorno_externo
+from .componentes_bandas import _pares_costura, unir_etiquetas
+from .componentes_rle import ComponentesRLE
+from .morfologia import TAMANO_MINIMO_DESCOMPOSICION, SecuenciaMorfologica
+from .separacion_objetos import separar_objetos_tocando
+from .instrumentacion import instrumentar
+
+
+# Tamaño a partir del cual etiquetar_componentes reparte el trabajo en franjas
+PIXELES_MINIMOS_PARALELO = 4_000_000
+FILAS_MINIMAS_FRANJA = 256
+
 
-def preprocesar_imagen(img, usar_morfo=True, kernel_size=3):
+@instrumentar
+def preprocesar_imagen(img, usar_morfo=True, kernel_size=3, secuencia=None, rellenar=False, limpiar_borde=False,
+                       separar=False):
     """
     Preprocesa la imagen binaria para mejorar la detección de componentes.
     
+    Por defecto aplica cierre y apertura con una elipse; las dos erosiones
+    centrales se fusionan en una sola pasada (ver SecuenciaMorfologica).
+    
     Args:
         img: Imagen binaria
         usar_morfo: Si aplicar operaciones morfológicas
         kernel_size: Tamaño del kernel morfológico
+        secuencia: SecuenciaMorfologica o lista de pasos (operacion, forma, tamano)
+                   que reemplaza al cierre + apertura por defecto
+        rellenar: Si rellenar los huecos de los objetos
+        limpiar_borde: Si eliminar los objetos que tocan el borde
+        separar: Si separar los objetos que se tocan (ver separar_objetos_tocando)
     
     Returns:
         Imagen preprocesada
     """
-    img_proc = img.copy()
-    
+    pasos = []
+    # Una secuencia propia conserva su umbral de descomposición
+    tamano_minimo = TAMANO_MINIMO_DESCOMPOSICION
     if usar_morfo:
-        # Crear kernel
-        kernel = cv2.getStructuringElement(cv2.MORPH_ELLIPSE, (kernel_size, kernel_size))
-        
-        # Closing: cerrar pequeños agujeros
-        img_proc = cv2.morphologyEx(img_proc, cv2.MORPH_CLOSE, kernel)
-        
-        # Opening: eliminar ruido pequeño
-        img_proc = cv2.morphologyEx(img_proc, cv2.MORPH_OPEN, kernel)
+        if secuencia is None:
+            # Closing: cerrar pequeños agujeros; Opening: eliminar ruido pequeño
+            secuencia = [('cerrar', 'elipse', kernel_size), ('abrir', 'elipse', kernel_size)]
+        if isinstance(secuencia, SecuenciaMorfologica):
+            pasos += secuencia.pasos
+            tamano_minimo = secuencia.tamano_minimo_descomposicion
+        else:
+            pasos += list(secuencia)
+    if rellenar:
+        pasos.append(('rellenar_huecos', 'elipse', 3))
+    if limpiar_borde:
+        pasos.append(('eliminar_borde', 'elipse', 3))
+    
+    img_proc = SecuenciaMorfologica(pasos, tamano_minimo).aplicar(img) if pasos else img.copy()
+    
+    if separar:
+        img_proc = separar_objetos_tocando(img_proc)
     
     return img_proc
 
 
+@instrumentar
 def filtrar_componentes_pequenas(labels, area_minima):
     """
     Filtra componentes con área menor al umbral.
@@ -45,27 +81,122 @@ def filtrar_componentes_pequenas(labels, area_minima):
         labels_filtradas: Matriz de etiquetas filtrada
         componentes_eliminadas: Número de componentes eliminadas
     """
-    labels_filtradas = labels.copy()
-    componentes_eliminadas = 0
+    # Área de todas las etiquetas en una pasada y reetiquetado con una tabla de búsqueda
+    area = np.bincount(labels.ravel(), minlength=int(labels.max()) + 1)
+    componentes_eliminadas = int(np.count_nonzero(area[1:] < area_minima))
+    conservar = (area >= area_minima) & (area > 0)
+    conservar[0] = False
     
-    # Obtener área de cada componente
-    for lab in range(1, labels.max() + 1):
-        area = np.sum(labels == lab)
-        if area < area_minima:
-            labels_filtradas[labels == lab] = 0
-            componentes_eliminadas += 1
+    lut = np.zeros(area.size, dtype=labels.dtype)
+    lut[conservar] = np.arange(1, np.count_nonzero(conservar) + 1)
+    labels_nuevas = lut[labels]
     
-    # Reetiquetar componentes restantes
-    labels_unicas = np.unique(labels_filtradas)
-    labels_nuevas = np.zeros_like(labels_filtradas)
+    return labels_nuevas, componentes_eliminadas
+
+
+# Columnas de la tabla de componentes, en orden de presentación
+COLUMNAS_COMPONENTES = (
+    'etiqueta', 'area', 'perimetro', 'centroide_x', 'centroide_y',
+    'bbox_x', 'bbox_y', 'bbox_ancho', 'bbox_alto', 'aspect_ratio', 'circularidad'
+)
+
+
+@instrumentar
+def tabla_componentes(labels):
+    """
+    Calcula las estadísticas de todas las componentes en forma de columnas.
     
-    for idx, lab in enumerate(labels_unicas):
-        if lab != 0:
-            labels_nuevas[labels_filtradas == lab] = idx
+    Área, centroide y bounding box se obtienen en una sola pasada vectorizada
+    sobre los píxeles de primer plano; el perímetro se mide con findContours
+    sobre el recorte de cada componente en lugar de la imagen completa.
     
-    return labels_nuevas, componentes_eliminadas
+    Args:
+        labels: Matriz de etiquetas
+    
+    Returns:
+        dict columna -> numpy array (una fila por etiqueta 1..max, ver COLUMNAS_COMPONENTES)
+    """
+    n = int(labels.max()) if labels.size else 0
+    
+    ys, xs = np.nonzero(labels)
+    lab = labels[ys, xs]
+    area = np.bincount(lab, minlength=n + 1)[1:].astype(np.int64)
+    suma_x = np.bincount(lab, weights=xs, minlength=n + 1)[1:]
+    suma_y = np.bincount(lab, weights=ys, minlength=n + 1)[1:]
+    
+    # Agrupar píxeles por etiqueta; el orden estable conserva las filas ordenadas
+    orden = np.argsort(lab, kind='stable')
+    lab_ord = lab[orden]
+    ys_ord = ys[orden]
+    xs_ord = xs[orden]
+    inicios = np.flatnonzero(np.r_[True, lab_ord[1:] != lab_ord[:-1]]) if lab_ord.size else np.empty(0, np.intp)
+    finales = np.r_[inicios[1:], lab_ord.size]
+    presentes = lab_ord[inicios] - 1
+    
+    x0 = np.zeros(n, np.int64)
+    y0 = np.zeros(n, np.int64)
+    x1 = np.full(n, -1, np.int64)
+    y1 = np.full(n, -1, np.int64)
+    if presentes.size:
+        y0[presentes] = ys_ord[inicios]
+        y1[presentes] = ys_ord[finales - 1]
+        x0[presentes] = np.minimum.reduceat(xs_ord, inicios)
+        x1[presentes] = np.maximum.reduceat(xs_ord, inicios)
+    ancho = x1 - x0 + 1
+    alto = y1 - y0 + 1
+    
+    perimetro = np.zeros(n, np.float64)
+    for i in presentes:
+        perimetro[i] = longitud_contorno_externo(labels[y0[i]:y1[i] + 1, x0[i]:x1[i] + 1] == i + 1)
+    
+    with np.errstate(divide='ignore', invalid='ignore'):
+        centroide_x = np.where(area > 0, suma_x / area, 0.0)
+        centroide_y = np.where(area > 0, suma_y / area, 0.0)
+        aspect_ratio = np.where(alto > 0, ancho / alto, 0.0)
+        # Circularidad (4π * área / perímetro²)
+        circularidad = np.where(perimetro > 0, 4 * np.pi * area / perimetro ** 2, 0.0)
+    
+    return {
+        'etiqueta': np.arange(1, n + 1, dtype=np.int64),
+        'area': area,
+        'perimetro': perimetro,
+        'centroide_x': centroide_x,
+        'centroide_y': centroide_y,
+        'bbox_x': x0,
+        'bbox_y': y0,
+        'bbox_ancho': np.maximum(ancho, 0),
+        'bbox_alto': np.maximum(alto, 0),
+        'aspect_ratio': aspect_ratio,
+        'circularidad': circularidad,
+    }
 
 
+def exportar_tabla_componentes(tabla, ruta):
+    """
+    Guarda la tabla de componentes en CSV o Parquet según la extensión.
+    
+    Parquet requiere pyarrow (dependencia opcional).
+    
+    Args:
+        tabla: dict columna -> numpy array (ver tabla_componentes)
+        ruta: Archivo de salida (.csv o .parquet)
+    """
+    if ruta.lower().endswith('.parquet'):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError as e:
+            raise ImportError("Exportar a Parquet requiere pyarrow (pip install pyarrow)") from e
+        pq.write_table(pa.table(tabla), ruta)
+        return
+    
+    columnas = list(tabla)
+    formatos = ['%d' if np.issubdtype(tabla[c].dtype, np.integer) else '%.6g' for c in columnas]
+    datos = np.column_stack([tabla[c] for c in columnas]) if columnas else np.empty((0, 0))
+    np.savetxt(ruta, datos, fmt=formatos, delimiter=',', header=','.join(columnas), comments='')
+
+
+@instrumentar
 def obtener_estadisticas_componentes(labels):
     """
     Calcula estadísticas de las componentes conexas.
@@ -76,57 +207,36 @@ def obtener_estadisticas_componentes(labels):
     Returns:
         dict con estadísticas de cada componente
     """
+    tabla = tabla_componentes(labels)
     estadisticas = []
     
-    for lab in range(1, labels.max() + 1):
-        mask = (labels == lab).astype(np.uint8)
-        
-        # Área
-        area = np.sum(mask)
-        
-        # Perímetro
-        contours, _ = cv2.findContours(mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
-        perimetro = cv2.arcLength(contours[0], True) if contours else 0
-        
-        # Centroide
-        M = cv2.moments(mask)
-        if M["m00"] != 0:
-            cx = int(M["m10"] / M["m00"])
-            cy = int(M["m01"] / M["m00"])
-        else:
-            cx, cy = 0, 0
-        
-        # Bounding box
-        if contours:
-            x, y, w, h = cv2.boundingRect(contours[0])
-            aspect_ratio = float(w) / h if h > 0 else 0
-        else:
-            x, y, w, h = 0, 0, 0, 0
-            aspect_ratio = 0
-        
-        # Circularidad (4π * área / perímetro²)
-        circularidad = (4 * np.pi * area) / (perimetro ** 2) if perimetro > 0 else 0
-        
+    for i in range(len(tabla['etiqueta'])):
         estadisticas.append({
-            'etiqueta': lab,
-            'area': area,
-            'perimetro': perimetro,
-            'centroide': (cx, cy),
-            'bbox': (x, y, w, h),
-            'aspect_ratio': aspect_ratio,
-            'circularidad': circularidad
+            'etiqueta': int(tabla['etiqueta'][i]),
+            'area': int(tabla['area'][i]),
+            'perimetro': float(tabla['perimetro'][i]),
+            'centroide': (int(tabla['centroide_x'][i]), int(tabla['centroide_y'][i])),
+            'bbox': (int(tabla['bbox_x'][i]), int(tabla['bbox_y'][i]),
+                     int(tabla['bbox_ancho'][i]), int(tabla['bbox_alto'][i])),
+            'aspect_ratio': float(tabla['aspect_ratio'][i]),
+            'circularidad': float(tabla['circularidad'][i])
         })
     
     return estadisticas
 
 
-def etiquetar_componentes(bin_img, connectivity=8):
+@instrumentar
+def etiquetar_componentes(bin_img, connectivity=8, trabajadores=None):
     """
     Etiqueta componentes conexas usando OpenCV con estadísticas.
     
+    En imágenes grandes el etiquetado se reparte en franjas horizontales
+    (ver etiquetar_componentes_paralelo); el resultado es idéntico.
+    
     Args:
         bin_img: Imagen binaria
         connectivity: 4 u 8
+        trabajadores: Número de hilos (None decide según el tamaño y los núcleos)
     
     Returns:
         num_labels: número de componentes
@@ -137,12 +247,130 @@ def etiquetar_componentes(bin_img, connectivity=8):
     if bin_img.dtype != np.uint8:
         bin_img = bin_img.astype(np.uint8)
     
+    if trabajadores is None:
+        trabajadores = (os.cpu_count() or 1) if bin_img.size >= PIXELES_MINIMOS_PARALELO else 1
+    if trabajadores > 1:
+        return etiquetar_componentes_paralelo(bin_img, connectivity, trabajadores)
+    
     # Usar connectedComponentsWithStats para obtener más información
     num_labels, labels, stats, centroids = cv2.connectedComponentsWithStats(bin_img, connectivity=connectivity)
     
     return num_labels, labels, stats, centroids
 
 
+def _limites_franjas(alto, trabajadores):
+    """Filas de inicio y fin de cada franja (alto par para respetar los bloques 2x2 de OpenCV)."""
+    franjas = max(1, min(trabajadores, alto // FILAS_MINIMAS_FRANJA))
+    paso = -(-alto // franjas)
+    paso += paso % 2
+    return [(inicio, min(inicio + paso, alto)) for inicio in range(0, alto, paso)]
+
+
+@instrumentar
+def etiquetar_componentes_paralelo(bin_img, connectivity=8, trabajadores=None):
+    """
+    Etiqueta componentes conexas en franjas horizontales procesadas en paralelo.
+    
+    Cada franja se etiqueta con cv2.connectedComponentsWithStats en un hilo;
+    las etiquetas que se tocan en las costuras se unen con union-find y se
+    reasignan con una única tabla de búsqueda por franja. La salida (número de
+    etiquetas, matriz, estadísticas y centroides, incluido el fondo) es
+    idéntica a la de cv2.connectedComponentsWithStats.
+    
+    Args:
+        bin_img: Imagen binaria uint8
+        connectivity: 4 u 8
+        trabajadores: Número de hilos (None usa os.cpu_count())
+    
+    Returns:
+        num_labels, labels, stats, centroids como cv2.connectedComponentsWithStats
+    """
+    if bin_img.dtype != np.uint8:
+        bin_img = bin_img.astype(np.uint8)
+    trabajadores = trabajadores or os.cpu_count() or 1
+    limites = _limites_franjas(bin_img.shape[0], trabajadores)
+    
+    def etiquetar(limite):
+        return cv2.connectedComponentsWithStats(bin_img[limite[0]:limite[1]], connectivity=connectivity,
+                                                ltype=cv2.CV_32S)
+    
+    with ThreadPoolExecutor(max_workers=trabajadores) as ejecutor:
+        franjas = list(ejecutor.map(etiquetar, limites))
+        
+        # Etiquetas provisionales globales: desplazamiento acumulado de cada franja
+        conteos = [num - 1 for num, _, _, _ in franjas]
+        desplazamientos = np.concatenate(([0], np.cumsum(conteos)))
+        total = int(desplazamientos[-1])
+        
+        uniones_a, uniones_b = [], []
+        for i in range(1, len(franjas)):
+            ultima = franjas[i - 1][1][-1]
+            primera = franjas[i][1][0]
+            a, b, _ = _pares_costura(np.where(ultima > 0, ultima - 1 + desplazamientos[i - 1], -1),
+                                     np.where(primera > 0, primera - 1 + desplazamientos[i], -1),
+                                     connectivity)
+            uniones_a.append(a)
+            uniones_b.append(b)
+        raiz = unir_etiquetas(total,
+                              np.concatenate(uniones_a) if uniones_a else np.empty(0, np.int64),
+                              np.concatenate(uniones_b) if uniones_b else np.empty(0, np.int64))
+        
+        # Las raíces son la etiqueta provisional más baja de cada componente: orden de OpenCV
+        raices = np.flatnonzero(raiz == np.arange(total))
+        final = (np.searchsorted(raices, raiz) + 1).astype(np.int32)
+        num_labels = raices.size + 1
+        
+        labels = np.empty(bin_img.shape, dtype=np.int32)
+        
+        def reetiquetar(i):
+            lut = np.concatenate(([0], final[desplazamientos[i]:desplazamientos[i + 1]])).astype(np.int32)
+            inicio, fin = limites[i]
+            np.take(lut, franjas[i][1], out=labels[inicio:fin])
+        
+        list(ejecutor.map(reetiquetar, range(len(franjas))))
+    
+    # Combinar estadísticas: fondo por franja y componentes por etiqueta final
+    area = np.zeros(num_labels, dtype=np.int64)
+    suma_x = np.zeros(num_labels, dtype=np.float64)
+    suma_y = np.zeros(num_labels, dtype=np.float64)
+    izquierda = np.full(num_labels, np.iinfo(np.int64).max, dtype=np.int64)
+    arriba = np.full(num_labels, np.iinfo(np.int64).max, dtype=np.int64)
+    derecha = np.full(num_labels, -1, dtype=np.int64)
+    abajo = np.full(num_labels, -1, dtype=np.int64)
+    
+    for i, (_, _, stats_franja, centroides_franja) in enumerate(franjas):
+        fila = limites[i][0]
+        destino = np.concatenate(([0], final[desplazamientos[i]:desplazamientos[i + 1]]))
+        presentes = stats_franja[:, cv2.CC_STAT_AREA] > 0
+        destino = destino[presentes]
+        st = stats_franja[presentes].astype(np.int64)
+        area_franja = st[:, cv2.CC_STAT_AREA]
+        np.add.at(area, destino, area_franja)
+        np.add.at(suma_x, destino, np.rint(centroides_franja[presentes, 0] * area_franja))
+        np.add.at(suma_y, destino, np.rint(centroides_franja[presentes, 1] * area_franja) + fila * area_franja)
+        np.minimum.at(izquierda, destino, st[:, cv2.CC_STAT_LEFT])
+        np.minimum.at(arriba, destino, st[:, cv2.CC_STAT_TOP] + fila)
+        np.maximum.at(derecha, destino, st[:, cv2.CC_STAT_LEFT] + st[:, cv2.CC_STAT_WIDTH] - 1)
+        np.maximum.at(abajo, destino, st[:, cv2.CC_STAT_TOP] + st[:, cv2.CC_STAT_HEIGHT] - 1 + fila)
+    
+    stats = np.empty((num_labels, 5), dtype=np.int32)
+    stats[:, cv2.CC_STAT_LEFT] = izquierda
+    stats[:, cv2.CC_STAT_TOP] = arriba
+    stats[:, cv2.CC_STAT_WIDTH] = derecha - izquierda + 1
+    stats[:, cv2.CC_STAT_HEIGHT] = abajo - arriba + 1
+    stats[:, cv2.CC_STAT_AREA] = area
+    with np.errstate(divide='ignore', invalid='ignore'):
+        centroids = np.column_stack((suma_x / area, suma_y / area))
+    
+    # Sin píxeles de fondo OpenCV reporta valores centinela que no se pueden combinar
+    if area[0] == 0:
+        stats[0] = franjas[0][2][0]
+        centroids[0] = np.nan
+    
+    return num_labels, labels, stats, centroids
+
+
+@instrumentar
 def extraer_componente_mas_grande(labels):
     """
     Retorna la etiqueta de la componente más grande (excluyendo fondo).
@@ -158,6 +386,7 @@ def extraer_componente_mas_grande(labels):
     return max(lab_counts.items(), key=lambda x: x[1])[0] if lab_counts else None
 
 
+@instrumentar
 def colorear_etiquetas(labels):
     """
     Convierte matriz de etiquetas en imagen RGB coloreada.
@@ -168,45 +397,77 @@ def colorear_etiquetas(labels):
     Returns:
         Imagen RGB coloreada
     """
-    h, w = labels.shape
-    out = np.zeros((h, w, 3), dtype=np.uint8)
-    n = labels.max()
+    n = int(labels.max()) if labels.size else 0
     
+    # Paleta como tabla de búsqueda: una sola indexación para toda la imagen
     rng = np.random.default_rng(12345)
-    palette = [(0, 0, 0)] + [tuple(rng.integers(50, 230, size=3).tolist()) for _ in range(n)]
+    palette = np.zeros((n + 1, 3), dtype=np.uint8)
+    palette[1:] = rng.integers(50, 230, size=(n, 3))
     
-    for lab in range(0, n+1):
-        out[labels == lab] = palette[lab]
-    return out
+    return palette[labels]
+
+
+def fronteras_etiquetas(labels):
+    """
+    Marca los píxeles en los que cambia la etiqueta respecto a un 4-vecino.
+    
+    Se compara la matriz con sus desplazamientos horizontal y vertical en una
+    sola pasada; cada cambio marca los dos píxeles que lo forman, por lo que
+    la frontera tiene dos píxeles de grosor. Las regiones que tocan el borde
+    de la imagen también se cierran sobre él.
+    
+    Args:
+        labels: Matriz de etiquetas
+    
+    Returns:
+        Máscara booleana de fronteras
+    """
+    borde = np.zeros(labels.shape, dtype=bool)
+    if labels.size == 0:
+        return borde
+    
+    cambio = labels[:, 1:] != labels[:, :-1]
+    borde[:, 1:] |= cambio
+    borde[:, :-1] |= cambio
+    cambio = labels[1:] != labels[:-1]
+    borde[1:] |= cambio
+    borde[:-1] |= cambio
+    
+    borde[[0, -1], :] |= labels[[0, -1], :] != 0
+    borde[:, [0, -1]] |= labels[:, [0, -1]] != 0
+    return borde
 
 
-def comparar_segmentaciones(original_bin, labels):
+@instrumentar
+def comparar_segmentaciones(original_bin, labels, num_original=None):
     """
     Compara segmentación original con etiquetada y dibuja fronteras.
     
+    Las fronteras de todas las etiquetas se extraen y dibujan en una sola
+    pasada (ver fronteras_etiquetas).
+    
     Args:
         original_bin: Imagen binaria original
         labels: Matriz de etiquetas
+        num_original: Número de componentes de la original si ya se conoce
+                      (evita volver a etiquetarla)
     
     Returns:
-        Imagen con fronteras dibujadas
+        overlay: Imagen con fronteras dibujadas
+        num_original: Componentes de la imagen original
+        num_etiquetado: Componentes de la matriz de etiquetas
     """
-    num_orig, _ = cv2.connectedComponents(original_bin)
-    num_new = int(labels.max())
-    
-    print(f"Componentes (original): {num_orig - 1}")
-    print(f"Componentes (etiquetado): {num_new}")
+    if num_original is None:
+        num_original = cv2.connectedComponents((original_bin > 0).astype(np.uint8))[0] - 1
+    num_etiquetado = int(labels.max()) if labels.size else 0
     
     overlay = cv2.cvtColor((original_bin > 0).astype(np.uint8) * 255, cv2.COLOR_GRAY2BGR)
+    overlay[fronteras_etiquetas(labels)] = (0, 255, 0)
     
-    for lab in range(1, num_new+1):
-        mask = (labels == lab).astype(np.uint8) * 255
-        contours, _ = cv2.findContours(mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
-        cv2.drawContours(overlay, contours, -1, (0, 255, 0), 2)
-    
-    return overlay
+    return overlay, int(num_original), num_etiquetado
 
 
+@instrumentar
 def dibujar_regiones_numeradas(labels, original_bin=None, mostrar_info=True):
     """
     Dibuja cada región etiquetada con contorno, número y opcionalmente información adicional.
@@ -220,59 +481,56 @@ def dibujar_regiones_numeradas(labels, original_bin=None, mostrar_info=True):
         Imagen con regiones numeradas
     """
     h, w = labels.shape
+    out = np.zeros((h, w, 3), dtype=np.uint8)
+    
+    # Corridas por fila: áreas y momentos en O(corridas) y máscaras solo en la caja de cada región
+    rle = ComponentesRLE.desde_etiquetas(labels)
+    areas = rle.areas()
+    m00, m10, m01 = rle.momentos()
 
-    # Crear fondo negro
-    bg = np.zeros((h, w, 3), dtype=np.uint8)
-
-    n = int(labels.max())
-    # Fondo negro, componentes blancas
-    palette = [(0, 0, 0)] + [(255, 255, 255) for _ in range(n)]
-
-    out = bg.copy()
-
-    for lab in range(1, n+1):
-        mask = (labels == lab).astype(np.uint8)
+    for lab in range(1, rle.num_labels):
+        if areas[lab] == 0:
+            continue
+        mask, (x0, y0) = rle.mascara(lab, recortar=True, margen=1)
         
-        # Colorear región
-        out[mask > 0] = palette[lab]
+        # Colorear región (fondo negro, componentes blancas)
+        region = out[y0 + 1:y0 + mask.shape[0] - 1, x0 + 1:x0 + mask.shape[1] - 1]
+        region[mask[1:-1, 1:-1] > 0] = (255, 255, 255)
         
         # Dibujar contorno blanco más grueso
-        contours, _ = cv2.findContours(mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+        contours, _ = cv2.findContours(mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE, offset=(x0, y0))
         if not contours:
             continue
             
         cv2.drawContours(out, contours, -1, (200, 200, 200), 2)
         
         # Calcular centroide y área
-        M = cv2.moments(mask)
-        area = np.sum(mask)
+        area = int(areas[lab])
+        cx = int(m10[lab] / m00[lab])
+        cy = int(m01[lab] / m00[lab])
         
-        if M["m00"] != 0:
-            cx = int(M["m10"] / M["m00"])
-            cy = int(M["m01"] / M["m00"])
-            
-            # Dibujar número grande y visible
-            font_scale = 0.8
-            thickness = 2
-            
-            # Texto con fondo para mejor visibilidad
-            text = str(lab)
-            (text_w, text_h), _ = cv2.getTextSize(text, cv2.FONT_HERSHEY_BOLD, font_scale, thickness)
-            
-            # Dibujar rectángulo de fondo
-            cv2.rectangle(out, (cx - text_w//2 - 5, cy - text_h//2 - 5), 
-                         (cx + text_w//2 + 5, cy + text_h//2 + 5), (0, 0, 0), -1)
-            
-            # Dibujar número en negro con borde blanco
-            cv2.putText(out, text, (cx - text_w//2, cy + text_h//2), 
-                       cv2.FONT_HERSHEY_BOLD, font_scale, (0, 0, 0), thickness + 2)
-            cv2.putText(out, text, (cx - text_w//2, cy + text_h//2), 
-                       cv2.FONT_HERSHEY_BOLD, font_scale, (255, 255, 255), thickness)
-            
-            # Mostrar área si está activado
-            if mostrar_info and area > 100:
-                info_text = f"A:{area}px"
-                cv2.putText(out, info_text, (cx - 30, cy + 25), 
-                           cv2.FONT_HERSHEY_SIMPLEX, 0.4, (200, 200, 0), 1)
+        # Dibujar número grande y visible
+        font_scale = 0.8
+        thickness = 2
+        
+        # Texto con fondo para mejor visibilidad
+        text = str(lab)
+        (text_w, text_h), _ = cv2.getTextSize(text, cv2.FONT_HERSHEY_DUPLEX, font_scale, thickness)
+        
+        # Dibujar rectángulo de fondo
+        cv2.rectangle(out, (cx - text_w//2 - 5, cy - text_h//2 - 5), 
+                     (cx + text_w//2 + 5, cy + text_h//2 + 5), (0, 0, 0), -1)
+        
+        # Dibujar número en negro con borde blanco
+        cv2.putText(out, text, (cx - text_w//2, cy + text_h//2), 
+                   cv2.FONT_HERSHEY_DUPLEX, font_scale, (0, 0, 0), thickness + 2)
+        cv2.putText(out, text, (cx - text_w//2, cy + text_h//2), 
+                   cv2.FONT_HERSHEY_DUPLEX, font_scale, (255, 255, 255), thickness)
+        
+        # Mostrar área si está activado
+        if mostrar_info and area > 100:
+            info_text = f"A:{area}px"
+            cv2.putText(out, info_text, (cx - 30, cy + 25), 
+                       cv2.FONT_HERSHEY_SIMPLEX, 0.4, (200, 200, 0), 1)
 
     return out
@@ -0,0 +1,228 @@
+"""
+Representación compacta de componentes conexas por longitud de corridas (RLE).
+
+Cada fila de la matriz de etiquetas se describe como una lista de corridas
+(fila, inicio, fin, etiqueta) sin el fondo. Área, caja envolvente y momentos
+se calculan en O(corridas) y la máscara de una componente se reconstruye
+solo dentro de su caja, sin recorrer la imagen completa.
+"""
+
+import numpy as np
+
+from .instrumentacion import medir_operacion
+
+
+def dtype_etiquetas(num_labels):
+    """
+    Tipo entero más pequeño capaz de almacenar las etiquetas 0..num_labels-1.
+
+    Args:
+        num_labels: Número de etiquetas incluyendo el fondo
+
+    Returns:
+        np.uint8, np.uint16 o np.int32
+    """
+    if num_labels <= np.iinfo(np.uint8).max + 1:
+        return np.uint8
+    if num_labels <= np.iinfo(np.uint16).max + 1:
+        return np.uint16
+    return np.int32
+
+
+def compactar_etiquetas(labels):
+    """
+    Convierte una matriz de etiquetas al tipo entero más pequeño que la representa.
+
+    Args:
+        labels: Matriz de etiquetas
+
+    Returns:
+        Matriz de etiquetas con dtype uint8, uint16 o int32
+    """
+    dtype = dtype_etiquetas(int(labels.max(initial=0)) + 1)
+    return labels if labels.dtype == dtype else labels.astype(dtype)
+
+
+class ComponentesRLE:
+    """
+    Componentes conexas codificadas como corridas horizontales por fila.
+
+    Las corridas se guardan en orden de barrido (fila, columna); un índice
+    ordenado por etiqueta permite acceder a las corridas de una componente
+    sin recorrer las demás.
+
+    Attributes:
+        forma: (alto, ancho) de la matriz original
+        num_labels: Número de etiquetas incluyendo el fondo
+        fila, inicio, fin: Fila, columna inicial y columna final (exclusiva) de cada corrida
+        etiqueta: Etiqueta de cada corrida (nunca 0)
+    """
+
+    def __init__(self, forma, fila, inicio, fin, etiqueta, num_labels=None):
+        self.forma = tuple(forma)
+        self.fila = fila
+        self.inicio = inicio
+        self.fin = fin
+        self.etiqueta = etiqueta
+        self.num_labels = int(etiqueta.max(initial=0)) + 1 if num_labels is None else int(num_labels)
+
+        self._orden = np.argsort(etiqueta, kind='stable')
+        self._limites = np.searchsorted(etiqueta[self._orden], np.arange(self.num_labels + 1))
+
+    @classmethod
+    def desde_etiquetas(cls, labels):
+        """
+        Codifica una matriz de etiquetas.
+
+        Args:
+            labels: Matriz 2D de etiquetas (0 = fondo)
+
+        Returns:
+            ComponentesRLE
+        """
+        with medir_operacion("ComponentesRLE", (labels,)):
+            ancho = labels.shape[1]
+            if labels.size == 0:
+                vacio = np.empty(0, dtype=np.int64)
+                return cls(labels.shape, vacio, vacio, vacio, vacio, 1)
+
+            # Una corrida empieza en la primera columna y donde cambia la etiqueta
+            comienza = np.ones(labels.shape, dtype=bool)
+            comienza[:, 1:] = labels[:, 1:] != labels[:, :-1]
+            posiciones = np.flatnonzero(comienza)
+            # El final de cada corrida es el comienzo de la siguiente (las filas empiezan corrida)
+            finales = np.append(posiciones[1:], labels.size)
+
+            valores = labels.ravel()[posiciones]
+            conservar = valores != 0
+            posiciones, finales, valores = posiciones[conservar], finales[conservar], valores[conservar]
+
+            fila = posiciones // ancho
+            inicio = posiciones - fila * ancho
+            return cls(labels.shape, fila, inicio, inicio + (finales - posiciones), valores.astype(np.int64),
+                       int(labels.max()) + 1)
+
+    @property
+    def numero_corridas(self):
+        """Número de corridas almacenadas."""
+        return self.fila.size
+
+    def longitudes(self):
+        """Longitud de cada corrida."""
+        return self.fin - self.inicio
+
+    def areas(self):
+        """
+        Área de cada etiqueta.
+
+        Returns:
+            Arreglo de longitud num_labels (el fondo, índice 0, vale 0)
+        """
+        return np.bincount(self.etiqueta, weights=self.longitudes(), minlength=self.num_labels).astype(np.int64)
+
+    def cajas(self):
+        """
+        Caja envolvente de cada etiqueta.
+
+        Returns:
+            Arreglo (num_labels, 4) con x, y, ancho, alto (ceros para etiquetas sin píxeles)
+        """
+        cajas = np.zeros((self.num_labels, 4), dtype=np.int64)
+        presentes = np.flatnonzero(np.diff(self._limites) > 0)
+        if presentes.size == 0:
+            return cajas
+        cortes = self._limites[presentes]
+        ordenado = self._orden
+        x_min = np.minimum.reduceat(self.inicio[ordenado], cortes)
+        x_max = np.maximum.reduceat(self.fin[ordenado], cortes)
+        y_min = np.minimum.reduceat(self.fila[ordenado], cortes)
+        y_max = np.maximum.reduceat(self.fila[ordenado], cortes)
+        cajas[presentes] = np.column_stack((x_min, y_min, x_max - x_min, y_max - y_min + 1))
+        return cajas
+
+    def momentos(self):
+        """
+        Momentos espaciales de orden 0 y 1 de cada etiqueta.
+
+        Returns:
+            m00, m10, m01: Arreglos de longitud num_labels (enteros exactos)
+        """
+        longitud = self.longitudes()
+        # Suma de columnas de una corrida: (inicio + fin - 1) * longitud / 2
+        suma_x = (self.inicio + self.fin - 1) * longitud // 2
+        m00 = np.bincount(self.etiqueta, weights=longitud, minlength=self.num_labels)
+        m10 = np.bincount(self.etiqueta, weights=suma_x, minlength=self.num_labels)
+        m01 = np.bincount(self.etiqueta, weights=self.fila * longitud, minlength=self.num_labels)
+        return m00.astype(np.int64), m10.astype(np.int64), m01.astype(np.int64)
+
+    def centroides(self):
+        """
+        Centroide (x, y) de cada etiqueta.
+
+        Returns:
+            Arreglo (num_labels, 2); NaN para etiquetas sin píxeles
+        """
+        m00, m10, m01 = self.momentos()
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return np.column_stack((m10 / m00, m01 / m00))
+
+    def corridas(self, etiqueta):
+        """
+        Corridas de una etiqueta.
+
+        Args:
+            etiqueta: Etiqueta de la componente
+
+        Returns:
+            fila, inicio, fin de sus corridas en orden de barrido
+        """
+        indices = self._orden[self._limites[etiqueta]:self._limites[etiqueta + 1]]
+        return self.fila[indices], self.inicio[indices], self.fin[indices]
+
+    def mascara(self, etiqueta, recortar=False, margen=0):
+        """
+        Máscara binaria de una componente.
+
+        Args:
+            etiqueta: Etiqueta de la componente
+            recortar: Si devolver solo la caja envolvente (más el margen)
+            margen: Píxeles de ceros añadidos alrededor de la caja al recortar
+
+        Returns:
+            Máscara uint8 (0/1); si recortar, también la esquina (x, y) del recorte
+        """
+        fila, inicio, fin = self.corridas(etiqueta)
+        if recortar:
+            if fila.size:
+                x0, y0 = int(inicio.min()) - margen, int(fila[0]) - margen
+                alto, ancho = int(fila[-1]) + 1 + margen - y0, int(fin.max()) + margen - x0
+            else:
+                x0 = y0 = 0
+                alto = ancho = 0
+        else:
+            x0 = y0 = 0
+            alto, ancho = self.forma
+
+        # Marcar +1 al inicio y -1 al final de cada corrida y acumular por fila
+        delta = np.zeros((alto, ancho + 1), dtype=np.int8)
+        delta[fila - y0, inicio - x0] = 1
+        delta[fila - y0, fin - x0] = -1
+        mascara = np.cumsum(delta[:, :-1], axis=1, dtype=np.int8).astype(np.uint8)
+        return (mascara, (x0, y0)) if recortar else mascara
+
+    def a_etiquetas(self, dtype=None):
+        """
+        Reconstruye la matriz de etiquetas.
+
+        Args:
+            dtype: Tipo de salida (por defecto el más pequeño según num_labels)
+
+        Returns:
+            Matriz de etiquetas
+        """
+        dtype = dtype_etiquetas(self.num_labels) if dtype is None else dtype
+        alto, ancho = self.forma
+        delta = np.zeros((alto, ancho + 1), dtype=np.int64)
+        np.add.at(delta, (self.fila, self.inicio), self.etiqueta)
+        np.add.at(delta, (self.fila, self.fin), -self.etiqueta)
+        return np.cumsum(delta[:, :-1], axis=1).astype(dtype)
@@ -0,0 +1,188 @@
+"""
+Convolución general con selección automática del método de ejecución.
+
+Elige entre filtrado espacial directo, filtrado separable (kernels de rango 1
+detectados por SVD) o multiplicación en el dominio de la frecuencia (FFT)
+según el tamaño y el rango del kernel. Los espectros de los kernels se
+guardan en caché para reutilizarlos en lotes de imágenes del mismo tamaño.
+"""
+
+from collections import OrderedDict
+
+import cv2
+import numpy as np
+
+from .instrumentacion import instrumentar
+
+
+# Lado mínimo del kernel a partir del cual conviene separarlo
+LADO_MINIMO_SEPARABLE = 5
+
+# Lado mínimo del kernel a partir del cual se considera la FFT
+LADO_MINIMO_FFT = 11
+
+# Tolerancia relativa para considerar despreciable el segundo valor singular
+TOLERANCIA_RANGO = 1e-6
+
+# Número máximo de espectros guardados en caché
+MAXIMO_ESPECTROS_CACHE = 32
+
+_cache_espectros = OrderedDict()
+
+
+def limpiar_cache_espectros():
+    """Elimina todos los espectros de kernel guardados en caché."""
+    _cache_espectros.clear()
+
+
+def descomponer_kernel(kernel):
+    """
+    Intenta separar un kernel 2D en dos vectores 1D mediante SVD.
+
+    Args:
+        kernel: Kernel 2D
+
+    Returns:
+        Tupla (kernel_x, kernel_y) si el kernel es de rango 1, None en otro caso
+    """
+    kernel = np.asarray(kernel, dtype=np.float64)
+    if kernel.ndim != 2 or min(kernel.shape) == 1:
+        return None
+
+    u, s, vt = np.linalg.svd(kernel)
+    if s[0] == 0 or s[1] > s[0] * TOLERANCIA_RANGO:
+        return None
+
+    raiz = np.sqrt(s[0])
+    kernel_y = (u[:, 0] * raiz).astype(np.float32)
+    kernel_x = (vt[0, :] * raiz).astype(np.float32)
+    return kernel_x, kernel_y
+
+
+def elegir_metodo_convolucion(kernel):
+    """
+    Decide el método de ejecución más económico para un kernel.
+
+    Args:
+        kernel: Kernel 2D
+
+    Returns:
+        'separable', 'fft' o 'espacial'
+    """
+    kh, kw = np.shape(kernel)
+    if max(kh, kw) < LADO_MINIMO_SEPARABLE:
+        return 'espacial'
+    if descomponer_kernel(kernel) is not None:
+        return 'separable'
+    if min(kh, kw) >= LADO_MINIMO_FFT:
+        return 'fft'
+    return 'espacial'
+
+
+def _espectro_kernel(kernel, forma_fft):
+    """Retorna el espectro del kernel volteado, usando la caché si es posible."""
+    clave = (kernel.shape, forma_fft, kernel.tobytes())
+    espectro = _cache_espectros.get(clave)
+    if espectro is not None:
+        _cache_espectros.move_to_end(clave)
+        return espectro
+
+    # filter2D calcula correlación: se voltea el kernel para usar convolución
+    espectro = np.fft.rfft2(kernel[::-1, ::-1], s=forma_fft)
+    _cache_espectros[clave] = espectro
+    if len(_cache_espectros) > MAXIMO_ESPECTROS_CACHE:
+        _cache_espectros.popitem(last=False)
+    return espectro
+
+
+def _convolucion_fft(imagen, kernel):
+    """Correlación por FFT con borde reflejado (equivalente a filter2D)."""
+    h, w = imagen.shape[:2]
+    kh, kw = kernel.shape
+    ay, ax = kh // 2, kw // 2
+
+    # BORDER_REFLECT_101 de OpenCV equivale al modo 'reflect' de NumPy
+    relleno = [(ay, kh - 1 - ay), (ax, kw - 1 - ax)] + [(0, 0)] * (imagen.ndim - 2)
+    extendida = np.pad(imagen.astype(np.float32, copy=False), relleno, mode='reflect')
+
+    forma_fft = (cv2.getOptimalDFTSize(h + kh - 1), cv2.getOptimalDFTSize(w + kw - 1))
+    espectro = _espectro_kernel(kernel, forma_fft)
+    if imagen.ndim == 3:
+        espectro = espectro[:, :, np.newaxis]
+
+    # Todos los canales se transforman en una sola llamada
+    producto = np.fft.rfft2(extendida, s=forma_fft, axes=(0, 1)) * espectro
+    resultado = np.fft.irfft2(producto, s=forma_fft, axes=(0, 1))
+    return resultado[kh - 1:kh - 1 + h, kw - 1:kw - 1 + w].astype(np.float32, copy=False)
+
+
+@instrumentar
+def convolucion(imagen, kernel, metodo='auto', dtype_salida=None):
+    """
+    Aplica un kernel arbitrario eligiendo el método de ejecución más rápido.
+
+    Sigue la convención de cv2.filter2D (correlación, ancla en el centro y
+    borde BORDER_REFLECT_101), por lo que los tres métodos son intercambiables.
+
+    Args:
+        imagen: Imagen de entrada (grises o color)
+        kernel: Kernel 2D
+        metodo: 'auto', 'espacial', 'separable' o 'fft'
+        dtype_salida: Tipo de la salida. None conserva el tipo de la entrada;
+            np.float32 evita recuantizar entre etapas de un pipeline
+
+    Returns:
+        Imagen filtrada
+    """
+    kernel = np.asarray(kernel, dtype=np.float32)
+    if metodo == 'auto':
+        metodo = elegir_metodo_convolucion(kernel)
+
+    dtype_salida = np.dtype(imagen.dtype if dtype_salida is None else dtype_salida)
+
+    if metodo == 'fft':
+        resultado = _convolucion_fft(imagen, kernel)
+        if dtype_salida == np.float32:
+            return resultado
+        if np.issubdtype(dtype_salida, np.integer):
+            info = np.iinfo(dtype_salida)
+            resultado = np.clip(np.rint(resultado), info.min, info.max)
+        return resultado.astype(dtype_salida)
+
+    ddepth = cv2.CV_32F if dtype_salida == np.float32 else -1
+
+    if metodo == 'separable':
+        separado = descomponer_kernel(kernel)
+        if separado is None:
+            raise ValueError("El kernel no es separable (rango mayor a 1)")
+        kernel_x, kernel_y = separado
+        resultado = cv2.sepFilter2D(imagen, ddepth, kernel_x, kernel_y)
+    elif metodo == 'espacial':
+        resultado = cv2.filter2D(imagen, ddepth, kernel)
+    else:
+        raise ValueError(f"Método de convolución no válido: {metodo}")
+
+    return resultado if resultado.dtype == dtype_salida else resultado.astype(dtype_salida)
+
+
+@instrumentar
+def convolucion_lote(imagenes, kernel, metodo='auto', dtype_salida=None):
+    """
+    Aplica el mismo kernel a un lote de imágenes.
+
+    El método se decide una sola vez y, en la ruta FFT, el espectro del kernel
+    se calcula para la primera imagen y se reutiliza en las demás del mismo tamaño.
+
+    Args:
+        imagenes: Iterable de imágenes
+        kernel: Kernel 2D
+        metodo: 'auto', 'espacial', 'separable' o 'fft'
+        dtype_salida: Tipo de la salida (ver convolucion)
+
+    Returns:
+        Lista de imágenes filtradas
+    """
+    kernel = np.asarray(kernel, dtype=np.float32)
+    if metodo == 'auto':
+        metodo = elegir_metodo_convolucion(kernel)
+    return [convolucion(img, kernel, metodo, dtype_salida) for img in imagenes]
@@ -0,0 +1,226 @@
+"""
+Descriptores de forma e intensidad por componente.
+
+Los momentos se obtienen en forma cerrada sobre las corridas de cada fila
+(ComponentesRLE), la intensidad con sumas acumuladas por fila y el número de
+Euler con conteo de patrones 2x2; todo vectorizado, por lo que sirve para
+millones de componentes. Solo la envolvente convexa (solidez) recorre las
+componentes, y lo hace sobre los extremos de sus corridas.
+"""
+
+import cv2
+import numpy as np
+
+from .componentes_rle import ComponentesRLE
+from .instrumentacion import instrumentar
+
+
+# Columnas de la tabla de descriptores, en orden de presentación
+COLUMNAS_DESCRIPTORES = (
+    'etiqueta', 'area', 'centroide_x', 'centroide_y',
+    'hu1', 'hu2', 'hu3', 'hu4', 'hu5', 'hu6', 'hu7',
+    'orientacion', 'excentricidad', 'eje_mayor', 'eje_menor',
+    'solidez', 'euler', 'intensidad_media', 'intensidad_std',
+)
+
+
+def _suma_potencias(n, p):
+    """Suma de x**p para x en 0..n-1 (fórmulas de Faulhaber)."""
+    n = n.astype(np.float64)
+    if p == 0:
+        return n
+    if p == 1:
+        return n * (n - 1) / 2
+    if p == 2:
+        return (n - 1) * n * (2 * n - 1) / 6
+    return (n * (n - 1) / 2) ** 2
+
+
+def _momentos_corridas(rle):
+    """
+    Momentos espaciales hasta orden 3 de cada etiqueta a partir de las corridas.
+
+    Returns:
+        dict 'mpq' -> arreglo de longitud num_labels
+    """
+    fila = rle.fila.astype(np.float64)
+    sumas_x = [_suma_potencias(rle.fin, p) - _suma_potencias(rle.inicio, p) for p in range(4)]
+    momentos = {}
+    for p in range(4):
+        for q in range(4 - p):
+            pesos = sumas_x[p] * fila ** q
+            momentos[f'm{p}{q}'] = np.bincount(rle.etiqueta, weights=pesos, minlength=rle.num_labels)
+    return momentos
+
+
+def _hu(momentos):
+    """Momentos centrales, invariantes de Hu y parámetros de la elipse equivalente."""
+    m = momentos
+    m00 = m['m00']
+    with np.errstate(divide='ignore', invalid='ignore'):
+        cx = m['m10'] / m00
+        cy = m['m01'] / m00
+
+        mu20 = m['m20'] - cx * m['m10']
+        mu02 = m['m02'] - cy * m['m01']
+        mu11 = m['m11'] - cx * m['m01']
+        mu30 = m['m30'] - 3 * cx * m['m20'] + 2 * cx ** 2 * m['m10']
+        mu03 = m['m03'] - 3 * cy * m['m02'] + 2 * cy ** 2 * m['m01']
+        mu21 = m['m21'] - 2 * cx * m['m11'] - cy * m['m20'] + 2 * cx ** 2 * m['m01']
+        mu12 = m['m12'] - 2 * cy * m['m11'] - cx * m['m02'] + 2 * cy ** 2 * m['m10']
+
+        # Momentos centrales normalizados: eta_pq = mu_pq / m00^(1 + (p+q)/2)
+        n2 = m00 ** 2
+        n3 = m00 ** 2.5
+        n20, n02, n11 = mu20 / n2, mu02 / n2, mu11 / n2
+        n30, n03, n21, n12 = mu30 / n3, mu03 / n3, mu21 / n3, mu12 / n3
+
+        a = n30 + n12
+        b = n21 + n03
+        hu = np.column_stack((
+            n20 + n02,
+            (n20 - n02) ** 2 + 4 * n11 ** 2,
+            (n30 - 3 * n12) ** 2 + (3 * n21 - n03) ** 2,
+            a ** 2 + b ** 2,
+            (n30 - 3 * n12) * a * (a ** 2 - 3 * b ** 2) + (3 * n21 - n03) * b * (3 * a ** 2 - b ** 2),
+            (n20 - n02) * (a ** 2 - b ** 2) + 4 * n11 * a * b,
+            (3 * n21 - n03) * a * (a ** 2 - 3 * b ** 2) - (n30 - 3 * n12) * b * (3 * a ** 2 - b ** 2),
+        ))
+
+        # Elipse con los mismos momentos de segundo orden (varianzas en píxeles²)
+        varianza_x = mu20 / m00 + 1 / 12
+        varianza_y = mu02 / m00 + 1 / 12
+        covarianza = mu11 / m00
+        media = (varianza_x + varianza_y) / 2
+        radio = np.sqrt(((varianza_x - varianza_y) / 2) ** 2 + covarianza ** 2)
+        lambda1 = media + radio
+        lambda2 = np.maximum(media - radio, 0)
+        orientacion = 0.5 * np.arctan2(2 * covarianza, varianza_x - varianza_y)
+        excentricidad = np.sqrt(np.clip(1 - lambda2 / lambda1, 0, 1))
+
+    return cx, cy, hu, orientacion, excentricidad, 4 * np.sqrt(lambda1), 4 * np.sqrt(lambda2)
+
+
+def _euler(labels, connectivity):
+    """
+    Número de Euler de cada etiqueta por conteo de patrones 2x2 (bit-quads de Gray).
+
+    Para cada ventana 2x2 y cada etiqueta presente en ella se cuenta cuántos
+    de sus píxeles pertenecen a la etiqueta: E = (Q1 - Q3 ∓ 2·QD) / 4.
+    """
+    n = int(labels.max(initial=0)) + 1
+    marco = np.pad(labels, 1)
+    a, b, c, d = marco[:-1, :-1], marco[:-1, 1:], marco[1:, :-1], marco[1:, 1:]
+    esquinas = (a, b, c, d)
+
+    cuenta = np.zeros(n, dtype=np.int64)
+    signo_diagonal = -2 if connectivity == 8 else 2
+    for k, lab in enumerate(esquinas):
+        # Cada etiqueta se cuenta una vez por ventana: en su primera esquina
+        primera = lab > 0
+        for anterior in esquinas[:k]:
+            primera &= anterior != lab
+        iguales = sum((esquina == lab).astype(np.uint8) for esquina in esquinas)
+        diagonal = (iguales == 2) & (((a == lab) & (d == lab)) | ((b == lab) & (c == lab)))
+        pesos = (iguales == 1).astype(np.int64) - (iguales == 3) + signo_diagonal * diagonal
+        cuenta += np.bincount(lab[primera], weights=pesos[primera], minlength=n).astype(np.int64)
+    return cuenta // 4
+
+
+def _solidez(rle, area):
+    """Área / área de la envolvente convexa de los cuadrados de píxel de cada etiqueta."""
+    solidez = np.zeros(rle.num_labels, dtype=np.float64)
+    for lab in np.flatnonzero(area):
+        fila, inicio, fin = rle.corridas(lab)
+        puntos = np.concatenate((
+            np.column_stack((inicio, fila)), np.column_stack((fin, fila)),
+            np.column_stack((inicio, fila + 1)), np.column_stack((fin, fila + 1)),
+        )).astype(np.int32)
+        solidez[lab] = area[lab] / cv2.contourArea(cv2.convexHull(puntos))
+    return solidez
+
+
+def _intensidad(rle, gris):
+    """Media y desviación estándar de la intensidad de cada etiqueta (sumas por fila)."""
+    gris = gris.astype(np.float64)
+    acumulada = np.zeros((gris.shape[0], gris.shape[1] + 1))
+    acumulada2 = np.zeros_like(acumulada)
+    np.cumsum(gris, axis=1, out=acumulada[:, 1:])
+    np.cumsum(gris * gris, axis=1, out=acumulada2[:, 1:])
+
+    suma = acumulada[rle.fila, rle.fin] - acumulada[rle.fila, rle.inicio]
+    suma2 = acumulada2[rle.fila, rle.fin] - acumulada2[rle.fila, rle.inicio]
+    area = np.bincount(rle.etiqueta, weights=rle.longitudes(), minlength=rle.num_labels)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        media = np.bincount(rle.etiqueta, weights=suma, minlength=rle.num_labels) / area
+        media2 = np.bincount(rle.etiqueta, weights=suma2, minlength=rle.num_labels) / area
+    return media, np.sqrt(np.maximum(media2 - media ** 2, 0))
+
+
+@instrumentar
+def descriptores_componentes(labels, gris=None, connectivity=8, rle=None):
+    """
+    Calcula el vector de descriptores de cada componente.
+
+    Incluye momentos de Hu, orientación, excentricidad y ejes de la elipse
+    equivalente, solidez (área / envolvente convexa), número de Euler e
+    intensidad media y desviación estándar sobre la imagen en grises.
+
+    Args:
+        labels: Matriz de etiquetas
+        gris: Imagen en escala de grises del mismo tamaño (opcional; sin ella
+              las columnas de intensidad son NaN)
+        connectivity: Conectividad del etiquetado (para el número de Euler)
+        rle: ComponentesRLE ya calculado para labels (opcional)
+
+    Returns:
+        dict columna -> numpy array (una fila por etiqueta 1..max, ver COLUMNAS_DESCRIPTORES)
+    """
+    if rle is None:
+        rle = ComponentesRLE.desde_etiquetas(labels)
+    area = rle.areas()
+
+    cx, cy, hu, orientacion, excentricidad, eje_mayor, eje_menor = _hu(_momentos_corridas(rle))
+    if gris is not None:
+        if gris.ndim == 3:
+            gris = cv2.cvtColor(gris, cv2.COLOR_BGR2GRAY)
+        media, desviacion = _intensidad(rle, gris)
+    else:
+        media = desviacion = np.full(rle.num_labels, np.nan)
+
+    descriptores = {
+        'etiqueta': np.arange(rle.num_labels, dtype=np.int64),
+        'area': area,
+        'centroide_x': cx,
+        'centroide_y': cy,
+    }
+    for i in range(7):
+        descriptores[f'hu{i + 1}'] = hu[:, i]
+    descriptores.update({
+        'orientacion': orientacion,
+        'excentricidad': excentricidad,
+        'eje_mayor': eje_mayor,
+        'eje_menor': eje_menor,
+        'solidez': _solidez(rle, area),
+        'euler': _euler(labels, connectivity),
+        'intensidad_media': media,
+        'intensidad_std': desviacion,
+    })
+    # La fila 0 es el fondo
+    return {columna: valores[1:] for columna, valores in descriptores.items()}
+
+
+def matriz_descriptores(descriptores, columnas=None):
+    """
+    Apila los descriptores en una matriz de características.
+
+    Args:
+        descriptores: dict devuelto por descriptores_componentes
+        columnas: Columnas a incluir (por defecto todas menos etiqueta y centroide)
+
+    Returns:
+        Matriz float64 (componentes, características)
+    """
+    if columnas is None:
+        columnas = [c for c in COLUMNAS_DESCRIPTORES if c not in ('etiqueta', 'centroide_x', 'centroide_y')]
+    return np.column_stack([np.asarray(descriptores[c], dtype=np.float64) for c in columnas])
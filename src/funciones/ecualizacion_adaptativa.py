@@ -0,0 +1,196 @@
+"""
+Ecualización adaptativa del histograma con límite de contraste (CLAHE).
+
+La imagen se divide en una rejilla de teselas; los histogramas de las
+teselas se calculan una sola vez y se guardan, de modo que cambiar el límite
+de recorte solo repite el recorte y la suma acumulada (256 niveles por
+tesela). Las LUT de cada límite quedan en caché. Cada píxel se obtiene
+interpolando bilinealmente las LUT de las cuatro teselas más cercanas; la
+imagen se recorre por bloques entre centros de teselas, donde esas cuatro
+LUT son las mismas, aplicando cada LUT con cv2.LUT.
+"""
+
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import cv2
+import numpy as np
+
+from .instrumentacion import instrumentar, medir_operacion
+
+
+REJILLA_DEFAULT = (8, 8)
+LIMITE_RECORTE_DEFAULT = 2.0
+# Límites de recorte distintos cuyas LUT se conservan
+LUTS_EN_CACHE = 16
+
+
+class EcualizacionAdaptativa:
+    """
+    CLAHE con histogramas de tesela precalculados y LUT en caché por límite de recorte.
+
+    Sigue las convenciones de cv2.createCLAHE: la imagen se extiende con
+    BORDER_REFLECT_101 hasta un múltiplo de la rejilla, el límite es relativo
+    (límite · píxeles de la tesela / 256) y el exceso se reparte por igual
+    entre los niveles.
+
+    Attributes:
+        imagen: Imagen original
+        color: Si se ecualiza la luminancia L (Lab) conservando el color
+        rejilla: Teselas (columnas, filas)
+        histogramas: Histograma de cada tesela (filas, columnas, 256)
+    """
+
+    def __init__(self, imagen, rejilla=REJILLA_DEFAULT, color=False):
+        """
+        Calcula los histogramas de las teselas.
+
+        Args:
+            imagen: Imagen uint8 en grises o BGR
+            rejilla: Número de teselas (columnas, filas), como tileGridSize de OpenCV
+            color: Con una imagen BGR, ecualizar solo L de Lab en vez de pasar a grises
+        """
+        self.imagen = imagen
+        self.color = color and imagen.ndim == 3
+        if self.color:
+            self._lab = cv2.cvtColor(imagen, cv2.COLOR_BGR2LAB)
+            gris = self._lab[:, :, 0].copy()
+        elif imagen.ndim == 3:
+            gris = cv2.cvtColor(imagen, cv2.COLOR_BGR2GRAY)
+        else:
+            gris = imagen
+        self.gris = gris
+        self.rejilla = (int(rejilla[0]), int(rejilla[1]))
+        columnas, filas = self.rejilla
+        alto, ancho = gris.shape
+
+        with medir_operacion("EcualizacionAdaptativa", (gris,)):
+            if alto % filas or ancho % columnas:
+                # Como OpenCV: si algún eje no es divisible se extienden ambos (tiles - resto)
+                extendida = cv2.copyMakeBorder(gris, 0, filas - alto % filas, 0, columnas - ancho % columnas,
+                                               cv2.BORDER_REFLECT_101)
+            else:
+                extendida = gris
+            self.alto_tesela = extendida.shape[0] // filas
+            self.ancho_tesela = extendida.shape[1] // columnas
+
+            self.histogramas = np.empty((filas, columnas, 256), dtype=np.int64)
+            for ty in range(filas):
+                for tx in range(columnas):
+                    tesela = extendida[ty * self.alto_tesela:(ty + 1) * self.alto_tesela,
+                                       tx * self.ancho_tesela:(tx + 1) * self.ancho_tesela]
+                    self.histogramas[ty, tx] = np.bincount(tesela.ravel(), minlength=256)
+        self._luts = {}
+
+    def luts(self, limite_recorte=LIMITE_RECORTE_DEFAULT):
+        """
+        LUT de cada tesela para un límite de recorte (en caché).
+
+        Args:
+            limite_recorte: Límite relativo de contraste (<= 0 desactiva el recorte)
+
+        Returns:
+            Arreglo uint8 (filas, columnas, 256)
+        """
+        clave = float(limite_recorte)
+        if clave in self._luts:
+            return self._luts[clave]
+
+        area = self.alto_tesela * self.ancho_tesela
+        histogramas = self.histogramas.reshape(-1, 256).copy()
+        if clave > 0:
+            limite = max(int(clave * area / 256), 1)
+            exceso = np.maximum(histogramas - limite, 0).sum(axis=1)
+            np.minimum(histogramas, limite, out=histogramas)
+
+            # Reparto uniforme del exceso; el resto, un nivel cada 256 // resto empezando en 0
+            histogramas += (exceso // 256)[:, None]
+            resto = exceso % 256
+            paso = np.maximum(256 // np.maximum(resto, 1), 1)
+            niveles = np.arange(256)
+            histogramas += (niveles % paso[:, None] == 0) & (niveles // paso[:, None] < resto[:, None])
+
+        # Escala en float32, como OpenCV
+        acumulado = np.cumsum(histogramas, axis=1).astype(np.float32) * (np.float32(255) / np.float32(area))
+        tabla = np.clip(np.rint(acumulado), 0, 255).astype(np.uint8).reshape(self.histogramas.shape)
+
+        if len(self._luts) >= LUTS_EN_CACHE:
+            self._luts.pop(next(iter(self._luts)))
+        self._luts[clave] = tabla
+        return tabla
+
+    def _interpolacion(self, tamano, n, longitud):
+        """
+        Teselas vecinas y peso de la segunda a lo largo de un eje.
+
+        Returns:
+            Lista de tramos (inicio, fin, t1, t2) con t1 y t2 constantes, y pesos float32
+        """
+        posicion = np.arange(n, dtype=np.float32) * (np.float32(1) / np.float32(longitud)) - np.float32(0.5)
+        t1 = np.floor(posicion).astype(np.int64)
+        peso = (posicion - t1).astype(np.float32)
+        t2 = np.minimum(t1 + 1, tamano - 1)
+        t1 = np.maximum(t1, 0)
+        cortes = np.flatnonzero(np.diff(t1) | np.diff(t2)) + 1
+        inicios = np.concatenate(([0], cortes))
+        fines = np.concatenate((cortes, [n]))
+        return [(i, f, int(t1[i]), int(t2[i])) for i, f in zip(inicios, fines)], peso
+
+    def aplicar(self, limite_recorte=LIMITE_RECORTE_DEFAULT, trabajadores=None):
+        """
+        Ecualiza la imagen con el límite de recorte dado.
+
+        Args:
+            limite_recorte: Límite relativo de contraste (<= 0 desactiva el recorte)
+            trabajadores: Número de hilos (None usa os.cpu_count())
+
+        Returns:
+            Imagen ecualizada (BGR si color=True, en grises si no)
+        """
+        tabla = self.luts(limite_recorte)
+        columnas, filas = self.rejilla
+        tramos_y, peso_y = self._interpolacion(filas, self.gris.shape[0], self.alto_tesela)
+        tramos_x, peso_x = self._interpolacion(columnas, self.gris.shape[1], self.ancho_tesela)
+        resultado = np.empty_like(self.gris)
+
+        def procesar(tramo_y):
+            y0, y1, ty1, ty2 = tramo_y
+            ya = peso_y[y0:y1, None]
+            for x0, x1, tx1, tx2 in tramos_x:
+                valores = self.gris[y0:y1, x0:x1]
+                xa = peso_x[None, x0:x1]
+                arriba = (cv2.LUT(valores, tabla[ty1, tx1]) * (1 - xa)
+                          + cv2.LUT(valores, tabla[ty1, tx2]) * xa)
+                abajo = (cv2.LUT(valores, tabla[ty2, tx1]) * (1 - xa)
+                         + cv2.LUT(valores, tabla[ty2, tx2]) * xa)
+                resultado[y0:y1, x0:x1] = np.rint(arriba * (1 - ya) + abajo * ya)
+
+        with medir_operacion("EcualizacionAdaptativa.aplicar", (self.gris,)):
+            with ThreadPoolExecutor(max_workers=trabajadores or os.cpu_count() or 1) as ejecutor:
+                list(ejecutor.map(procesar, tramos_y))
+
+        if not self.color:
+            return resultado
+        lab = self._lab.copy()
+        lab[:, :, 0] = resultado
+        return cv2.cvtColor(lab, cv2.COLOR_LAB2BGR)
+
+
+@instrumentar
+def ecualizacion_adaptativa(imagen, limite_recorte=LIMITE_RECORTE_DEFAULT, rejilla=REJILLA_DEFAULT, color=False):
+    """
+    Aplica ecualización adaptativa con límite de contraste (CLAHE).
+
+    Para probar varios límites sobre la misma imagen conviene crear una
+    EcualizacionAdaptativa y llamar a aplicar, que reutiliza los histogramas.
+
+    Args:
+        imagen: Imagen de entrada en escala de grises
+        limite_recorte: Límite relativo de contraste (<= 0 desactiva el recorte)
+        rejilla: Número de teselas (columnas, filas)
+        color: Si ecualizar solo la luminancia (L de Lab) de una imagen BGR
+
+    Returns:
+        Imagen ecualizada
+    """
+    return EcualizacionAdaptativa(imagen, rejilla, color).aplicar(limite_recorte)
@@ -1,114 +1,149 @@
 """
 Funciones de ajuste de brillo y ecualización de histogramas.
+
+Las transformaciones puntuales se evalúan una vez sobre los 256 niveles y se
+aplican con cv2.LUT. Con color=True se conservan los tres canales: la
+ecualización uniforme actúa sobre la luminancia L de Lab y las demás
+transformaciones sobre cada canal.
 """
 
 import cv2
 import numpy as np
 
+from .instrumentacion import instrumentar
+
+
+_NIVELES = np.arange(256)
+
+
+def _transformacion_puntual(imagen, transformacion, color=False):
+    """
+    Aplica una transformación de niveles de gris a una imagen.
+
+    Args:
+        imagen: Imagen de entrada
+        transformacion: Función vectorizada sobre niveles (0-255) que retorna la imagen uint8
+        color: Si conservar los canales de una imagen BGR en vez de pasar a grises
+
+    Returns:
+        Imagen transformada
+    """
+    if len(imagen.shape) == 3 and not color:
+        imagen = cv2.cvtColor(imagen, cv2.COLOR_BGR2GRAY)
+    if imagen.dtype == np.uint8:
+        # cv2.LUT aplica la misma tabla a cada canal
+        return cv2.LUT(imagen, transformacion(_NIVELES))
+    return transformacion(imagen)
+
 
-def ecualizacion_uniforme(imagen):
+@instrumentar
+def ecualizacion_uniforme(imagen, color=False):
     """
     Aplica ecualización uniforme del histograma.
     
     Args:
         imagen: Imagen de entrada en escala de grises
+        color: Si ecualizar solo la luminancia (L de Lab) de una imagen BGR
         
     Returns:
         Imagen ecualizada
     """
     if len(imagen.shape) == 3:
+        if color:
+            lab = cv2.cvtColor(imagen, cv2.COLOR_BGR2LAB)
+            lab[:, :, 0] = cv2.equalizeHist(lab[:, :, 0])
+            return cv2.cvtColor(lab, cv2.COLOR_LAB2BGR)
         imagen = cv2.cvtColor(imagen, cv2.COLOR_BGR2GRAY)
     return cv2.equalizeHist(imagen)
 
 
-def ecualizacion_exponencial(imagen):
+@instrumentar
+def ecualizacion_exponencial(imagen, color=False):
     """
     Aplica ecualización exponencial.
     
     Args:
         imagen: Imagen de entrada en escala de grises
+        color: Si aplicarla a cada canal de una imagen BGR
         
     Returns:
         Imagen con ecualización exponencial aplicada
     """
-    if len(imagen.shape) == 3:
-        imagen = cv2.cvtColor(imagen, cv2.COLOR_BGR2GRAY)
-    return np.uint8(255 * (1 - np.exp(-imagen / 255)))
+    return _transformacion_puntual(imagen, lambda v: np.uint8(255 * (1 - np.exp(-v / 255))), color)
 
 
-def ecualizacion_rayleigh(imagen):
+@instrumentar
+def ecualizacion_rayleigh(imagen, color=False):
     """
     Aplica ecualización Rayleigh.
     
     Args:
         imagen: Imagen de entrada en escala de grises
+        color: Si aplicarla a cada canal de una imagen BGR
         
     Returns:
         Imagen con ecualización Rayleigh aplicada
     """
-    if len(imagen.shape) == 3:
-        imagen = cv2.cvtColor(imagen, cv2.COLOR_BGR2GRAY)
-    return np.uint8(255 * np.sqrt(imagen / 255))
+    return _transformacion_puntual(imagen, lambda v: np.uint8(255 * np.sqrt(v / 255)), color)
 
 
-def ecualizacion_hipercubica(imagen):
+@instrumentar
+def ecualizacion_hipercubica(imagen, color=False):
     """
     Aplica ecualización hipercúbica.
     
     Args:
         imagen: Imagen de entrada en escala de grises
+        color: Si aplicarla a cada canal de una imagen BGR
         
     Returns:
         Imagen con ecualización hipercúbica aplicada
     """
-    if len(imagen.shape) == 3:
-        imagen = cv2.cvtColor(imagen, cv2.COLOR_BGR2GRAY)
-    return np.uint8(255 * (imagen / 255) ** 4)
+    return _transformacion_puntual(imagen, lambda v: np.uint8(255 * (v / 255) ** 4), color)
 
 
-def ecualizacion_logaritmica_hiperbolica(imagen):
+@instrumentar
+def ecualizacion_logaritmica_hiperbolica(imagen, color=False):
     """
     Aplica ecualización logarítmica hiperbólica.
     
     Args:
         imagen: Imagen de entrada en escala de grises
+        color: Si aplicarla a cada canal de una imagen BGR
         
     Returns:
         Imagen con ecualización logarítmica hiperbólica aplicada
     """
-    if len(imagen.shape) == 3:
-        imagen = cv2.cvtColor(imagen, cv2.COLOR_BGR2GRAY)
-    return np.uint8(255 * np.log1p(imagen) / np.log1p(255))
+    return _transformacion_puntual(imagen, lambda v: np.uint8(255 * np.log1p(v) / np.log1p(255)), color)
 
 
-def funcion_potencia(imagen, potencia=2):
+@instrumentar
+def funcion_potencia(imagen, potencia=2, color=False):
     """
     Aplica función potencia.
     
     Args:
         imagen: Imagen de entrada en escala de grises
         potencia: Exponente de la función potencia
+        color: Si aplicarla a cada canal de una imagen BGR
         
     Returns:
         Imagen con función potencia aplicada
     """
-    if len(imagen.shape) == 3:
-        imagen = cv2.cvtColor(imagen, cv2.COLOR_BGR2GRAY)
-    return np.uint8(255 * (imagen / 255) ** potencia)
+    return _transformacion_puntual(imagen, lambda v: np.uint8(255 * (v / 255) ** potencia), color)
 
 
-def correccion_gamma(imagen, gamma):
+@instrumentar
+def correccion_gamma(imagen, gamma, color=False):
     """
     Aplica corrección gamma.
     
     Args:
         imagen: Imagen de entrada en escala de grises
         gamma: Valor de gamma para la corrección
+        color: Si aplicarla a cada canal de una imagen BGR
         
     Returns:
         Imagen con corrección gamma aplicada
     """
-    if len(imagen.shape) == 3:
-        imagen = cv2.cvtColor(imagen, cv2.COLOR_BGR2GRAY)
-    imagen_gamma = np.power(imagen / 255.0, gamma) * 255
-    return np.uint8(imagen_gamma)
+    return _transformacion_puntual(imagen, lambda v: np.uint8(np.power(v / 255.0, gamma) * 255), color)
@@ -5,7 +5,11 @@ Funciones de filtrado para reducción de ruido y suavizado de imágenes.
 import cv2
 import numpy as np
 
+from .convolucion import convolucion
+from .instrumentacion import instrumentar
 
+
+@instrumentar
 def filtro_promediador(imagen, kernel_size=5):
     """
     Aplica un filtro promediador (blur).
@@ -21,6 +25,7 @@ def filtro_promediador(imagen, kernel_size=5):
     return cv2.blur(imagen, (kernel_size, kernel_size))
 
 
+@instrumentar
 def filtro_promediador_pesado(imagen, n=5):
     """
     Aplica un filtro promediador con pesos personalizados.
@@ -34,9 +39,10 @@ def filtro_promediador_pesado(imagen, n=5):
         Imagen filtrada
     """
     kernel = np.array([[1, 1, 1], [1, 1, 1], [1, 1, 1]], dtype=np.float32)
-    return cv2.filter2D(imagen, -1, kernel / n)
+    return convolucion(imagen, kernel / n)
 
 
+@instrumentar
 def filtro_mediana(imagen, kernel_size=5):
     """
     Aplica filtro de mediana para reducir ruido.
@@ -51,6 +57,7 @@ def filtro_mediana(imagen, kernel_size=5):
     return cv2.medianBlur(imagen, kernel_size)
 
 
+@instrumentar
 def filtro_gaussiano(imagen, kernel_size=5, sigma=1.0):
     """
     Aplica filtro gaussiano para suavizar la imagen.
@@ -66,6 +73,7 @@ def filtro_gaussiano(imagen, kernel_size=5, sigma=1.0):
     return cv2.GaussianBlur(imagen, (kernel_size, kernel_size), sigma)
 
 
+@instrumentar
 def filtro_moda(imagen, kernel_size=5):
     """
     Aplica un filtro de moda.
@@ -82,6 +90,7 @@ def filtro_moda(imagen, kernel_size=5):
     return cv2.medianBlur(imagen, kernel_size)
 
 
+@instrumentar
 def filtro_minimo(imagen, kernel_size=5):
     """
     Aplica un filtro de mínimo (erosión).
@@ -99,6 +108,7 @@ def filtro_minimo(imagen, kernel_size=5):
     return cv2.erode(imagen, kernel)
 
 
+@instrumentar
 def filtro_maximo(imagen, kernel_size=5):
     """
     Aplica un filtro de máximo (dilatación).
@@ -116,6 +126,7 @@ def filtro_maximo(imagen, kernel_size=5):
     return cv2.dilate(imagen, kernel)
 
 
+@instrumentar
 def filtro_bilateral(imagen, d=9, sigma_color=75, sigma_space=75):
     """
     Aplica filtro bilateral para suavizar preservando bordes.
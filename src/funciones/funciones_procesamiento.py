@@ -21,19 +21,56 @@ from .operaciones_logicas import operacion_logica
 # Importar análisis de componentes conexas
 from .componentes_conexas import (
     etiquetar_componentes,
+    etiquetar_componentes_paralelo,
     extraer_componente_mas_grande,
     colorear_etiquetas,
     comparar_segmentaciones,
+    fronteras_etiquetas,
     dibujar_regiones_numeradas,
     preprocesar_imagen,
     filtrar_componentes_pequenas,
-    obtener_estadisticas_componentes
+    obtener_estadisticas_componentes,
+    tabla_componentes,
+    exportar_tabla_componentes
 )
 
+# Importar árbol de componentes (etiquetado incremental por umbral)
+from .arbol_componentes import ArbolComponentes
+
+# Importar análisis por bandas para imágenes grandes
+from .componentes_bandas import estadisticas_por_bandas
+from .componentes_rle import ComponentesRLE, dtype_etiquetas, compactar_etiquetas
+
+# Importar motor de secuencias morfológicas
+from .morfologia import (
+    SecuenciaMorfologica,
+    aplicar_secuencia_morfologica,
+    descomponer_elemento,
+    elemento_estructurante,
+    reconstruccion_dilatacion,
+    reconstruccion_erosion,
+    rellenar_huecos,
+    eliminar_borde,
+    maximos_regionales,
+)
+from .separacion_objetos import separar_objetos_tocando
+from .descriptores_componentes import descriptores_componentes, matriz_descriptores
+from .indice_espacial import IndiceEspacial
+
 # Importar funciones de ruido
 from .funciones_ruido import (
     agregar_ruido_sal_pimienta,
-    agregar_ruido_gaussiano
+    agregar_ruido_gaussiano,
+    agregar_ruido_lote,
+    generadores_independientes
+)
+
+# Importar generación de conjuntos de datos con ruido
+from .generador_dataset import (
+    barrido_configuraciones,
+    generar_pares_ruido,
+    escribir_dataset_fragmentado,
+    leer_dataset_fragmentado
 )
 
 # Importar funciones de filtrado
@@ -48,11 +85,24 @@ from .funciones_filtrado import (
     filtro_bilateral
 )
 
+# Importar convolución general
+from .convolucion import (
+    convolucion,
+    convolucion_lote,
+    elegir_metodo_convolucion,
+    limpiar_cache_espectros
+)
+
+# Importar métricas de calidad
+from .metricas_calidad import psnr, ssim
+
 # Importar funciones de umbralización
 from .funciones_umbralizacion import (
     umbral_fijo,
     umbral_adaptativo
 )
+from .umbral_local import ImagenIntegral, umbral_local
+from .barrido_umbral import BarridoUmbral
 
 # Importar funciones de ajuste de brillo
 from .funciones_brillo import (
@@ -65,6 +115,21 @@ from .funciones_brillo import (
     correccion_gamma
 )
 
+# Importar ecualización adaptativa (CLAHE con LUT por tesela en caché)
+from .ecualizacion_adaptativa import (
+    EcualizacionAdaptativa,
+    ecualizacion_adaptativa
+)
+
+# Importar análisis de histograma (picos, valles y Otsu sin SciPy)
+from .analisis_histograma import (
+    histograma_gris,
+    suavizar_histograma,
+    encontrar_picos,
+    umbral_otsu_histograma,
+    umbral_minimo_histograma
+)
+
 # Importar funciones de segmentación
 from .funciones_segmentacion import (
     segmentacion_otsu,
@@ -73,7 +138,41 @@ from .funciones_segmentacion import (
     segmentacion_minimo_histograma,
     segmentacion_media,
     segmentacion_multiples_umbrales,
-    segmentacion_umbral_banda
+    segmentacion_umbral_banda,
+    umbrales_otsu_multinivel,
+    segmentacion_otsu_multinivel
+)
+
+# Importar segmentación en color (sin conversión a grises)
+from .segmentacion_color import (
+    convertir_espacio,
+    umbral_por_canal,
+    segmentacion_rango_color,
+    segmentacion_distancia_color
+)
+
+# Importar segmentación por agrupamiento (k-means por mini-lotes, mean-shift)
+from .segmentacion_clustering import (
+    asignar_centros,
+    kmeans_mini_lote,
+    segmentacion_kmeans,
+    cuantizacion_color_kmeans,
+    segmentacion_mean_shift,
+    cuantizacion_color_mean_shift,
+    mascara_clusters,
+    regiones_clusters
+)
+
+# Importar instrumentación de operaciones
+from .instrumentacion import (
+    activar as activar_instrumentacion,
+    desactivar as desactivar_instrumentacion,
+    instrumentar,
+    medir_operacion,
+    obtener_registros,
+    limpiar_registros,
+    resumen_registros,
+    exportar_traza_chrome
 )
 
 
@@ -91,14 +190,46 @@ __all__ = [
     
     # Componentes conexas
     "etiquetar_componentes",
+    "etiquetar_componentes_paralelo",
     "extraer_componente_mas_grande",
     "colorear_etiquetas",
     "comparar_segmentaciones",
+    "fronteras_etiquetas",
     "dibujar_regiones_numeradas",
+    "tabla_componentes",
+    "exportar_tabla_componentes",
+    "ArbolComponentes",
+    "estadisticas_por_bandas",
+    "ComponentesRLE",
+    "dtype_etiquetas",
+    "compactar_etiquetas",
+    
+    # Morfología
+    "SecuenciaMorfologica",
+    "aplicar_secuencia_morfologica",
+    "descomponer_elemento",
+    "elemento_estructurante",
+    "reconstruccion_dilatacion",
+    "reconstruccion_erosion",
+    "rellenar_huecos",
+    "eliminar_borde",
+    "maximos_regionales",
+    "separar_objetos_tocando",
+    "descriptores_componentes",
+    "matriz_descriptores",
+    "IndiceEspacial",
     
     # Ruido
     "agregar_ruido_sal_pimienta",
     "agregar_ruido_gaussiano",
+    "agregar_ruido_lote",
+    "generadores_independientes",
+    
+    # Conjuntos de datos con ruido
+    "barrido_configuraciones",
+    "generar_pares_ruido",
+    "escribir_dataset_fragmentado",
+    "leer_dataset_fragmentado",
     
     # Filtrado
     "filtro_promediador",
@@ -110,9 +241,22 @@ __all__ = [
     "filtro_maximo",
     "filtro_bilateral",
     
+    # Convolución
+    "convolucion",
+    "convolucion_lote",
+    "elegir_metodo_convolucion",
+    "limpiar_cache_espectros",
+    
+    # Métricas de calidad
+    "psnr",
+    "ssim",
+    
     # Umbralización
     "umbral_fijo",
     "umbral_adaptativo",
+    "ImagenIntegral",
+    "umbral_local",
+    "BarridoUmbral",
     
     # Brillo
     "ecualizacion_uniforme",
@@ -122,6 +266,8 @@ __all__ = [
     "ecualizacion_logaritmica_hiperbolica",
     "funcion_potencia",
     "correccion_gamma",
+    "EcualizacionAdaptativa",
+    "ecualizacion_adaptativa",
     
     # Segmentación
     "segmentacion_otsu",
@@ -130,7 +276,42 @@ __all__ = [
     "segmentacion_minimo_histograma",
     "segmentacion_media",
     "segmentacion_multiples_umbrales",
-    "segmentacion_umbral_banda"
+    "segmentacion_umbral_banda",
+    "umbrales_otsu_multinivel",
+    "segmentacion_otsu_multinivel",
+    
+    # Segmentación en color
+    "convertir_espacio",
+    "umbral_por_canal",
+    "segmentacion_rango_color",
+    "segmentacion_distancia_color",
+    
+    # Segmentación por agrupamiento
+    "asignar_centros",
+    "kmeans_mini_lote",
+    "segmentacion_kmeans",
+    "cuantizacion_color_kmeans",
+    "segmentacion_mean_shift",
+    "cuantizacion_color_mean_shift",
+    "mascara_clusters",
+    "regiones_clusters",
+    
+    # Análisis de histograma
+    "histograma_gris",
+    "suavizar_histograma",
+    "encontrar_picos",
+    "umbral_otsu_histograma",
+    "umbral_minimo_histograma",
+    
+    # Instrumentación
+    "activar_instrumentacion",
+    "desactivar_instrumentacion",
+    "instrumentar",
+    "medir_operacion",
+    "obtener_registros",
+    "limpiar_registros",
+    "resumen_registros",
+    "exportar_traza_chrome"
 ]
 
 
@@ -141,12 +322,29 @@ __all__ = [
 # - imagen_multiversion.py: Clase ImagenMultiVersion
 # - operaciones_aritmeticas.py: Operaciones aritméticas con escalares e imágenes
 # - operaciones_logicas.py: Operaciones lógicas (AND, OR, XOR, NOT)
-# - componentes_conexas.py: Análisis de componentes conexas
+# - componentes_conexas.py: Análisis de componentes conexas (etiquetado paralelo por franjas)
+# - arbol_componentes.py: Árbol de componentes para etiquetado por umbral
+# - componentes_bandas.py: Estadísticas de componentes por bandas (imágenes grandes)
+# - componentes_rle.py: Componentes codificadas por corridas y dtype compacto de etiquetas
+# - morfologia.py: Secuencias morfológicas fusionadas, descomposición de kernels y reconstrucción
+# - separacion_objetos.py: Separación de objetos que se tocan (distancia + watershed)
+# - descriptores_componentes.py: Descriptores de forma e intensidad por componente (Hu, solidez, Euler)
+# - indice_espacial.py: Rejilla de cajas envolventes para consultas de punto, rectángulo y vecindad
 # - funciones_ruido.py: Generación de ruido (sal y pimienta, gaussiano)
+# - generador_dataset.py: Pares (limpia, ruidosa) en fragmentos .npz
 # - funciones_filtrado.py: Filtros de reducción de ruido y suavizado
+# - convolucion.py: Convolución general (espacial, separable o FFT)
+# - metricas_calidad.py: Métricas con referencia (PSNR, SSIM)
 # - funciones_umbralizacion.py: Técnicas de binarización
+# - umbral_local.py: Umbral local con imágenes integrales (media, gaussiano, Sauvola, Niblack, Wolf)
+# - barrido_umbral.py: Estadísticas y vista previa de todos los umbrales fijos
 # - funciones_brillo.py: Ecualización de histogramas y corrección gamma
+# - ecualizacion_adaptativa.py: CLAHE con histogramas por tesela y LUT en caché por límite de recorte
 # - funciones_segmentacion.py: Técnicas de segmentación (Otsu, Kapur, etc.)
+# - analisis_histograma.py: Suavizado, picos, prominencia y Otsu sobre histogramas (sin SciPy)
+# - segmentacion_color.py: Umbrales por canal, rangos HSV/Lab y distancia a un color
+# - segmentacion_clustering.py: K-means por mini-lotes y mean-shift por histograma; regiones por clase
+# - instrumentacion.py: Medición de tiempo y memoria por operación
 #
 # Este diseño modular facilita el mantenimiento y la extensión del código.
 # ============================================================================
@@ -1,58 +1,174 @@
 """
 Funciones para agregar diferentes tipos de ruido a imágenes.
+
+Todas las funciones usan np.random.Generator: el parámetro semilla acepta un
+entero, una SeedSequence, un Generator ya creado o None (semilla aleatoria).
 """
 
+from concurrent.futures import ThreadPoolExecutor
+
+import cv2
 import numpy as np
 
+from .instrumentacion import instrumentar
+
+
+# Filas procesadas por bloque al generar ruido gaussiano en imágenes uint8
+FILAS_POR_BLOQUE_RUIDO = 256
+
+
+def _obtener_generador(semilla):
+    """Retorna un np.random.Generator a partir de la semilla indicada."""
+    if isinstance(semilla, np.random.Generator):
+        return semilla
+    return np.random.default_rng(semilla)
+
+
+def _preparar_salida(imagen, out):
+    """Retorna el arreglo donde se escribirá el resultado con el contenido de la imagen."""
+    if out is None:
+        return imagen.copy()
+    if out.shape != imagen.shape or out.dtype != imagen.dtype:
+        raise ValueError("out debe tener la misma forma y tipo que la imagen")
+    if out is not imagen:
+        np.copyto(out, imagen)
+    return out
+
+
+def generadores_independientes(semilla, n):
+    """
+    Crea n generadores con flujos estadísticamente independientes.
+
+    Args:
+        semilla: Semilla base (int, SeedSequence o None)
+        n: Número de generadores
+
+    Returns:
+        Lista de np.random.Generator
+    """
+    if not isinstance(semilla, np.random.SeedSequence):
+        semilla = np.random.SeedSequence(semilla)
+    return [np.random.default_rng(s) for s in semilla.spawn(n)]
+
 
-def agregar_ruido_sal_pimienta(imagen, cantidad=0.02):
+@instrumentar
+def agregar_ruido_sal_pimienta(imagen, cantidad=0.02, semilla=None, out=None):
     """
     Agrega ruido sal y pimienta a una imagen.
-    
+
     Args:
         imagen: Imagen de entrada
         cantidad: Proporción de píxeles a afectar (0.0 - 1.0)
-    
+        semilla: Semilla o Generator para reproducibilidad
+        out: Arreglo de salida opcional (puede ser la misma imagen para operar in-place)
+
     Returns:
         Imagen con ruido
     """
-    resultado = imagen.copy()
-    
+    rng = _obtener_generador(semilla)
+    resultado = _preparar_salida(imagen, out)
+
     # Número de píxeles a afectar
     num_pixeles = int(cantidad * imagen.size)
-    
-    # Ruido sal (blanco)
-    coords_sal = [np.random.randint(0, i, num_pixeles // 2) for i in imagen.shape[:2]]
-    resultado[coords_sal[0], coords_sal[1]] = 255
-    
-    # Ruido pimienta (negro)
-    coords_pimienta = [np.random.randint(0, i, num_pixeles // 2) for i in imagen.shape[:2]]
-    resultado[coords_pimienta[0], coords_pimienta[1]] = 0
-    
+    h, w = imagen.shape[:2]
+
+    # Índices lineales de píxel convertidos a (fila, columna); sin reshape,
+    # que copiaría si out es una vista no contigua (todos los canales a la vez)
+    indices = rng.integers(0, h * w, size=2 * (num_pixeles // 2))
+    filas, columnas = np.unravel_index(indices, (h, w))
+    mitad = num_pixeles // 2
+
+    # Ruido sal (blanco) y pimienta (negro)
+    resultado[filas[:mitad], columnas[:mitad]] = 255
+    resultado[filas[mitad:], columnas[mitad:]] = 0
+
     return resultado
 
 
-def agregar_ruido_gaussiano(imagen, media=0, sigma=20):
+@instrumentar
+def agregar_ruido_gaussiano(imagen, media=0, sigma=20, semilla=None, out=None):
     """
     Agrega ruido gaussiano a una imagen.
-    
+
+    En imágenes uint8 el ruido se redondea a int16 y se suma con saturación
+    por bloques de filas, sin promover la imagen completa a punto flotante.
+
     Args:
         imagen: Imagen de entrada
         media: Media de la distribución gaussiana
         sigma: Desviación estándar
-    
+        semilla: Semilla o Generator para reproducibilidad
+        out: Arreglo de salida opcional (puede ser la misma imagen para operar in-place)
+
     Returns:
         Imagen con ruido gaussiano
     """
-    resultado = imagen.copy().astype(np.float32)
-    
-    # Generar ruido gaussiano
-    ruido = np.random.normal(media, sigma, imagen.shape).astype(np.float32)
-    
-    # Agregar ruido
-    resultado = resultado + ruido
-    
-    # Clip para mantener valores válidos
-    resultado = np.clip(resultado, 0, 255)
-    
-    return resultado.astype(np.uint8)
+    rng = _obtener_generador(semilla)
+
+    if imagen.dtype != np.uint8:
+        ruido = rng.normal(media, sigma, imagen.shape).astype(np.float32)
+        resultado = np.clip(imagen.astype(np.float32) + ruido, 0, 255).astype(imagen.dtype)
+        if out is None:
+            return resultado
+        np.copyto(out, resultado)
+        return out
+
+    resultado = _preparar_salida(imagen, out)
+    forma_bloque = (min(FILAS_POR_BLOQUE_RUIDO, imagen.shape[0]),) + imagen.shape[1:]
+    normal = np.empty(forma_bloque, dtype=np.float32)
+    ruido = np.empty(forma_bloque, dtype=np.int16)
+
+    for inicio in range(0, imagen.shape[0], forma_bloque[0]):
+        fin = min(inicio + forma_bloque[0], imagen.shape[0])
+        n = fin - inicio
+        rng.standard_normal(dtype=np.float32, out=normal[:n])
+        normal[:n] *= sigma
+        normal[:n] += media
+        np.rint(normal[:n], out=normal[:n])
+        np.clip(normal[:n], -255, 255, out=normal[:n])
+        ruido[:n] = normal[:n]
+
+        # Suma con saturación a [0, 255] directamente en uint8; cv2 no acepta
+        # vistas con paso entre columnas, que se suman en una copia contigua
+        bloque = resultado[inicio:fin]
+        if bloque.flags.c_contiguous:
+            cv2.add(bloque, ruido[:n], dst=bloque, dtype=cv2.CV_8U)
+        else:
+            np.copyto(bloque, cv2.add(np.ascontiguousarray(bloque), ruido[:n], dtype=cv2.CV_8U))
+
+    return resultado
+
+
+@instrumentar
+def agregar_ruido_lote(imagenes, tipo='gaussiano', semilla=None, trabajadores=None, **parametros):
+    """
+    Agrega ruido a un lote de imágenes usando flujos aleatorios independientes.
+
+    Cada imagen recibe su propio generador derivado de la semilla, por lo que
+    el resultado es reproducible sin importar el número de hilos.
+
+    Args:
+        imagenes: Lista de imágenes
+        tipo: 'gaussiano' o 'sal_pimienta'
+        semilla: Semilla base del lote
+        trabajadores: Número de hilos (None usa el valor por defecto del sistema)
+        **parametros: Parámetros del generador (media, sigma o cantidad)
+
+    Returns:
+        Lista de imágenes con ruido
+    """
+    if tipo == 'gaussiano':
+        funcion = agregar_ruido_gaussiano
+    elif tipo == 'sal_pimienta':
+        funcion = agregar_ruido_sal_pimienta
+    else:
+        raise ValueError(f"Tipo de ruido no válido: {tipo}")
+
+    imagenes = list(imagenes)
+    generadores = generadores_independientes(semilla, len(imagenes))
+
+    with ThreadPoolExecutor(max_workers=trabajadores) as ejecutor:
+        return list(ejecutor.map(
+            lambda par: funcion(par[0], semilla=par[1], **parametros),
+            zip(imagenes, generadores)
+        ))
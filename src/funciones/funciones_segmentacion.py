@@ -5,7 +5,11 @@ Funciones de segmentacion de imagenes por diferentes tecnicas.
 import cv2
 import numpy as np
 
+from .analisis_histograma import histograma_gris, umbral_minimo_histograma
+from .instrumentacion import instrumentar
 
+
+@instrumentar
 def segmentacion_otsu(imagen):
     """
     Aplica segmentacion por metodo de Otsu.
@@ -22,6 +26,7 @@ def segmentacion_otsu(imagen):
     return imagen_segmentada, umbral
 
 
+@instrumentar
 def entropia_kapur(histograma, total_pixceles):
     """
     Calcula el umbral óptimo usando entropía de Kapur.
@@ -71,6 +76,7 @@ def entropia_kapur(histograma, total_pixceles):
     return umbral_optimo
 
 
+@instrumentar
 def segmentacion_kapur(imagen):
     """
     Aplica segmentación por técnica de entropía de Kapur.
@@ -93,50 +99,33 @@ def segmentacion_kapur(imagen):
     return imagen_segmentada, umbral
 
 
-def segmentacion_minimo_histograma(imagen):
+@instrumentar
+def segmentacion_minimo_histograma(imagen, histograma=None):
     """
     Aplica segmentación por método del mínimo del histograma.
     Encuentra el mínimo entre los dos picos más prominentes.
     
     Args:
         imagen: Imagen de entrada
+        histograma: Histograma de 256 niveles ya calculado (opcional)
         
     Returns:
         Tupla (imagen_segmentada, umbral_utilizado)
     """
-    from scipy.signal import find_peaks
-    from scipy.ndimage import gaussian_filter1d
-    
     if len(imagen.shape) == 3:
         imagen = cv2.cvtColor(imagen, cv2.COLOR_BGR2GRAY)
     
-    histograma, _ = np.histogram(imagen, bins=256, range=(0, 256))
-    
-    # Suavizar histograma para mejor detección de picos
-    histograma_suavizado = gaussian_filter1d(histograma.astype(float), sigma=2)
-    
-    # Encontrar picos con prominencia mínima
-    picos, propiedades = find_peaks(histograma_suavizado, prominence=np.max(histograma_suavizado)*0.1)
+    if histograma is None:
+        histograma = histograma_gris(imagen)
     
-    if len(picos) >= 2:
-        # Ordenar picos por prominencia (altura)
-        prominencias = propiedades['prominences']
-        indices_ordenados = np.argsort(prominencias)[::-1]
-        dos_picos_principales = np.sort(picos[indices_ordenados[:2]])
-        
-        # Buscar el mínimo entre los dos picos principales
-        region = histograma_suavizado[dos_picos_principales[0]:dos_picos_principales[1]+1]
-        minimo = np.argmin(region) + dos_picos_principales[0]
-    else:
-        # Fallback: usar método de Otsu si no hay picos claros
-        minimo, _ = cv2.threshold(imagen, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
-        minimo = int(minimo)
-    
-    imagen_segmentada = (imagen > minimo).astype(np.uint8) * 255
+    # Sin picos claros se usa Otsu sobre el mismo histograma
+    minimo = umbral_minimo_histograma(histograma)
+    _, imagen_segmentada = cv2.threshold(imagen, minimo, 255, cv2.THRESH_BINARY)
     
     return imagen_segmentada, minimo
 
 
+@instrumentar
 def segmentacion_media(imagen):
     """
     Aplica segmentación por umbral de media.
@@ -156,30 +145,57 @@ def segmentacion_media(imagen):
     return imagen_segmentada, umbral
 
 
-def segmentacion_multiples_umbrales(imagen, T1, T2):
+def _lut_clases(umbrales, niveles=None):
+    """
+    LUT que asigna a cada nivel de gris el valor de su clase.
+    
+    La clase de un nivel v es el número de umbrales <= v (v >= T pasa a la
+    clase siguiente).
+    
+    Args:
+        umbrales: Umbrales en orden creciente
+        niveles: Valor de salida de cada clase (por defecto repartidos en 0..255)
+    
+    Returns:
+        LUT uint8 de 256 entradas
+    """
+    umbrales = np.asarray(umbrales)
+    n = umbrales.size
+    if niveles is None:
+        niveles = 255 * np.arange(n + 1) // max(n, 1)
+    niveles = np.asarray(niveles)
+    if niveles.size != n + 1:
+        raise ValueError(f"Se esperaban {n + 1} niveles de salida para {n} umbrales")
+    clases = np.searchsorted(umbrales, np.arange(256), side='right')
+    return niveles[clases].astype(np.uint8)
+
+
+@instrumentar
+def segmentacion_multiples_umbrales(imagen, *umbrales, niveles=None):
     """
     Aplica segmentación por múltiples umbrales.
     
+    Cada píxel se asigna a su clase con una sola pasada de LUT, sea cual sea
+    el número de umbrales.
+    
     Args:
         imagen: Imagen de entrada
-        T1: Primer umbral
-        T2: Segundo umbral
+        *umbrales: Umbrales T1 < T2 < ... (v < T1 → clase 0, T1 <= v < T2 → clase 1, ...)
+        niveles: Valor de salida de cada clase (por defecto repartidos en 0..255)
         
     Returns:
-        Imagen segmentada con tres niveles (0, 127, 255)
+        Imagen segmentada (con dos umbrales, tres niveles: 0, 127, 255)
     """
     if len(imagen.shape) == 3:
         imagen = cv2.cvtColor(imagen, cv2.COLOR_BGR2GRAY)
+    if list(umbrales) != sorted(umbrales):
+        raise ValueError("Los umbrales deben estar en orden creciente")
     
-    imagen_segmentada = np.zeros_like(imagen)
-    imagen_segmentada[imagen < T1] = 0
-    imagen_segmentada[(imagen >= T1) & (imagen < T2)] = 127
-    imagen_segmentada[imagen >= T2] = 255
-    
-    return imagen_segmentada
+    return cv2.LUT(imagen, _lut_clases(umbrales, niveles))
 
 
-def segmentacion_umbral_banda(imagen, T1, T2):
+@instrumentar
+def segmentacion_umbral_banda(imagen, T1, T2, *bandas):
     """
     Aplica segmentación por umbral banda.
     
@@ -187,14 +203,90 @@ def segmentacion_umbral_banda(imagen, T1, T2):
         imagen: Imagen de entrada
         T1: Umbral inferior
         T2: Umbral superior
+        *bandas: Pares adicionales (inferior, superior) de otras bandas
         
     Returns:
-        Imagen segmentada (binaria)
+        Imagen segmentada (binaria): 255 en los píxeles con T1 <= v <= T2 (o dentro de otra banda)
     """
     if len(imagen.shape) == 3:
         imagen = cv2.cvtColor(imagen, cv2.COLOR_BGR2GRAY)
+    if len(bandas) % 2:
+        raise ValueError("Las bandas adicionales se indican por pares (inferior, superior)")
+    
+    lut = np.zeros(256, dtype=np.uint8)
+    limites = (T1, T2) + bandas
+    for inferior, superior in zip(limites[::2], limites[1::2]):
+        lut[max(int(inferior), 0):min(int(superior), 255) + 1] = 255
+    
+    return cv2.LUT(imagen, lut)
+
+
+@instrumentar
+def umbrales_otsu_multinivel(histograma, numero_umbrales=2):
+    """
+    Umbrales de Otsu multinivel por programación dinámica.
+    
+    Maximiza la varianza entre clases, que equivale a maximizar la suma de
+    S_k² / W_k sobre las clases (W_k píxeles y S_k suma de niveles de cada
+    clase). Con sumas acumuladas el costo de una clase es O(1) y la
+    programación dinámica es O(numero_umbrales · L²) en lugar de probar todas
+    las combinaciones.
     
-    imagen_segmentada = np.zeros_like(imagen)
-    imagen_segmentada[(imagen >= T1) & (imagen <= T2)] = 255
+    Args:
+        histograma: Histograma de la imagen (L niveles)
+        numero_umbrales: Número de umbrales a buscar (1-4)
+    
+    Returns:
+        Lista de umbrales crecientes con la convención de segmentacion_multiples_umbrales
+        (el nivel T pertenece a la clase superior)
+    """
+    histograma = np.asarray(histograma, dtype=np.float64)
+    niveles = histograma.size
+    if not 1 <= numero_umbrales < niveles:
+        raise ValueError(f"numero_umbrales debe estar entre 1 y {niveles - 1}")
+    
+    # Costo de la clase formada por los niveles i..j-1 (0 <= i < j <= L)
+    W = np.concatenate(([0.0], np.cumsum(histograma)))
+    S = np.concatenate(([0.0], np.cumsum(histograma * np.arange(niveles))))
+    pesos = W[None, :] - W[:, None]
+    sumas = S[None, :] - S[:, None]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        costo = np.where(pesos > 0, sumas * sumas / pesos, 0.0)
+    # Cada clase tiene al menos un nivel
+    costo[np.tril_indices(niveles + 1)] = -np.inf
+    
+    # mejor[j]: mejor valor repartiendo los niveles 0..j-1 en k + 1 clases
+    mejor = costo[0].copy()
+    cortes = []
+    for _ in range(numero_umbrales):
+        candidatos = mejor[:, None] + costo
+        cortes.append(np.argmax(candidatos, axis=0))
+        mejor = candidatos[cortes[-1], np.arange(niveles + 1)]
+    
+    # Reconstruir los cortes desde el final: cada corte es el primer nivel de la clase siguiente
+    umbrales = []
+    j = niveles
+    for corte in reversed(cortes):
+        j = int(corte[j])
+        umbrales.append(j)
+    return umbrales[::-1]
+
+
+@instrumentar
+def segmentacion_otsu_multinivel(imagen, numero_umbrales=2):
+    """
+    Aplica segmentación por Otsu multinivel.
+    
+    Args:
+        imagen: Imagen de entrada
+        numero_umbrales: Número de umbrales (numero_umbrales + 1 clases)
+        
+    Returns:
+        Tupla (imagen_segmentada, umbrales_utilizados)
+    """
+    if len(imagen.shape) == 3:
+        imagen = cv2.cvtColor(imagen, cv2.COLOR_BGR2GRAY)
     
-    return imagen_segmentada
+    histograma = np.bincount(imagen.ravel(), minlength=256)
+    umbrales = umbrales_otsu_multinivel(histograma, numero_umbrales)
+    return segmentacion_multiples_umbrales(imagen, *umbrales), umbrales
@@ -5,7 +5,11 @@ Funciones de umbralización para binarización de imágenes.
 import cv2
 import numpy as np
 
+from .instrumentacion import instrumentar
+from .umbral_local import umbral_local
 
+
+@instrumentar
 def umbral_fijo(imagen, umbral=127):
     """
     Aplica umbralización con valor fijo.
@@ -19,30 +23,25 @@ def umbral_fijo(imagen, umbral=127):
     """
     # Convertir a grises si es necesario
     if len(imagen.shape) == 3:
-        imagen = cv2.cvtColor(imagen, cv2.COLOR_RGB2GRAY)
+        imagen = cv2.cvtColor(imagen, cv2.COLOR_BGR2GRAY)
     
     _, resultado = cv2.threshold(imagen, umbral, 255, cv2.THRESH_BINARY)
     return resultado
 
 
-def umbral_adaptativo(imagen, block_size=11, C=2):
+@instrumentar
+def umbral_adaptativo(imagen, block_size=11, C=2, metodo='gaussiano', k=None):
     """
     Aplica umbralización adaptativa.
     
     Args:
         imagen: Imagen de entrada (se convierte a grises si es color)
         block_size: Tamaño del bloque (debe ser impar)
-        C: Constante a restar de la media
+        C: Constante a restar de la media (métodos media y gaussiano)
+        metodo: 'media', 'gaussiano', 'sauvola', 'niblack' o 'wolf' (ver umbral_local)
+        k: Sensibilidad de Sauvola, Niblack y Wolf (None usa el valor por defecto del método)
     
     Returns:
         Imagen binarizada
     """
-    # Convertir a grises si es necesario
-    if len(imagen.shape) == 3:
-        imagen = cv2.cvtColor(imagen, cv2.COLOR_RGB2GRAY)
-    
-    resultado = cv2.adaptiveThreshold(
-        imagen, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C,
-        cv2.THRESH_BINARY, block_size, C
-    )
-    return resultado
+    return umbral_local(imagen, metodo, block_size, C, k)
@@ -0,0 +1,174 @@
+"""
+Generación de conjuntos de datos de pares (limpia, ruidosa) para evaluar filtros.
+
+Los pares se producen en streaming: un grupo de hilos precarga y contamina las
+imágenes por adelantado y el escritor las guarda en fragmentos .npz con un
+índice JSON, sin mantener el conjunto completo en memoria.
+"""
+
+import json
+import os
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+import cv2
+import numpy as np
+
+from .funciones_ruido import agregar_ruido_sal_pimienta, agregar_ruido_gaussiano
+from .instrumentacion import instrumentar
+
+
+NOMBRE_INDICE = "indice.json"
+
+
+def barrido_configuraciones(cantidades=(0.01, 0.02, 0.05, 0.1), sigmas=(5, 10, 20, 40), media=0):
+    """
+    Construye la lista de configuraciones de ruido para un barrido de niveles.
+
+    Args:
+        cantidades: Niveles de ruido sal y pimienta
+        sigmas: Desviaciones estándar del ruido gaussiano
+        media: Media del ruido gaussiano
+
+    Returns:
+        Lista de diccionarios {'tipo': ..., parámetros...}
+    """
+    configuraciones = [{'tipo': 'sal_pimienta', 'cantidad': c} for c in cantidades]
+    configuraciones += [{'tipo': 'gaussiano', 'media': media, 'sigma': s} for s in sigmas]
+    return configuraciones
+
+
+def _aplicar_configuracion(imagen, configuracion, rng):
+    """Aplica una configuración de ruido con el generador indicado."""
+    parametros = {k: v for k, v in configuracion.items() if k != 'tipo'}
+    if configuracion['tipo'] == 'sal_pimienta':
+        return agregar_ruido_sal_pimienta(imagen, semilla=rng, **parametros)
+    if configuracion['tipo'] == 'gaussiano':
+        return agregar_ruido_gaussiano(imagen, semilla=rng, **parametros)
+    raise ValueError(f"Tipo de ruido no válido: {configuracion['tipo']}")
+
+
+def _procesar_imagen(indice, fuente, configuraciones, semillas):
+    """Carga una imagen y genera todos sus pares (trabajo de un hilo)."""
+    if isinstance(fuente, str):
+        limpia = cv2.imread(fuente)
+        if limpia is None:
+            raise FileNotFoundError(f"No se pudo cargar la imagen: {fuente}")
+        origen = fuente
+    else:
+        limpia = fuente
+        origen = indice
+
+    pares = []
+    for configuracion, semilla in zip(configuraciones, semillas):
+        ruidosa = _aplicar_configuracion(limpia, configuracion, np.random.default_rng(semilla))
+        metadatos = dict(configuracion, imagen=indice, origen=origen)
+        pares.append((limpia, ruidosa, metadatos))
+    return pares
+
+
+def generar_pares_ruido(imagenes, configuraciones=None, semilla=None, trabajadores=None, prefetch=8):
+    """
+    Genera pares (limpia, ruidosa, metadatos) en streaming.
+
+    Cada combinación imagen × configuración recibe un flujo aleatorio propio
+    derivado de la semilla, por lo que el resultado es reproducible y no
+    depende del número de hilos. El orden de salida es el de entrada.
+
+    Args:
+        imagenes: Iterable de imágenes (numpy array) o rutas de archivo
+        configuraciones: Lista de configuraciones (ver barrido_configuraciones)
+        semilla: Semilla base del conjunto
+        trabajadores: Número de hilos de precarga
+        prefetch: Número máximo de imágenes procesadas por adelantado
+
+    Yields:
+        Tupla (limpia, ruidosa, metadatos)
+    """
+    if configuraciones is None:
+        configuraciones = barrido_configuraciones()
+    secuencia = semilla if isinstance(semilla, np.random.SeedSequence) else np.random.SeedSequence(semilla)
+
+    pendientes = deque()
+    with ThreadPoolExecutor(max_workers=trabajadores) as ejecutor:
+        for indice, fuente in enumerate(imagenes):
+            semillas = secuencia.spawn(len(configuraciones))
+            pendientes.append(ejecutor.submit(_procesar_imagen, indice, fuente, configuraciones, semillas))
+
+            # Limitar el trabajo adelantado para acotar la memoria
+            if len(pendientes) >= prefetch:
+                yield from pendientes.popleft().result()
+
+        while pendientes:
+            yield from pendientes.popleft().result()
+
+
+@instrumentar
+def escribir_dataset_fragmentado(pares, directorio, pares_por_fragmento=256, comprimir=False):
+    """
+    Escribe un flujo de pares en fragmentos .npz con un índice JSON.
+
+    Dentro de cada fragmento la imagen limpia se guarda una sola vez aunque
+    aparezca en varias configuraciones de ruido.
+
+    Args:
+        pares: Iterable de tuplas (limpia, ruidosa, metadatos)
+        directorio: Carpeta de salida (se crea si no existe)
+        pares_por_fragmento: Número de pares por archivo
+        comprimir: Si usar np.savez_compressed
+
+    Returns:
+        Ruta del archivo de índice
+    """
+    os.makedirs(directorio, exist_ok=True)
+    guardar = np.savez_compressed if comprimir else np.savez
+    indice = {'fragmentos': [], 'total_pares': 0}
+
+    def volcar(arreglos, muestras):
+        nombre = f"fragmento_{len(indice['fragmentos']):05d}.npz"
+        guardar(os.path.join(directorio, nombre), **arreglos)
+        indice['fragmentos'].append({'archivo': nombre, 'muestras': muestras})
+        indice['total_pares'] += len(muestras)
+
+    arreglos, muestras = {}, []
+    for limpia, ruidosa, metadatos in pares:
+        clave_limpia = f"limpia_{metadatos['imagen']}"
+        if clave_limpia not in arreglos:
+            arreglos[clave_limpia] = limpia
+        clave_ruidosa = f"ruidosa_{len(muestras)}"
+        arreglos[clave_ruidosa] = ruidosa
+        muestras.append(dict(metadatos, limpia=clave_limpia, ruidosa=clave_ruidosa))
+
+        if len(muestras) >= pares_por_fragmento:
+            volcar(arreglos, muestras)
+            arreglos, muestras = {}, []
+
+    if muestras:
+        volcar(arreglos, muestras)
+
+    ruta_indice = os.path.join(directorio, NOMBRE_INDICE)
+    with open(ruta_indice, 'w', encoding='utf-8') as archivo:
+        json.dump(indice, archivo, ensure_ascii=False, indent=2, default=str)
+    return ruta_indice
+
+
+def leer_dataset_fragmentado(directorio):
+    """
+    Recorre un conjunto escrito por escribir_dataset_fragmentado.
+
+    Solo un fragmento se mantiene abierto a la vez.
+
+    Args:
+        directorio: Carpeta del conjunto
+
+    Yields:
+        Tupla (limpia, ruidosa, metadatos)
+    """
+    with open(os.path.join(directorio, NOMBRE_INDICE), encoding='utf-8') as archivo:
+        indice = json.load(archivo)
+
+    for fragmento in indice['fragmentos']:
+        with np.load(os.path.join(directorio, fragmento['archivo'])) as datos:
+            for muestra in fragmento['muestras']:
+                metadatos = {k: v for k, v in muestra.items() if k not in ('limpia', 'ruidosa')}
+                yield datos[muestra['limpia']], datos[muestra['ruidosa']], metadatos
@@ -0,0 +1,217 @@
+"""
+Índice espacial sobre las cajas envolventes de las componentes.
+
+Las cajas se reparten en una rejilla uniforme guardada en formato CSR
+(índices de caja ordenados por celda más desplazamientos por celda), de modo
+que una consulta de punto o rectángulo solo revisa las cajas de las celdas
+que toca. Las cajas que cubrirían demasiadas celdas se guardan aparte y se
+revisan siempre.
+"""
+
+import numpy as np
+
+from .instrumentacion import medir_operacion
+
+
+# Una caja que cubre más celdas que esto se revisa en cada consulta en vez de replicarse
+CELDAS_MAXIMAS_POR_CAJA = 64
+
+
+class IndiceEspacial:
+    """
+    Rejilla uniforme de cajas envolventes para consultas de punto, rectángulo y vecindad.
+
+    Attributes:
+        etiquetas: Etiqueta de cada caja
+        x0, y0, x1, y1: Límites de cada caja (x1, y1 exclusivos)
+        tamano_celda: Lado de las celdas de la rejilla en píxeles
+    """
+
+    def __init__(self, cajas, etiquetas=None, tamano_celda=None):
+        """
+        Construye el índice.
+
+        Args:
+            cajas: Arreglo (n, 4) con x, y, ancho, alto
+            etiquetas: Etiqueta de cada caja (por defecto 1..n)
+            tamano_celda: Lado de las celdas (por defecto, el lado mediano de las cajas)
+        """
+        cajas = np.asarray(cajas, dtype=np.int64).reshape(-1, 4)
+        with medir_operacion("IndiceEspacial", (cajas,)):
+            etiquetas = np.arange(1, len(cajas) + 1) if etiquetas is None else np.asarray(etiquetas)
+            # Las cajas vacías (etiquetas sin píxeles) no se indexan
+            validas = (cajas[:, 2] > 0) & (cajas[:, 3] > 0)
+            cajas = cajas[validas]
+            self.etiquetas = etiquetas[validas].astype(np.int64)
+            self.x0, self.y0 = cajas[:, 0], cajas[:, 1]
+            self.x1, self.y1 = self.x0 + cajas[:, 2], self.y0 + cajas[:, 3]
+
+            if tamano_celda is None:
+                tamano_celda = int(np.median(np.maximum(cajas[:, 2], cajas[:, 3]))) if len(cajas) else 1
+            self.tamano_celda = max(int(tamano_celda), 1)
+            self.columnas = int(self.x1.max(initial=0) // self.tamano_celda) + 1
+            self.filas = int(self.y1.max(initial=0) // self.tamano_celda) + 1
+            self._construir()
+
+    @classmethod
+    def desde_estadisticas(cls, stats, tamano_celda=None):
+        """
+        Índice a partir de una matriz de estadísticas indexada por etiqueta.
+
+        Args:
+            stats: Matriz (num_labels, >=4) con x, y, ancho, alto en las
+                   primeras columnas (cv2.connectedComponentsWithStats o
+                   ComponentesRLE.cajas); la fila 0 es el fondo
+            tamano_celda: Lado de las celdas (opcional)
+
+        Returns:
+            IndiceEspacial
+        """
+        stats = np.asarray(stats)
+        return cls(stats[1:, :4], np.arange(1, len(stats)), tamano_celda)
+
+    @classmethod
+    def desde_tabla(cls, tabla, tamano_celda=None):
+        """
+        Índice a partir de una tabla de componentes (ver tabla_componentes).
+
+        Args:
+            tabla: dict columna -> numpy array con etiqueta y bbox_*
+            tamano_celda: Lado de las celdas (opcional)
+
+        Returns:
+            IndiceEspacial
+        """
+        cajas = np.column_stack((tabla['bbox_x'], tabla['bbox_y'], tabla['bbox_ancho'], tabla['bbox_alto']))
+        return cls(cajas, tabla['etiqueta'], tamano_celda)
+
+    def _celdas(self, x0, y0, x1, y1):
+        """Rango de celdas [c0, c1] x [f0, f1] que toca un rectángulo semiabierto."""
+        t = self.tamano_celda
+        return (np.clip(x0 // t, 0, self.columnas - 1), np.clip((x1 - 1) // t, 0, self.columnas - 1),
+                np.clip(y0 // t, 0, self.filas - 1), np.clip((y1 - 1) // t, 0, self.filas - 1))
+
+    def _construir(self):
+        """Reparte las cajas en la rejilla (CSR)."""
+        c0, c1, f0, f1 = self._celdas(self.x0, self.y0, self.x1, self.y1)
+        ancho, alto = c1 - c0 + 1, f1 - f0 + 1
+        cuenta = ancho * alto
+        grandes = cuenta > CELDAS_MAXIMAS_POR_CAJA
+        self._grandes = np.flatnonzero(grandes)
+
+        # Una entrada (caja, celda) por cada celda cubierta, expandida sin bucles
+        pequenas = np.flatnonzero(~grandes)
+        repeticiones = cuenta[pequenas]
+        caja = np.repeat(pequenas, repeticiones)
+        inicio_caja = np.cumsum(repeticiones) - repeticiones
+        k = np.arange(caja.size) - np.repeat(inicio_caja, repeticiones)
+        celda = (f0[caja] + k // ancho[caja]) * self.columnas + c0[caja] + k % ancho[caja]
+
+        orden = np.argsort(celda, kind='stable')
+        self._cajas = caja[orden]
+        self._desplazamientos = np.zeros(self.filas * self.columnas + 1, dtype=np.int64)
+        np.cumsum(np.bincount(celda, minlength=self.filas * self.columnas), out=self._desplazamientos[1:])
+
+    def __len__(self):
+        return self.etiquetas.size
+
+    def _candidatas(self, x0, y0, x1, y1):
+        """Índices de las cajas registradas en las celdas que toca el rectángulo."""
+        c0, c1, f0, f1 = (int(v) for v in self._celdas(x0, y0, x1, y1))
+        tramos = [self._cajas[self._desplazamientos[f * self.columnas + c0]:
+                              self._desplazamientos[f * self.columnas + c1 + 1]]
+                  for f in range(f0, f1 + 1)]
+        return np.unique(np.concatenate(tramos + [self._grandes]))
+
+    def en_punto(self, x, y):
+        """
+        Componentes cuya caja contiene el píxel (x, y).
+
+        Returns:
+            Arreglo de etiquetas ordenado
+        """
+        i = self._candidatas(x, y, x + 1, y + 1)
+        dentro = (self.x0[i] <= x) & (x < self.x1[i]) & (self.y0[i] <= y) & (y < self.y1[i])
+        return np.sort(self.etiquetas[i[dentro]])
+
+    def en_rectangulo(self, x, y, ancho, alto):
+        """
+        Componentes cuya caja se solapa con un rectángulo.
+
+        Args:
+            x, y, ancho, alto: Rectángulo de consulta en píxeles
+
+        Returns:
+            Arreglo de etiquetas ordenado
+        """
+        if ancho <= 0 or alto <= 0:
+            return np.empty(0, dtype=np.int64)
+        i = self._candidatas(x, y, x + ancho, y + alto)
+        solapa = (self.x0[i] < x + ancho) & (x < self.x1[i]) & (self.y0[i] < y + alto) & (y < self.y1[i])
+        return np.sort(self.etiquetas[i[solapa]])
+
+    def vecinos(self, etiqueta, distancia=0):
+        """
+        Componentes cuya caja está a lo sumo a `distancia` píxeles libres de la caja de otra.
+
+        Args:
+            etiqueta: Etiqueta de la componente de referencia
+            distancia: Separación máxima entre cajas (0 = cajas que se tocan o solapan)
+
+        Returns:
+            Arreglo de etiquetas ordenado (sin la propia etiqueta)
+        """
+        i = np.flatnonzero(self.etiquetas == etiqueta)
+        if i.size == 0:
+            return np.empty(0, dtype=np.int64)
+        i = i[0]
+        # Ampliada en d + 1 para incluir las cajas que solo se tocan
+        d = int(distancia) + 1
+        cercanas = self.en_rectangulo(self.x0[i] - d, self.y0[i] - d,
+                                      self.x1[i] - self.x0[i] + 2 * d, self.y1[i] - self.y0[i] + 2 * d)
+        return cercanas[cercanas != etiqueta]
+
+    def pares_cercanos(self, distancia=0):
+        """
+        Todos los pares de componentes con cajas a lo sumo a `distancia` píxeles.
+
+        Los pares se generan dentro de cada celda de una rejilla auxiliar con las
+        cajas ampliadas, sin recorrer las componentes una a una. La distancia
+        entre cajas es la de Chebyshev: número de filas o columnas libres entre ellas.
+
+        Args:
+            distancia: Separación máxima entre cajas
+
+        Returns:
+            Arreglo (pares, 2) de etiquetas con la menor primero, ordenado
+        """
+        d = int(distancia)
+        # Ampliar cada caja d + 1 píxeles hacia la derecha y abajo: dos cajas a
+        # distancia <= d comparten entonces al menos un píxel ampliado, y por tanto una celda
+        ampliado = IndiceEspacial(
+            np.column_stack((self.x0, self.y0, self.x1 - self.x0 + d + 1, self.y1 - self.y0 + d + 1)),
+            np.arange(len(self)), self.tamano_celda + d + 1)
+
+        # Pares dentro de cada celda: cada entrada con las anteriores de su celda
+        cajas = ampliado._cajas
+        celda_de = np.repeat(np.arange(ampliado._desplazamientos.size - 1), np.diff(ampliado._desplazamientos))
+        previas = np.arange(cajas.size) - ampliado._desplazamientos[celda_de]
+        a = np.repeat(cajas, previas)
+        b = cajas[np.arange(a.size) - np.repeat(np.cumsum(previas) - previas, previas)
+                  + np.repeat(ampliado._desplazamientos[celda_de], previas)]
+
+        # Las cajas grandes se comparan con todas
+        grandes = ampliado._grandes
+        if grandes.size:
+            todas = np.arange(len(self))
+            a = np.concatenate((a, np.repeat(grandes, todas.size)))
+            b = np.concatenate((b, np.tile(todas, grandes.size)))
+
+        # Comprobar la separación real entre las cajas originales
+        a, b = np.minimum(a, b), np.maximum(a, b)
+        cerca = ((a != b)
+                 & (np.maximum(self.x0[a], self.x0[b]) - np.minimum(self.x1[a], self.x1[b]) <= d)
+                 & (np.maximum(self.y0[a], self.y0[b]) - np.minimum(self.y1[a], self.y1[b]) <= d))
+        pares = np.column_stack((self.etiquetas[a[cerca]], self.etiquetas[b[cerca]]))
+        pares = np.sort(pares, axis=1)
+        return np.unique(pares, axis=0) if len(pares) else pares.reshape(0, 2)
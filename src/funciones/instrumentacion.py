@@ -0,0 +1,250 @@
+"""
+Instrumentación de las operaciones de procesamiento.
+
+Cada función pública se decora con @instrumentar. Mientras la
+instrumentación está desactivada el decorador solo agrega una comprobación;
+al activarla se registran tiempo de pared, tiempo de CPU, pico de memoria
+(tracemalloc, opcional) y tamaño de entradas y salidas de cada llamada.
+Los registros pueden consultarse, resumirse o exportarse como traza JSON
+de Chrome (chrome://tracing, Perfetto).
+"""
+
+import functools
+import json
+import os
+import threading
+import time
+import tracemalloc
+from collections import deque
+
+import numpy as np
+
+
+MAXIMO_REGISTROS = 100000
+
+_estado = {'activo': False, 'memoria': False}
+_registros = deque(maxlen=MAXIMO_REGISTROS)
+_observadores = []
+_pila = threading.local()
+_origen = time.perf_counter()
+
+
+def activar(memoria=False):
+    """
+    Activa el registro de mediciones.
+
+    Args:
+        memoria: Si medir el pico de memoria con tracemalloc (más costoso)
+    """
+    _estado['activo'] = True
+    _estado['memoria'] = memoria
+    if memoria and not tracemalloc.is_tracing():
+        tracemalloc.start()
+
+
+def desactivar():
+    """Desactiva el registro de mediciones y detiene tracemalloc si se inició."""
+    if _estado['memoria'] and tracemalloc.is_tracing():
+        tracemalloc.stop()
+    _estado['activo'] = False
+    _estado['memoria'] = False
+
+
+def esta_activo():
+    """Indica si la instrumentación está activa."""
+    return _estado['activo']
+
+
+def agregar_observador(callback):
+    """Registra una función que recibe cada registro al terminar una operación."""
+    _observadores.append(callback)
+
+
+def quitar_observador(callback):
+    """Elimina un observador registrado."""
+    if callback in _observadores:
+        _observadores.remove(callback)
+
+
+def obtener_registros():
+    """Retorna una copia de los registros acumulados."""
+    return list(_registros)
+
+
+def limpiar_registros():
+    """Elimina los registros acumulados."""
+    _registros.clear()
+
+
+def _tamano_bytes(valor):
+    """Suma los bytes de los arreglos contenidos en un valor (un nivel de profundidad)."""
+    if isinstance(valor, np.ndarray):
+        return valor.nbytes
+    if isinstance(valor, (list, tuple)):
+        return sum(v.nbytes for v in valor if isinstance(v, np.ndarray))
+    return 0
+
+
+def _forma(valor):
+    """Retorna la forma del primer arreglo contenido en un valor."""
+    if isinstance(valor, np.ndarray):
+        return list(valor.shape)
+    if isinstance(valor, (list, tuple)):
+        for v in valor:
+            if isinstance(v, np.ndarray):
+                return list(v.shape)
+    return None
+
+
+class medir_operacion:
+    """
+    Context manager que registra una operación.
+
+    Puede usarse directamente para medir bloques de código:
+
+        with medir_operacion("pipeline", (imagen,)) as medicion:
+            resultado = ...
+            medicion.salida = resultado
+    """
+
+    def __init__(self, nombre, entradas=()):
+        self.nombre = nombre
+        self.entradas = entradas
+        self.salida = None
+
+    def __enter__(self):
+        if not _estado['activo']:
+            return self
+
+        pila = getattr(_pila, 'marcos', None)
+        if pila is None:
+            pila = _pila.marcos = []
+        self.profundidad = len(pila)
+
+        self.memoria = _estado['memoria'] and tracemalloc.is_tracing()
+        if self.memoria:
+            # El pico se reinicia por operación; el del padre se conserva en su marco
+            actual, pico = tracemalloc.get_traced_memory()
+            if pila:
+                pila[-1].pico_acumulado = max(pila[-1].pico_acumulado, pico)
+            tracemalloc.reset_peak()
+            self.memoria_inicial = actual
+            self.pico_acumulado = actual
+
+        pila.append(self)
+        self.cpu_inicial = time.process_time()
+        self.inicio = time.perf_counter()
+        return self
+
+    def __exit__(self, tipo, valor, traza):
+        if not hasattr(self, 'inicio'):
+            return False
+
+        fin = time.perf_counter()
+        cpu = time.process_time() - self.cpu_inicial
+        pila = _pila.marcos
+        pila.pop()
+
+        pico = None
+        if self.memoria and tracemalloc.is_tracing():
+            _, pico_actual = tracemalloc.get_traced_memory()
+            pico = max(self.pico_acumulado, pico_actual) - self.memoria_inicial
+            if pila:
+                pila[-1].pico_acumulado = max(pila[-1].pico_acumulado, pico_actual)
+
+        registro = {
+            'nombre': self.nombre,
+            'inicio_us': (self.inicio - _origen) * 1e6,
+            'duracion_ms': (fin - self.inicio) * 1000,
+            'cpu_ms': cpu * 1000,
+            'pico_bytes': pico,
+            'bytes_entrada': sum(_tamano_bytes(e) for e in self.entradas),
+            'bytes_salida': _tamano_bytes(self.salida),
+            'forma_entrada': next((f for f in map(_forma, self.entradas) if f is not None), None),
+            'forma_salida': _forma(self.salida),
+            'hilo': threading.get_ident(),
+            'profundidad': self.profundidad,
+            'error': tipo.__name__ if tipo is not None else None,
+        }
+        _registros.append(registro)
+        for observador in list(_observadores):
+            observador(registro)
+        return False
+
+
+def instrumentar(funcion):
+    """Decorador que registra cada llamada a la función cuando la instrumentación está activa."""
+    @functools.wraps(funcion)
+    def envoltura(*args, **kwargs):
+        if not _estado['activo']:
+            return funcion(*args, **kwargs)
+        with medir_operacion(funcion.__name__, args + tuple(kwargs.values())) as medicion:
+            medicion.salida = funcion(*args, **kwargs)
+        return medicion.salida
+    return envoltura
+
+
+def resumen_registros(registros=None):
+    """
+    Agrupa los registros por nombre de operación.
+
+    Args:
+        registros: Lista de registros (None usa los acumulados)
+
+    Returns:
+        Lista de diccionarios (nombre, llamadas, total_ms, medio_ms, max_ms,
+        cpu_ms, pico_max_bytes) ordenada por tiempo total descendente
+    """
+    registros = obtener_registros() if registros is None else registros
+    grupos = {}
+    for r in registros:
+        g = grupos.setdefault(r['nombre'], {
+            'nombre': r['nombre'], 'llamadas': 0, 'total_ms': 0.0, 'max_ms': 0.0,
+            'cpu_ms': 0.0, 'pico_max_bytes': None,
+        })
+        g['llamadas'] += 1
+        g['total_ms'] += r['duracion_ms']
+        g['max_ms'] = max(g['max_ms'], r['duracion_ms'])
+        g['cpu_ms'] += r['cpu_ms']
+        if r['pico_bytes'] is not None:
+            g['pico_max_bytes'] = max(g['pico_max_bytes'] or 0, r['pico_bytes'])
+
+    for g in grupos.values():
+        g['medio_ms'] = g['total_ms'] / g['llamadas']
+    return sorted(grupos.values(), key=lambda g: g['total_ms'], reverse=True)
+
+
+def formatear_registro(registro):
+    """Retorna un texto corto con las métricas de un registro."""
+    texto = f"{registro['nombre']}: {registro['duracion_ms']:.1f} ms (CPU {registro['cpu_ms']:.1f} ms)"
+    if registro['pico_bytes'] is not None:
+        texto += f" | pico {registro['pico_bytes'] / 2**20:.2f} MB"
+    texto += f" | {registro['bytes_entrada'] / 2**20:.2f} → {registro['bytes_salida'] / 2**20:.2f} MB"
+    return texto
+
+
+def exportar_traza_chrome(ruta, registros=None):
+    """
+    Exporta los registros en formato Trace Event de Chrome.
+
+    Args:
+        ruta: Archivo JSON de salida
+        registros: Lista de registros (None usa los acumulados)
+    """
+    registros = obtener_registros() if registros is None else registros
+    pid = os.getpid()
+    eventos = []
+    for r in registros:
+        eventos.append({
+            'name': r['nombre'],
+            'cat': 'procesamiento',
+            'ph': 'X',
+            'ts': r['inicio_us'],
+            'dur': r['duracion_ms'] * 1000,
+            'pid': pid,
+            'tid': r['hilo'],
+            'args': {k: r[k] for k in ('cpu_ms', 'pico_bytes', 'bytes_entrada', 'bytes_salida',
+                                       'forma_entrada', 'forma_salida', 'error')},
+        })
+    with open(ruta, 'w', encoding='utf-8') as archivo:
+        json.dump({'traceEvents': eventos, 'displayTimeUnit': 'ms'}, archivo)
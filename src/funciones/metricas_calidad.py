@@ -0,0 +1,66 @@
+"""
+Métricas de calidad de imagen con referencia (PSNR y SSIM).
+"""
+
+import cv2
+import numpy as np
+
+from .instrumentacion import instrumentar
+
+
+@instrumentar
+def psnr(referencia, imagen, valor_maximo=255.0):
+    """
+    Calcula la relación señal a ruido de pico (PSNR) en decibeles.
+
+    Args:
+        referencia: Imagen de referencia (limpia)
+        imagen: Imagen a evaluar
+        valor_maximo: Valor máximo posible de un píxel
+
+    Returns:
+        PSNR en dB (inf si las imágenes son idénticas)
+    """
+    diferencia = referencia.astype(np.float64) - imagen.astype(np.float64)
+    mse = np.mean(diferencia * diferencia)
+    if mse == 0:
+        return float('inf')
+    return float(10 * np.log10(valor_maximo ** 2 / mse))
+
+
+@instrumentar
+def ssim(referencia, imagen, valor_maximo=255.0, sigma=1.5):
+    """
+    Calcula el índice de similitud estructural (SSIM) medio.
+
+    Usa la ventana gaussiana de 11x11 de Wang et al.; en imágenes a color se
+    promedia el SSIM de cada canal.
+
+    Args:
+        referencia: Imagen de referencia (limpia)
+        imagen: Imagen a evaluar
+        valor_maximo: Valor máximo posible de un píxel
+        sigma: Desviación estándar de la ventana gaussiana
+
+    Returns:
+        SSIM medio en el rango [-1, 1]
+    """
+    c1 = (0.01 * valor_maximo) ** 2
+    c2 = (0.03 * valor_maximo) ** 2
+    x = referencia.astype(np.float32)
+    y = imagen.astype(np.float32)
+
+    def suavizar(a):
+        return cv2.GaussianBlur(a, (11, 11), sigma)
+
+    mu_x = suavizar(x)
+    mu_y = suavizar(y)
+    mu_xx = mu_x * mu_x
+    mu_yy = mu_y * mu_y
+    mu_xy = mu_x * mu_y
+    var_x = suavizar(x * x) - mu_xx
+    var_y = suavizar(y * y) - mu_yy
+    cov_xy = suavizar(x * y) - mu_xy
+
+    mapa = ((2 * mu_xy + c1) * (2 * cov_xy + c2)) / ((mu_xx + mu_yy + c1) * (var_x + var_y + c2))
+    return float(np.mean(mapa))
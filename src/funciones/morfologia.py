@@ -0,0 +1,501 @@
+"""
+Motor de secuencias morfológicas.
+
+Una secuencia de pasos (abrir, cerrar, top-hat...) se expande en erosiones y
+dilataciones elementales y se planifica en el mínimo de pasadas: las
+operaciones consecutivas del mismo tipo se agrupan por elemento estructurante
+en una sola llamada con iteraciones, y los discos grandes se descomponen en
+segmentos de recta (octógono), cuyo costo crece con el diámetro y no con el
+área del disco.
+
+Incluye además la reconstrucción geodésica y sus derivadas (relleno de
+huecos, eliminación de objetos del borde y máximos regionales).
+"""
+
+import cv2
+import numpy as np
+
+from .arbol_componentes import _distintos
+from .instrumentacion import medir_operacion, instrumentar
+
+
+FORMAS = {
+    'elipse': cv2.MORPH_ELLIPSE,
+    'rect': cv2.MORPH_RECT,
+    'cruz': cv2.MORPH_CROSS,
+}
+
+OPERACIONES = ('erosionar', 'dilatar', 'abrir', 'cerrar', 'top_hat', 'black_hat', 'gradiente',
+               'rellenar_huecos', 'eliminar_borde')
+
+# Diámetro a partir del cual las elipses se aproximan con segmentos de recta
+TAMANO_MINIMO_DESCOMPOSICION = 15
+
+# Fracción de píxeles cambiados por debajo de la cual la reconstrucción pasa a la cola
+FRACCION_COLA = 1 / 64
+# Lado mínimo de la imagen para usar los barridos direccionales en la reconstrucción
+LADO_MINIMO_BARRIDOS = 128
+
+# Operaciones elementales de cada paso ('e' erosión, 'd' dilatación)
+_EXPANSION = {
+    'erosionar': ('e',),
+    'dilatar': ('d',),
+    'abrir': ('e', 'd'),
+    'cerrar': ('d', 'e'),
+    'top_hat': ('guardar', 'e', 'd', 'restar_de_guardado'),
+    'black_hat': ('guardar', 'd', 'e', 'restar_guardado'),
+}
+
+
+def elemento_estructurante(forma, tamano):
+    """
+    Crea un elemento estructurante cuadrado de la forma indicada.
+
+    Args:
+        forma: 'elipse', 'rect' o 'cruz'
+        tamano: Lado del elemento en píxeles
+
+    Returns:
+        Kernel uint8
+    """
+    if forma not in FORMAS:
+        raise ValueError(f"Forma no válida: {forma}. Use una de {list(FORMAS)}")
+    return cv2.getStructuringElement(FORMAS[forma], (tamano, tamano))
+
+
+def descomponer_elemento(forma, tamano, tamano_minimo=TAMANO_MINIMO_DESCOMPOSICION):
+    """
+    Descompone un elemento estructurante en factores de suma de Minkowski.
+
+    Erosionar (o dilatar) sucesivamente con cada factor equivale a hacerlo con
+    el elemento completo. Las elipses de tamaño >= tamano_minimo se aproximan
+    con un octógono formado por segmentos horizontal, vertical y diagonales;
+    los rectángulos ya son separables dentro de OpenCV y no se descomponen.
+
+    Args:
+        forma: 'elipse', 'rect' o 'cruz'
+        tamano: Lado del elemento en píxeles
+        tamano_minimo: Tamaño mínimo de elipse a descomponer (None nunca)
+
+    Returns:
+        Lista de tuplas (clave, kernel); la clave identifica factores iguales
+    """
+    if forma != 'elipse' or tamano_minimo is None or tamano < tamano_minimo:
+        return [((forma, tamano), elemento_estructurante(forma, tamano))]
+
+    # Octógono casi regular de radio r: r = (lado_recto - 1) / 2 + (lado_diagonal - 1)
+    radio = (tamano - 1) // 2
+    m = max(1, int(round(radio / (2 + np.sqrt(2)))))
+    recto = 2 * (radio - 2 * m) + 1
+    diagonal = 2 * m + 1
+
+    factores = [
+        (('horizontal', recto), np.ones((1, recto), np.uint8)),
+        (('vertical', recto), np.ones((recto, 1), np.uint8)),
+        (('diagonal', diagonal), np.eye(diagonal, dtype=np.uint8)),
+        (('antidiagonal', diagonal), np.fliplr(np.eye(diagonal, dtype=np.uint8)).copy()),
+    ]
+    return [(clave, kernel) for clave, kernel in factores if kernel.size > 1]
+
+
+class SecuenciaMorfologica:
+    """
+    Secuencia de operaciones morfológicas planificada en pasadas mínimas.
+
+    Ejemplo:
+        secuencia = SecuenciaMorfologica().agregar('cerrar', 'elipse', 3).agregar('abrir', 'elipse', 3)
+        resultado = secuencia.aplicar(binaria)
+
+    Attributes:
+        pasos: Lista de tuplas (operacion, forma, tamano)
+        tamano_minimo_descomposicion: Ver descomponer_elemento
+    """
+
+    def __init__(self, pasos=(), tamano_minimo_descomposicion=TAMANO_MINIMO_DESCOMPOSICION):
+        self.pasos = []
+        self.tamano_minimo_descomposicion = tamano_minimo_descomposicion
+        self._plan = None
+        for paso in pasos:
+            self.agregar(*paso)
+
+    def agregar(self, operacion, forma='elipse', tamano=3):
+        """
+        Añade un paso a la secuencia.
+
+        Args:
+            operacion: Una de OPERACIONES
+            forma: 'elipse', 'rect' o 'cruz'
+            tamano: Lado del elemento estructurante
+
+        Returns:
+            La propia secuencia (para encadenar)
+        """
+        if operacion not in OPERACIONES:
+            raise ValueError(f"Operación no válida: {operacion}. Use una de {list(OPERACIONES)}")
+        if forma not in FORMAS:
+            raise ValueError(f"Forma no válida: {forma}. Use una de {list(FORMAS)}")
+        self.pasos.append((operacion, forma, int(tamano)))
+        self._plan = None
+        return self
+
+    def plan(self):
+        """
+        Pasadas que ejecuta la secuencia.
+
+        Las erosiones (o dilataciones) consecutivas se agrupan: como la suma
+        de Minkowski es conmutativa, cada factor distinto se aplica una sola
+        vez con el número de iteraciones acumulado.
+
+        Returns:
+            Lista de tuplas (tipo, clave, kernel, iteraciones); tipo es
+            'erosionar', 'dilatar', 'gradiente', 'guardar', 'restar_de_guardado',
+            'restar_guardado' o una reconstrucción ('rellenar_huecos', 'eliminar_borde')
+        """
+        if self._plan is not None:
+            return self._plan
+
+        plan = []
+        grupo_tipo, grupo = None, {}
+
+        def cerrar_grupo():
+            for clave, (kernel, iteraciones) in grupo.items():
+                plan.append((grupo_tipo, clave, kernel, iteraciones))
+            grupo.clear()
+
+        for operacion, forma, tamano in self.pasos:
+            if operacion == 'gradiente':
+                cerrar_grupo()
+                grupo_tipo = None
+                plan.append(('gradiente', (forma, tamano), elemento_estructurante(forma, tamano), 1))
+                continue
+            if operacion in _RECONSTRUCCIONES:
+                cerrar_grupo()
+                grupo_tipo = None
+                plan.append((operacion, None, None, 1))
+                continue
+
+            factores = descomponer_elemento(forma, tamano, self.tamano_minimo_descomposicion)
+            for elemental in _EXPANSION[operacion]:
+                if elemental in ('e', 'd'):
+                    tipo = 'erosionar' if elemental == 'e' else 'dilatar'
+                    if tipo != grupo_tipo:
+                        cerrar_grupo()
+                        grupo_tipo = tipo
+                    for clave, kernel in factores:
+                        anterior = grupo.get(clave)
+                        grupo[clave] = (kernel, 1 if anterior is None else anterior[1] + 1)
+                else:
+                    cerrar_grupo()
+                    grupo_tipo = None
+                    plan.append((elemental, None, None, 1))
+        cerrar_grupo()
+
+        self._plan = plan
+        return plan
+
+    def numero_pasadas(self):
+        """Número de llamadas a OpenCV que realiza la secuencia."""
+        return sum(1 for tipo, _, _, _ in self.plan()
+                   if tipo in ('erosionar', 'dilatar', 'gradiente') or tipo in _RECONSTRUCCIONES)
+
+    def describir(self):
+        """
+        Texto legible de la secuencia y su plan, para la interfaz.
+
+        Returns:
+            Cadena como "cerrar(elipse 3) → abrir(elipse 3) | 3 pasadas"
+        """
+        if not self.pasos:
+            return "Sin operaciones"
+        pasos = " → ".join(op if op in _RECONSTRUCCIONES else f"{op}({forma} {tamano})"
+                           for op, forma, tamano in self.pasos)
+        return f"{pasos} | {self.numero_pasadas()} pasadas"
+
+    def aplicar(self, imagen, en_sitio=False):
+        """
+        Ejecuta la secuencia.
+
+        Args:
+            imagen: Imagen (gris o binaria)
+            en_sitio: Si escribir el resultado sobre la propia imagen
+
+        Returns:
+            Imagen resultante (la misma imagen si en_sitio)
+        """
+        with medir_operacion("SecuenciaMorfologica", (imagen,)):
+            salida = imagen if en_sitio else None
+            guardadas = []
+            actual = imagen
+
+            for tipo, _, kernel, iteraciones in self.plan():
+                if tipo == 'erosionar':
+                    actual = cv2.erode(actual, kernel, dst=salida, iterations=iteraciones)
+                elif tipo == 'dilatar':
+                    actual = cv2.dilate(actual, kernel, dst=salida, iterations=iteraciones)
+                elif tipo == 'gradiente':
+                    actual = cv2.morphologyEx(actual, cv2.MORPH_GRADIENT, kernel, dst=salida)
+                elif tipo == 'guardar':
+                    guardadas.append(actual.copy() if actual is salida else actual)
+                    continue
+                elif tipo in _RECONSTRUCCIONES:
+                    resultado = _RECONSTRUCCIONES[tipo](actual)
+                    if salida is not None:
+                        np.copyto(salida, resultado)
+                        resultado = salida
+                    actual = resultado
+                elif tipo == 'restar_de_guardado':
+                    actual = cv2.subtract(guardadas.pop(), actual, dst=salida)
+                else:
+                    actual = cv2.subtract(actual, guardadas.pop(), dst=salida)
+                # Tras la primera pasada se reutiliza el mismo búfer
+                salida = actual
+
+            if actual is imagen and not en_sitio:
+                actual = imagen.copy()
+            return actual
+
+
+@instrumentar
+def aplicar_secuencia_morfologica(imagen, pasos, en_sitio=False):
+    """
+    Aplica una lista de pasos morfológicos (ver SecuenciaMorfologica).
+
+    Args:
+        imagen: Imagen (gris o binaria)
+        pasos: Lista de tuplas (operacion, forma, tamano) o SecuenciaMorfologica
+        en_sitio: Si escribir el resultado sobre la propia imagen
+
+    Returns:
+        Imagen resultante
+    """
+    secuencia = pasos if isinstance(pasos, SecuenciaMorfologica) else SecuenciaMorfologica(pasos)
+    return secuencia.aplicar(imagen, en_sitio=en_sitio)
+
+
+def _es_binaria(imagen):
+    """Indica si la imagen solo tiene dos valores: 0 y su máximo."""
+    if imagen.dtype == bool:
+        return True
+    maximo = imagen.max(initial=0)
+    return bool(np.all((imagen == 0) | (imagen == maximo)))
+
+
+def _componentes_marcadas(mascara, marcador, conectividad):
+    """
+    Componentes de la máscara binaria que contienen algún píxel del marcador.
+
+    Es la reconstrucción binaria por dilatación: una pasada de etiquetado y
+    una tabla de búsqueda, sin propagar frentes píxel a píxel.
+    """
+    _, labels = cv2.connectedComponents(mascara.astype(np.uint8), connectivity=conectividad, ltype=cv2.CV_32S)
+    marcadas = np.zeros(int(labels.max()) + 1, dtype=bool)
+    marcadas[labels[marcador]] = True
+    marcadas[0] = False
+    return marcadas[labels]
+
+
+def _borde(forma):
+    """Máscara booleana del marco de un píxel de la imagen."""
+    borde = np.zeros(forma, dtype=bool)
+    borde[[0, -1], :] = True
+    borde[:, [0, -1]] = True
+    return borde
+
+
+@instrumentar
+def reconstruccion_dilatacion(marcador, mascara, conectividad=8):
+    """
+    Reconstrucción geodésica por dilatación del marcador bajo la máscara.
+
+    En imágenes binarias conserva las componentes de la máscara que tocan el
+    marcador (una pasada de etiquetado). En escala de grises se usa el
+    esquema híbrido: dilataciones geodésicas completas mientras el frente es
+    grande y después una cola con solo los píxeles que cambiaron.
+
+    Args:
+        marcador: Imagen marcador (se recorta a la máscara)
+        mascara: Imagen máscara del mismo tamaño
+        conectividad: 4 u 8
+
+    Returns:
+        Imagen reconstruida con el dtype de la máscara
+    """
+    if _es_binaria(mascara) and _es_binaria(marcador):
+        # El marcador se recorta a la máscara: las componentes marcadas toman
+        # el menor de los dos máximos (un marcador booleano no limita)
+        valor = 1 if mascara.dtype == bool else mascara.max(initial=0)
+        if marcador.dtype != bool:
+            valor = min(valor, marcador.max(initial=0))
+        conservar = _componentes_marcadas(mascara > 0, (marcador > 0) & (mascara > 0), conectividad)
+        return (conservar * valor).astype(mascara.dtype)
+
+    if mascara.dtype != marcador.dtype:
+        raise ValueError("El marcador y la máscara deben tener el mismo dtype")
+
+    return _reconstruccion_gris(np.minimum(marcador, mascara), mascara, conectividad)
+
+
+def _barridos(actual, mascara):
+    """
+    Propaga el marcador en los cuatro sentidos de barrido (en el propio arreglo).
+
+    Cada barrido recorre las columnas (o filas) en orden y procesa todas las
+    filas a la vez, por lo que un valor viaja de un extremo a otro de la
+    imagen en una sola pasada.
+    """
+    for y, g in ((actual.T, mascara.T), (actual, mascara)):
+        temporal = np.empty_like(y[:, 0])
+        for j in range(1, y.shape[1]):
+            np.maximum(y[:, j], y[:, j - 1], out=temporal)
+            np.minimum(temporal, g[:, j], out=y[:, j])
+        for j in range(y.shape[1] - 2, -1, -1):
+            np.maximum(y[:, j], y[:, j + 1], out=temporal)
+            np.minimum(temporal, g[:, j], out=y[:, j])
+
+
+def _reconstruccion_gris(marcador, mascara, conectividad):
+    """
+    Reconstrucción por dilatación en escala de grises con el esquema híbrido.
+
+    Se alternan barridos en los cuatro sentidos con una dilatación geodésica
+    completa mientras cambian muchos píxeles; cuando el frente activo es
+    pequeño se continúa con una cola: solo se propagan los píxeles que
+    cambiaron en el paso anterior, de forma vectorizada sobre todo el frente.
+    """
+    kernel = elemento_estructurante('rect' if conectividad == 8 else 'cruz', 3)
+    actual = marcador.copy()
+    limite = max(1, int(actual.size * FRACCION_COLA))
+
+    # En imágenes pequeñas el costo por columna de los barridos no compensa
+    barrer = min(actual.shape) >= LADO_MINIMO_BARRIDOS
+
+    while True:
+        if barrer:
+            _barridos(actual, mascara)
+        siguiente = cv2.min(cv2.dilate(actual, kernel, borderType=cv2.BORDER_REPLICATE), mascara)
+        cambiados = siguiente != actual
+        actual = siguiente
+        cuantos = int(np.count_nonzero(cambiados))
+        if cuantos == 0:
+            return actual
+        if cuantos < limite:
+            break
+
+    # Cola de frente: trabajar sobre copias con un marco de ceros evita comprobar límites
+    alto, ancho = actual.shape
+    paso = ancho + 2
+    valores = cv2.copyMakeBorder(actual, 1, 1, 1, 1, cv2.BORDER_CONSTANT, value=0).ravel()
+    tope = cv2.copyMakeBorder(mascara, 1, 1, 1, 1, cv2.BORDER_CONSTANT, value=0).ravel()
+    if conectividad == 8:
+        desplazamientos = np.array([-paso - 1, -paso, -paso + 1, -1, 1, paso - 1, paso, paso + 1])
+    else:
+        desplazamientos = np.array([-paso, -1, 1, paso])
+
+    filas, columnas = np.nonzero(cambiados)
+    frente = (filas + 1) * paso + columnas + 1
+    posicion = np.empty(valores.size, dtype=np.int64)
+    while frente.size:
+        vecinos = (frente[:, None] + desplazamientos).ravel()
+        propuesta = np.minimum(np.repeat(valores[frente], desplazamientos.size), tope[vecinos])
+        mejora = propuesta > valores[vecinos]
+        vecinos, propuesta = vecinos[mejora], propuesta[mejora]
+        np.maximum.at(valores, vecinos, propuesta)
+        frente = _distintos(vecinos, posicion)
+
+    return valores.reshape(alto + 2, ancho + 2)[1:-1, 1:-1].copy()
+
+
+@instrumentar
+def reconstruccion_erosion(marcador, mascara, conectividad=8):
+    """
+    Reconstrucción geodésica por erosión (dual de reconstruccion_dilatacion).
+
+    Args:
+        marcador: Imagen marcador (>= máscara)
+        mascara: Imagen máscara del mismo tamaño
+        conectividad: 4 u 8
+
+    Returns:
+        Imagen reconstruida
+    """
+    if mascara.dtype == bool:
+        return ~reconstruccion_dilatacion(~marcador, ~mascara, conectividad)
+    maximo = 255 if mascara.dtype == np.uint8 else mascara.max(initial=0)
+    return (maximo - reconstruccion_dilatacion(maximo - marcador, maximo - mascara, conectividad)).astype(mascara.dtype)
+
+
+@instrumentar
+def rellenar_huecos(imagen, conectividad=8):
+    """
+    Rellena los huecos: regiones de fondo que no tocan el borde de la imagen.
+
+    Args:
+        imagen: Imagen binaria (o en escala de grises uint8)
+        conectividad: Conectividad de los objetos (el fondo usa la complementaria)
+
+    Returns:
+        Imagen con los huecos rellenos
+    """
+    conectividad_fondo = 4 if conectividad == 8 else 8
+    if _es_binaria(imagen):
+        valor = True if imagen.dtype == bool else (imagen.max(initial=0) or 255)
+        fondo = imagen == 0
+        exterior = _componentes_marcadas(fondo, fondo & _borde(imagen.shape), conectividad_fondo)
+        resultado = imagen.copy()
+        resultado[fondo & ~exterior] = valor
+        return resultado
+
+    marcador = np.full_like(imagen, 255)
+    borde = _borde(imagen.shape)
+    marcador[borde] = imagen[borde]
+    return reconstruccion_erosion(marcador, imagen, conectividad_fondo)
+
+
+@instrumentar
+def eliminar_borde(imagen, conectividad=8):
+    """
+    Elimina los objetos que tocan el borde de la imagen.
+
+    Args:
+        imagen: Imagen binaria (o en escala de grises uint8)
+        conectividad: 4 u 8
+
+    Returns:
+        Imagen sin los objetos del borde
+    """
+    marcador = np.zeros_like(imagen)
+    borde = _borde(imagen.shape)
+    marcador[borde] = imagen[borde]
+    if imagen.dtype == bool:
+        return imagen & ~reconstruccion_dilatacion(marcador, imagen, conectividad)
+    return cv2.subtract(imagen, reconstruccion_dilatacion(marcador, imagen, conectividad))
+
+
+@instrumentar
+def maximos_regionales(imagen, conectividad=8):
+    """
+    Máscara de los máximos regionales: mesetas sin vecinos más altos.
+
+    Se calcula como imagen - R(imagen - 1), la reconstrucción por dilatación
+    de la imagen rebajada un nivel.
+
+    Args:
+        imagen: Imagen en escala de grises uint8
+        conectividad: 4 u 8
+
+    Returns:
+        Máscara uint8 (0/255)
+    """
+    if _es_binaria(imagen):
+        # Los objetos de una imagen binaria son sus máximos regionales
+        return ((imagen > 0) * 255).astype(np.uint8)
+    rebajada = cv2.subtract(imagen, 1)
+    diferencia = cv2.subtract(imagen, reconstruccion_dilatacion(rebajada, imagen, conectividad))
+    return ((diferencia > 0) * 255).astype(np.uint8)
+
+
+# Operaciones de reconstrucción disponibles como pasos de SecuenciaMorfologica
+_RECONSTRUCCIONES = {
+    'rellenar_huecos': rellenar_huecos,
+    'eliminar_borde': eliminar_borde,
+}
@@ -5,7 +5,10 @@ Funciones de operaciones aritméticas entre imágenes y escalares.
 import cv2
 import numpy as np
 
+from .instrumentacion import instrumentar
 
+
+@instrumentar
 def operacion_escalar(imagen, escalar, operacion):
     """
     Aplica una operación aritmética entre una imagen y un escalar.
@@ -39,6 +42,7 @@ def operacion_escalar(imagen, escalar, operacion):
     return resultado.astype(np.uint8)
 
 
+@instrumentar
 def operacion_entre_imagenes(img1, img2, operacion):
     """
     Aplica una operación aritmética entre dos imágenes.
@@ -5,7 +5,10 @@ Funciones de operaciones logicas entre imagenes.
 import cv2
 import numpy as np
 
+from .instrumentacion import instrumentar
 
+
+@instrumentar
 def operacion_logica(img1, img2, operacion):
     """ Aplica una operación lógica entre dos imagenes. """
     # Hacer copias para evitar modificar las originales
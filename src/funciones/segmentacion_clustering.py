@@ -0,0 +1,373 @@
+"""
+Segmentación por agrupamiento de píxeles: k-means por mini-lotes y mean-shift.
+
+K-means se entrena con mini-lotes sobre una muestra de píxeles y la imagen
+completa se asigna al centro más cercano por bloques de filas, de modo que
+la memoria adicional depende del tamaño de bloque y no del de la imagen.
+Mean-shift trabaja sobre el histograma de color por celdas (cada celda
+ocupada pesa su número de píxeles) y luego traduce celda -> modo con una
+tabla. Las etiquetas resultantes se convierten en máscaras o regiones para
+etiquetar_componentes.
+"""
+
+import cv2
+import numpy as np
+
+from .componentes_conexas import etiquetar_componentes
+from .instrumentacion import instrumentar
+from .segmentacion_color import ESPACIOS_COLOR, convertir_espacio
+
+
+# Filas de características por bloque al asignar a los centros
+PIXELES_POR_BLOQUE = 1 << 16
+# Píxeles muestreados para entrenar k-means
+MUESTRAS_KMEANS = 100_000
+# Modos de mean-shift que se desplazan a la vez (memoria: bloque x celdas ocupadas)
+MODOS_POR_BLOQUE = 256
+
+
+def asignar_centros(caracteristicas, centros, tamano_bloque=PIXELES_POR_BLOQUE):
+    """
+    Índice del centro más cercano de cada fila de características.
+
+    Se evalúa por bloques con ||x - c||² = ||x||² - 2·x·c + ||c||²
+    (||x||² no cambia el mínimo), en float32.
+
+    Args:
+        caracteristicas: Matriz (n, d)
+        centros: Matriz (k, d)
+        tamano_bloque: Filas por bloque
+
+    Returns:
+        Arreglo int32 de n índices en 0..k-1
+    """
+    centros = np.asarray(centros, dtype=np.float32)
+    etiquetas = np.empty(len(caracteristicas), dtype=np.int32)
+    norma_centros = (centros * centros).sum(axis=1)
+    for inicio in range(0, len(caracteristicas), tamano_bloque):
+        bloque = np.asarray(caracteristicas[inicio:inicio + tamano_bloque], dtype=np.float32)
+        etiquetas[inicio:inicio + len(bloque)] = np.argmin(norma_centros - 2 * bloque @ centros.T, axis=1)
+    return etiquetas
+
+
+def _inicializar_kmeans_pp(muestra, k, generador):
+    """Centros iniciales por k-means++ sobre una muestra."""
+    centros = [muestra[generador.integers(len(muestra))]]
+    distancia2 = ((muestra - centros[0]) ** 2).sum(axis=1)
+    for _ in range(1, k):
+        total = distancia2.sum()
+        if total == 0:
+            # Menos valores distintos que centros: se repite uno
+            centros.append(centros[-1])
+            continue
+        centro = muestra[generador.choice(len(muestra), p=distancia2 / total)]
+        centros.append(centro)
+        np.minimum(distancia2, ((muestra - centro) ** 2).sum(axis=1), out=distancia2)
+    return np.array(centros, dtype=np.float32)
+
+
+@instrumentar
+def kmeans_mini_lote(caracteristicas, k, tamano_lote=1024, iteraciones=100, semilla=0):
+    """
+    K-means por mini-lotes (Sculley, 2010).
+
+    Cada iteración asigna un lote aleatorio a los centros y mueve cada centro
+    hacia la media de sus filas con tasa 1 / (filas vistas por el centro).
+    Los centros iniciales salen de k-means++ sobre una muestra de 10 lotes.
+
+    Args:
+        caracteristicas: Matriz (n, d); puede ser uint8 (se convierte por lote)
+        k: Número de centros
+        tamano_lote: Filas por mini-lote
+        iteraciones: Número de mini-lotes
+        semilla: Semilla del muestreo
+
+    Returns:
+        Centros float32 (k, d)
+    """
+    if k < 1:
+        raise ValueError("k debe ser al menos 1")
+    generador = np.random.default_rng(semilla)
+    n = len(caracteristicas)
+    muestra = np.asarray(caracteristicas[generador.integers(n, size=min(n, 10 * tamano_lote))], dtype=np.float32)
+    centros = _inicializar_kmeans_pp(muestra, k, generador)
+    vistos = np.zeros(k, dtype=np.float64)
+    for _ in range(iteraciones):
+        lote = np.asarray(caracteristicas[generador.integers(n, size=tamano_lote)], dtype=np.float32)
+        etiquetas = asignar_centros(lote, centros)
+        cuenta = np.bincount(etiquetas, minlength=k)
+        suma = np.zeros_like(centros)
+        np.add.at(suma, etiquetas, lote)
+        usados = cuenta > 0
+        vistos[usados] += cuenta[usados]
+        # Media del lote ponderada contra la historia del centro
+        tasa = (cuenta[usados] / vistos[usados])[:, None].astype(np.float32)
+        centros[usados] += tasa * (suma[usados] / cuenta[usados, None] - centros[usados])
+    return centros
+
+
+def _caracteristicas(convertida, fila_inicio, fila_fin, peso_espacial):
+    """Color (y, con peso_espacial > 0, posición x, y escalada) de un bloque de filas."""
+    color = convertida[fila_inicio:fila_fin].reshape(-1, 3)
+    if not peso_espacial:
+        return color
+    y, x = np.mgrid[fila_inicio:fila_fin, 0:convertida.shape[1]]
+    posicion = np.column_stack((x.ravel(), y.ravel())).astype(np.float32) * peso_espacial
+    return np.hstack((color.astype(np.float32), posicion))
+
+
+@instrumentar
+def segmentacion_kmeans(imagen, k=4, espacio='lab', peso_espacial=0.0, tamano_lote=1024, iteraciones=100,
+                        semilla=0):
+    """
+    Agrupa los píxeles en k clases por color (y opcionalmente posición).
+
+    Los centros se entrenan con k-means por mini-lotes sobre una muestra de
+    hasta MUESTRAS_KMEANS píxeles; después la imagen se asigna por bloques de
+    filas, sin construir la matriz de características completa.
+
+    Args:
+        imagen: Imagen BGR uint8 (una imagen en grises se replica a tres canales)
+        k: Número de clases
+        espacio: Espacio de color (ver segmentacion_color.ESPACIOS_COLOR; en HSV el tono no se trata como circular)
+        peso_espacial: Peso de la posición en píxeles frente al color (0 = solo color)
+        tamano_lote: Píxeles por mini-lote
+        iteraciones: Número de mini-lotes
+        semilla: Semilla del muestreo
+
+    Returns:
+        Tupla (etiquetas int32 0..k-1 del tamaño de la imagen, centros float32 (k, 3 o 5))
+    """
+    convertida = convertir_espacio(imagen, espacio)
+    alto, ancho = convertida.shape[:2]
+
+    if peso_espacial:
+        # Solo se construyen las características de la muestra
+        generador = np.random.default_rng(semilla)
+        indices = generador.integers(alto * ancho, size=min(alto * ancho, MUESTRAS_KMEANS))
+        y, x = np.divmod(indices, ancho)
+        muestra = np.hstack((convertida.reshape(-1, 3)[indices].astype(np.float32),
+                             np.column_stack((x, y)).astype(np.float32) * peso_espacial))
+    else:
+        # La vista (n, 3) de la imagen se muestrea directamente por lote
+        muestra = convertida.reshape(-1, 3)
+    centros = kmeans_mini_lote(muestra, k, tamano_lote, iteraciones, semilla)
+
+    etiquetas = np.empty((alto, ancho), dtype=np.int32)
+    filas = max(1, PIXELES_POR_BLOQUE // ancho)
+    for y0 in range(0, alto, filas):
+        y1 = min(y0 + filas, alto)
+        etiquetas[y0:y1] = asignar_centros(_caracteristicas(convertida, y0, y1, peso_espacial),
+                                           centros).reshape(y1 - y0, ancho)
+    return etiquetas, centros
+
+
+def _paleta_bgr(centros, espacio):
+    """Colores BGR uint8 de los centros (sus tres primeras componentes) en el espacio dado."""
+    paleta = np.clip(np.rint(centros[:, :3]), 0, 255).astype(np.uint8)[None]
+    vuelta = ESPACIOS_COLOR[espacio][1]
+    return (paleta if vuelta is None else cv2.cvtColor(paleta, vuelta))[0]
+
+
+@instrumentar
+def cuantizacion_color_kmeans(imagen, k=8, espacio='lab', tamano_lote=1024, iteraciones=100, semilla=0):
+    """
+    Reduce la imagen a k colores con k-means por mini-lotes.
+
+    Args:
+        imagen: Imagen BGR uint8
+        k: Número de colores
+        espacio: Espacio de color en que se agrupa ('lab' agrupa por color percibido)
+        tamano_lote: Píxeles por mini-lote
+        iteraciones: Número de mini-lotes
+        semilla: Semilla del muestreo
+
+    Returns:
+        Tupla (imagen_cuantizada BGR, etiquetas int32 0..k-1 del tamaño de la imagen, centros BGR uint8 (k, 3))
+    """
+    etiquetas, centros = segmentacion_kmeans(imagen, k, espacio, 0.0, tamano_lote, iteraciones, semilla)
+    paleta = _paleta_bgr(centros, espacio)
+    return np.take(paleta, etiquetas, axis=0), etiquetas, paleta
+
+
+def _indices_celda(convertida, ancho_celda):
+    """
+    Índice de celda del histograma 3D de cada píxel y conteo por celda.
+
+    Se recorre por bloques de filas para no crear temporales del tamaño de la imagen.
+
+    Returns:
+        indices (uint16 del tamaño de la imagen), histograma (int64 de celdas³)
+    """
+    celdas = 256 // ancho_celda
+    indices = np.empty(convertida.shape[:2], dtype=np.uint16)
+    histograma = np.zeros(celdas ** 3, dtype=np.int64)
+    filas = max(1, PIXELES_POR_BLOQUE // convertida.shape[1])
+    for y0 in range(0, convertida.shape[0], filas):
+        bloque = convertida[y0:y0 + filas] // np.uint8(ancho_celda)
+        indice = (bloque[..., 0].astype(np.uint16) * celdas + bloque[..., 1]) * celdas + bloque[..., 2]
+        indices[y0:y0 + filas] = indice
+        histograma += np.bincount(indice.ravel(), minlength=celdas ** 3)
+    return indices, histograma
+
+
+def _desplazar_modos(puntos, celdas, pesos, ancho_banda, max_iteraciones, tolerancia):
+    """Mean-shift con núcleo plano de los puntos sobre las celdas ponderadas."""
+    radio2 = ancho_banda * ancho_banda
+    norma_celdas = (celdas * celdas).sum(axis=1)
+    activos = np.arange(len(puntos))
+    for _ in range(max_iteraciones):
+        if activos.size == 0:
+            break
+        siguen = []
+        for inicio in range(0, activos.size, MODOS_POR_BLOQUE):
+            i = activos[inicio:inicio + MODOS_POR_BLOQUE]
+            p = puntos[i]
+            distancia2 = (p * p).sum(axis=1)[:, None] - 2 * p @ celdas.T + norma_celdas
+            w = np.where(distancia2 <= radio2, pesos, 0)
+            nuevo = (w @ celdas) / w.sum(axis=1, keepdims=True)
+            desplazamiento = np.abs(nuevo - p).max(axis=1)
+            puntos[i] = nuevo
+            siguen.append(i[desplazamiento > tolerancia])
+        activos = np.concatenate(siguen)
+    return puntos
+
+
+def _fusionar_modos(puntos, pesos, distancia):
+    """Agrupa puntos convergidos a menos de `distancia`, empezando por los modos con más peso."""
+    # Los puntos convergidos al mismo modo coinciden casi exactamente
+    redondeados, inversa = np.unique(np.round(puntos / (distancia / 4)), axis=0, return_inverse=True)
+    inversa = inversa.ravel()
+    peso_candidato = np.bincount(inversa, weights=pesos)
+    centros_candidatos = np.column_stack([
+        np.bincount(inversa, weights=pesos * puntos[:, c]) for c in range(puntos.shape[1])
+    ]) / peso_candidato[:, None]
+
+    modos = []
+    destino = np.empty(len(redondeados), dtype=np.int64)
+    for c in np.argsort(-peso_candidato, kind='stable'):
+        for m, modo in enumerate(modos):
+            if ((centros_candidatos[c] - modo) ** 2).sum() <= distancia * distancia:
+                destino[c] = m
+                break
+        else:
+            destino[c] = len(modos)
+            modos.append(centros_candidatos[c])
+    return np.array(modos, dtype=np.float64), destino[inversa]
+
+
+@instrumentar
+def segmentacion_mean_shift(imagen, ancho_banda=32.0, espacio='lab', ancho_celda=16, max_iteraciones=50):
+    """
+    Agrupa los píxeles por color con mean-shift sobre el histograma por celdas.
+
+    El espacio de color se divide en celdas de ancho_celda niveles por canal;
+    cada celda ocupada se desplaza hacia la media ponderada (por número de
+    píxeles) de las celdas a menos de ancho_banda, hasta converger. Los modos
+    a menos de ancho_banda / 2 se fusionan. El costo depende del número de
+    celdas ocupadas, no del número de píxeles.
+
+    Args:
+        imagen: Imagen BGR uint8 (una imagen en grises se replica a tres canales)
+        ancho_banda: Radio del núcleo en unidades del espacio de color
+        espacio: Espacio de color (ver segmentacion_color.ESPACIOS_COLOR)
+        ancho_celda: Niveles por celda del histograma (potencia de 2 entre 2 y 128)
+        max_iteraciones: Iteraciones máximas de desplazamiento
+
+    Returns:
+        Tupla (etiquetas int32 0..m-1 del tamaño de la imagen, modos float64 (m, 3) en el espacio de color)
+    """
+    # Con celdas de 1 nivel habría 2^24 celdas, que no caben en el índice uint16
+    if ancho_celda not in (2, 4, 8, 16, 32, 64, 128):
+        raise ValueError("ancho_celda debe ser una potencia de 2 entre 2 y 128")
+    convertida = convertir_espacio(imagen, espacio)
+    celdas_por_canal = 256 // ancho_celda
+
+    indices, histograma = _indices_celda(convertida, ancho_celda)
+    ocupadas = np.flatnonzero(histograma)
+    pesos = histograma[ocupadas].astype(np.float64)
+    c0, resto = np.divmod(ocupadas, celdas_por_canal * celdas_por_canal)
+    c1, c2 = np.divmod(resto, celdas_por_canal)
+    # Centro de cada celda en unidades del espacio de color
+    centros_celdas = (np.column_stack((c0, c1, c2)) + 0.5) * ancho_celda
+
+    puntos = _desplazar_modos(centros_celdas.copy(), centros_celdas, pesos, ancho_banda, max_iteraciones,
+                              tolerancia=ancho_celda / 16)
+    modos, modo_de_celda = _fusionar_modos(puntos, pesos, ancho_banda / 2)
+
+    tabla = np.zeros(celdas_por_canal ** 3, dtype=np.int32)
+    tabla[ocupadas] = modo_de_celda
+    return tabla[indices], modos
+
+
+@instrumentar
+def cuantizacion_color_mean_shift(imagen, ancho_banda=32.0, espacio='lab', ancho_celda=16):
+    """
+    Reemplaza cada píxel por el color de su modo de mean-shift.
+
+    Args:
+        imagen: Imagen BGR uint8
+        ancho_banda: Radio del núcleo en unidades del espacio de color
+        espacio: Espacio de color en que se agrupa
+        ancho_celda: Niveles por celda del histograma
+
+    Returns:
+        Tupla (imagen_cuantizada BGR, etiquetas int32 0..m-1, modos BGR uint8 (m, 3))
+    """
+    etiquetas, modos = segmentacion_mean_shift(imagen, ancho_banda, espacio, ancho_celda)
+    paleta = _paleta_bgr(modos, espacio)
+    return np.take(paleta, etiquetas, axis=0), etiquetas, paleta
+
+
+def mascara_clusters(etiquetas, clusters):
+    """
+    Máscara binaria de los píxeles que pertenecen a alguna de las clases dadas.
+
+    Args:
+        etiquetas: Matriz de clases (segmentacion_kmeans, segmentacion_mean_shift)
+        clusters: Clase o lista de clases
+
+    Returns:
+        Imagen binaria uint8 (0/255), lista para etiquetar_componentes
+    """
+    seleccion = np.zeros(int(etiquetas.max(initial=0)) + 1, dtype=np.uint8)
+    seleccion[np.atleast_1d(clusters)] = 255
+    return seleccion[etiquetas]
+
+
+@instrumentar
+def regiones_clusters(etiquetas, connectivity=8):
+    """
+    Divide cada clase en sus componentes conexas y numera todas las regiones.
+
+    Cada clase se etiqueta con etiquetar_componentes y sus etiquetas se
+    desplazan para que las regiones de todas las clases sean distintas.
+    Todos los píxeles pertenecen a alguna región: la etiqueta 0 (fondo) y su
+    fila de estadísticas quedan vacías.
+
+    Args:
+        etiquetas: Matriz de clases (segmentacion_kmeans, segmentacion_mean_shift)
+        connectivity: 4 u 8
+
+    Returns:
+        num_labels: número de regiones + 1
+        labels: matriz de regiones (int32)
+        stats: estadísticas de cada región (formato de cv2.connectedComponentsWithStats)
+        centroids: centroides de cada región
+        clase_de_region: clase de cada región (-1 en la fila 0)
+    """
+    regiones = np.zeros(etiquetas.shape, dtype=np.int32)
+    stats = [np.zeros((1, 5), dtype=np.int32)]
+    centroids = [np.zeros((1, 2))]
+    clase_de_region = [np.array([-1])]
+    siguiente = 1
+    for clase in np.unique(etiquetas):
+        mascara = etiquetas == clase
+        n, labels, s, c = etiquetar_componentes(mascara.view(np.uint8), connectivity)
+        regiones[mascara] = labels[mascara] + (siguiente - 1)
+        stats.append(s[1:])
+        centroids.append(c[1:])
+        clase_de_region.append(np.full(n - 1, clase))
+        siguiente += n - 1
+    return (siguiente, regiones, np.concatenate(stats), np.concatenate(centroids),
+            np.concatenate(clase_de_region))
@@ -0,0 +1,132 @@
+"""
+Segmentación de imágenes en color sin pasar a escala de grises.
+
+Los umbrales por canal se aplican con una LUT de tres canales, los rangos
+HSV/Lab con cv2.inRange y la distancia a un color de referencia con una LUT
+de diferencias al cuadrado. La segmentación por agrupamiento (k-means,
+mean-shift) está en segmentacion_clustering.
+"""
+
+import cv2
+import numpy as np
+
+from .instrumentacion import instrumentar
+
+
+# Espacio de color -> (conversión desde BGR, conversión de vuelta a BGR)
+ESPACIOS_COLOR = {
+    'bgr': (None, None),
+    'hsv': (cv2.COLOR_BGR2HSV, cv2.COLOR_HSV2BGR),
+    'lab': (cv2.COLOR_BGR2LAB, cv2.COLOR_LAB2BGR),
+}
+
+
+def convertir_espacio(imagen, espacio='bgr'):
+    """
+    Convierte una imagen BGR al espacio de color indicado.
+
+    Args:
+        imagen: Imagen BGR uint8 (una imagen en grises se replica a tres canales)
+        espacio: Clave de ESPACIOS_COLOR
+
+    Returns:
+        Imagen de tres canales en el espacio pedido
+    """
+    if espacio not in ESPACIOS_COLOR:
+        raise ValueError(f"Espacio de color desconocido: {espacio}. Opciones: {', '.join(ESPACIOS_COLOR)}")
+    if imagen.ndim == 2:
+        imagen = cv2.cvtColor(imagen, cv2.COLOR_GRAY2BGR)
+    conversion = ESPACIOS_COLOR[espacio][0]
+    return imagen if conversion is None else cv2.cvtColor(imagen, conversion)
+
+
+@instrumentar
+def umbral_por_canal(imagen, umbrales, combinar='y', espacio='bgr'):
+    """
+    Binariza cada canal con su propio umbral y combina los resultados.
+
+    Args:
+        imagen: Imagen BGR uint8
+        umbrales: Un umbral por canal; un píxel supera el canal c si v_c > umbrales[c]
+                  (None ignora el canal)
+        combinar: 'y' (todos los canales activos lo superan) u 'o' (alguno lo supera)
+        espacio: Espacio de color en que se aplican los umbrales
+
+    Returns:
+        Imagen binaria uint8 (0/255)
+    """
+    if combinar not in ('y', 'o'):
+        raise ValueError("combinar debe ser 'y' u 'o'")
+    convertida = convertir_espacio(imagen, espacio)
+    activos = [c for c, umbral in enumerate(umbrales) if umbral is not None]
+    if not activos:
+        raise ValueError("Se necesita al menos un umbral")
+
+    # Una sola pasada: LUT de tres canales, cada uno con su umbral
+    lut = np.zeros((256, 1, 3), dtype=np.uint8)
+    for c in range(3):
+        if c not in activos:
+            # El canal ignorado es neutro para la combinación
+            lut[:, 0, c] = 255 if combinar == 'y' else 0
+        else:
+            lut[int(umbrales[c]) + 1:, 0, c] = 255
+    canales = cv2.split(cv2.LUT(convertida, lut))
+    operacion = cv2.bitwise_and if combinar == 'y' else cv2.bitwise_or
+    return operacion(operacion(canales[0], canales[1]), canales[2])
+
+
+@instrumentar
+def segmentacion_rango_color(imagen, inferior, superior, espacio='hsv'):
+    """
+    Selecciona los píxeles cuyo color está dentro de un rango por canal.
+
+    En HSV, si el tono inferior es mayor que el superior el rango da la
+    vuelta por 180 (p. ej. rojos: 170 -> 10).
+
+    Args:
+        imagen: Imagen BGR uint8
+        inferior: Límites inferiores (tres valores, inclusivos)
+        superior: Límites superiores (tres valores, inclusivos)
+        espacio: Espacio de color de los límites
+
+    Returns:
+        Imagen binaria uint8 (0/255)
+    """
+    convertida = convertir_espacio(imagen, espacio)
+    inferior = np.asarray(inferior, dtype=np.uint8)
+    superior = np.asarray(superior, dtype=np.uint8)
+    if espacio == 'hsv' and inferior[0] > superior[0]:
+        # Dos rangos de tono: [inferior, 179] y [0, superior]
+        hasta_final = superior.copy()
+        hasta_final[0] = 179
+        desde_cero = inferior.copy()
+        desde_cero[0] = 0
+        return cv2.bitwise_or(cv2.inRange(convertida, inferior, hasta_final),
+                              cv2.inRange(convertida, desde_cero, superior))
+    return cv2.inRange(convertida, inferior, superior)
+
+
+@instrumentar
+def segmentacion_distancia_color(imagen, referencia, distancia, espacio='lab'):
+    """
+    Selecciona los píxeles a distancia euclídea menor o igual a un color de referencia.
+
+    En Lab la distancia aproxima la diferencia de color percibida (ΔE76 en
+    la escala uint8 de OpenCV).
+
+    Args:
+        imagen: Imagen BGR uint8
+        referencia: Color de referencia en BGR (tres valores)
+        distancia: Distancia máxima en el espacio de color
+        espacio: Espacio de color en que se mide la distancia
+
+    Returns:
+        Imagen binaria uint8 (0/255)
+    """
+    convertida = convertir_espacio(imagen, espacio)
+    referencia = convertir_espacio(np.uint8([[referencia]]), espacio)[0, 0].astype(np.int64)
+    # (v - ref_c)² de cada canal con una LUT y suma de canales con cv2.transform;
+    # los cuadrados son enteros < 2^18, exactos en float32
+    cuadrados = ((np.arange(256)[:, None] - referencia) ** 2).astype(np.float32)[:, None, :]
+    distancia2 = cv2.transform(cv2.LUT(convertida, cuadrados), np.ones((1, 3), dtype=np.float32))
+    return cv2.compare(distancia2, float(distancia) ** 2, cv2.CMP_LE)
@@ -0,0 +1,148 @@
+"""
+Separación de objetos que se tocan con transformada de distancia y watershed.
+
+Cada componente se procesa dentro de su caja envolvente, de modo que el
+costo depende del primer plano y no del tamaño de la imagen; las
+componentes se reparten entre hilos (OpenCV libera el GIL).
+"""
+
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import cv2
+import numpy as np
+
+from .arbol_componentes import _distintos
+from .instrumentacion import instrumentar
+from .morfologia import reconstruccion_dilatacion, maximos_regionales
+
+
+# Profundidad mínima (en píxeles de distancia) para que un máximo sea marcador
+H_SEPARACION_DEFAULT = 2
+# Las componentes más pequeñas no se intentan separar
+AREA_MINIMA_SEPARACION = 30
+
+
+def _eliminar_contactos(regiones):
+    """
+    Pone a cero los píxeles de regiones distintas que quedan en contacto.
+
+    La inundación no deja línea entre cuencas; se elimina uno de los píxeles
+    de cada contacto (también diagonal) para que la separación resista la
+    conectividad 8.
+    """
+    pares = (
+        (regiones[:, :-1], regiones[:, 1:]),
+        (regiones[:-1], regiones[1:]),
+        (regiones[:-1, :-1], regiones[1:, 1:]),
+        (regiones[:-1, 1:], regiones[1:, :-1]),
+    )
+    for a, b in pares:
+        b[(a > 0) & (b > 0) & (a != b)] = 0
+
+
+def _inundar(marcadores, relieve, connectivity):
+    """
+    Watershed por inmersión sobre la distancia, de los niveles altos a los bajos.
+
+    En cada nivel t las cuencas crecen en anchura (cola de frente vectorizada)
+    dentro de {relieve >= t}; los píxeles frontera bloqueados por el nivel
+    quedan pendientes para el siguiente. Si dos cuencas llegan a la vez a un
+    píxel se queda una de ellas y el contacto se corta con _eliminar_contactos.
+    (cv2.watershed inunda según el gradiente de la imagen de entrada, no según
+    sus niveles, por lo que no sirve para inundar la distancia directamente.)
+    """
+    alto, ancho = relieve.shape
+    paso = ancho + 2
+    etiquetas = cv2.copyMakeBorder(marcadores.astype(np.int32), 1, 1, 1, 1, cv2.BORDER_CONSTANT, value=0).ravel()
+    niveles = cv2.copyMakeBorder(relieve, 1, 1, 1, 1, cv2.BORDER_CONSTANT, value=0).ravel()
+    if connectivity == 8:
+        desplazamientos = np.array([-paso - 1, -paso, -paso + 1, -1, 1, paso - 1, paso, paso + 1])
+    else:
+        desplazamientos = np.array([-paso, -1, 1, paso])
+
+    posicion = np.empty(etiquetas.size, dtype=np.int64)
+    pendientes = np.flatnonzero(etiquetas)
+    for t in range(int(relieve.max()), 0, -1):
+        frente = pendientes
+        bloqueados = []
+        while frente.size:
+            vecinos = frente[:, None] + desplazamientos
+            libres = etiquetas[vecinos] == 0
+            acepta = libres & (niveles[vecinos] >= t)
+            bloqueados.append(frente[(libres & ~acepta).any(axis=1)])
+            nuevos = vecinos[acepta]
+            etiquetas[nuevos] = etiquetas[np.broadcast_to(frente[:, None], vecinos.shape)[acepta]]
+            frente = _distintos(nuevos, posicion)
+        pendientes = _distintos(np.concatenate(bloqueados), posicion) if bloqueados else frente
+
+    return etiquetas.reshape(alto + 2, ancho + 2)[1:-1, 1:-1]
+
+
+def _separar_componente(mascara, h, connectivity):
+    """
+    Divide la máscara de una componente (recortada con un margen de ceros).
+
+    Returns:
+        Máscara de píxeles que se conservan, o None si no hay que dividir
+    """
+    distancia = cv2.distanceTransform(mascara, cv2.DIST_L2, 5)
+    relieve = np.minimum(np.ceil(distancia), 255).astype(np.uint8)
+
+    # Marcadores: máximos regionales de la distancia tras suprimir los de profundidad < h
+    h_maximos = reconstruccion_dilatacion(cv2.subtract(relieve, h), relieve, connectivity)
+    picos = (maximos_regionales(h_maximos, connectivity) > 0) & (mascara > 0)
+    num_marcadores, marcadores = cv2.connectedComponents(picos.astype(np.uint8), connectivity=connectivity)
+    if num_marcadores <= 2:
+        return None
+
+    regiones = _inundar(marcadores, relieve, connectivity)
+    _eliminar_contactos(regiones)
+    return regiones > 0
+
+
+@instrumentar
+def separar_objetos_tocando(bin_img, connectivity=8, h=H_SEPARACION_DEFAULT,
+                            area_minima=AREA_MINIMA_SEPARACION, trabajadores=None):
+    """
+    Separa objetos que se tocan cortando la imagen binaria por líneas de watershed.
+
+    Por cada componente se calcula la transformada de distancia en su caja,
+    se toman como marcadores los h-máximos (máximos con profundidad >= h) y
+    se inunda la distancia desde ellos (watershed por inmersión). Las líneas de
+    separación se ponen a cero, de modo que etiquetar_componentes cuenta
+    cada objeto por separado.
+
+    Args:
+        bin_img: Imagen binaria uint8
+        connectivity: 4 u 8 (la del etiquetado posterior)
+        h: Profundidad mínima de un máximo de distancia para considerarlo objeto
+        area_minima: Área mínima de las componentes que se intentan separar
+        trabajadores: Número de hilos (None usa os.cpu_count())
+
+    Returns:
+        Imagen binaria con los objetos separados
+    """
+    if bin_img.dtype != np.uint8:
+        bin_img = bin_img.astype(np.uint8)
+    resultado = bin_img.copy()
+    num_labels, labels, stats, _ = cv2.connectedComponentsWithStats(bin_img, connectivity=connectivity)
+
+    candidatas = [lab for lab in range(1, num_labels) if stats[lab, cv2.CC_STAT_AREA] >= area_minima]
+
+    def procesar(lab):
+        x, y, w, h_caja = stats[lab, :4]
+        recorte = labels[y:y + h_caja, x:x + w] == lab
+        mascara = cv2.copyMakeBorder(recorte.astype(np.uint8), 1, 1, 1, 1, cv2.BORDER_CONSTANT, value=0)
+        conservar = _separar_componente(mascara, h, connectivity)
+        if conservar is None:
+            return lab, None
+        return lab, recorte & ~conservar[1:-1, 1:-1]
+
+    with ThreadPoolExecutor(max_workers=trabajadores or os.cpu_count() or 1) as ejecutor:
+        for lab, cortes in ejecutor.map(procesar, candidatas):
+            if cortes is not None:
+                x, y, w, h_caja = stats[lab, :4]
+                resultado[y:y + h_caja, x:x + w][cortes] = 0
+
+    return resultado
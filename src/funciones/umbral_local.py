@@ -0,0 +1,194 @@
+"""
+Umbralización local (adaptativa) con imágenes integrales.
+
+La media y la desviación estándar de cada ventana se obtienen con cuatro
+accesos a las imágenes integrales de la suma y de la suma de cuadrados, de
+modo que el costo no depende del tamaño de bloque. Las integrales se guardan
+en ImagenIntegral para reutilizarlas al cambiar parámetros, y las ventanas se
+evalúan por bloques de filas en varios hilos.
+"""
+
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import cv2
+import numpy as np
+
+from .instrumentacion import instrumentar, medir_operacion
+
+
+METODOS_UMBRAL_LOCAL = ('media', 'gaussiano', 'sauvola', 'niblack', 'wolf')
+# Valor por defecto de k en cada método que lo usa
+K_POR_METODO = {'sauvola': 0.2, 'niblack': -0.2, 'wolf': 0.5}
+# Rango dinámico de la desviación estándar en Sauvola
+R_SAUVOLA = 128.0
+# Por encima de este bloque la gaussiana se aproxima con tres filtros de caja
+BLOQUE_MAXIMO_GAUSSIANO_EXACTO = 31
+FILAS_POR_BLOQUE = 256
+
+
+class ImagenIntegral:
+    """
+    Imágenes integrales de la suma y la suma de cuadrados de una imagen en grises.
+
+    La imagen se rellena replicando el borde (como cv2.adaptiveThreshold), por
+    lo que todas las ventanas tienen el mismo número de píxeles. El relleno se
+    amplía solo si se pide un bloque mayor que los anteriores.
+    """
+
+    def __init__(self, gris, radio=0):
+        self.gris = gris
+        self.radio = -1
+        self._asegurar_radio(radio)
+
+    def _asegurar_radio(self, radio):
+        """Recalcula las integrales si el relleno actual es menor que el radio pedido."""
+        if radio <= self.radio:
+            return
+        with medir_operacion("ImagenIntegral", (self.gris,)):
+            relleno = cv2.copyMakeBorder(self.gris, radio, radio, radio, radio, cv2.BORDER_REPLICATE)
+            self.suma, self.suma_cuadrados = cv2.integral2(relleno, sdepth=cv2.CV_64F, sqdepth=cv2.CV_64F)
+            self.radio = radio
+
+    def media_desviacion(self, block_size, fila_inicio=0, fila_fin=None):
+        """
+        Media y desviación estándar de la ventana block_size x block_size de cada píxel.
+
+        Args:
+            block_size: Lado de la ventana (impar)
+            fila_inicio, fila_fin: Filas de la imagen a evaluar
+
+        Returns:
+            media, desviacion: Arreglos float64 de (filas, ancho)
+        """
+        r = block_size // 2
+        self._asegurar_radio(r)
+        fila_fin = self.gris.shape[0] if fila_fin is None else fila_fin
+        ancho = self.gris.shape[1]
+
+        # La ventana del píxel (y, x) empieza en (y + d, x + d) del relleno, con d = radio - r
+        d = self.radio - r
+        arriba = slice(fila_inicio + d, fila_fin + d)
+        abajo = slice(fila_inicio + d + block_size, fila_fin + d + block_size)
+        izquierda = slice(d, d + ancho)
+        derecha = slice(d + block_size, d + block_size + ancho)
+        area = float(block_size * block_size)
+
+        def ventana(integral):
+            return (integral[abajo, derecha] - integral[arriba, derecha]
+                    - integral[abajo, izquierda] + integral[arriba, izquierda])
+
+        media = ventana(self.suma) / area
+        varianza = ventana(self.suma_cuadrados) / area - media * media
+        return media, np.sqrt(np.maximum(varianza, 0, out=varianza), out=varianza)
+
+
+def _gris(imagen):
+    """Convierte a grises (BGR, como el resto de la aplicación)."""
+    if imagen.ndim == 3:
+        return cv2.cvtColor(imagen, cv2.COLOR_BGR2GRAY)
+    return imagen
+
+
+def _anchos_cajas(sigma, n=3):
+    """Anchos impares de n filtros de caja cuya composición aproxima una gaussiana de sigma dado."""
+    ideal = np.sqrt(12 * sigma * sigma / n + 1)
+    menor = int(ideal)
+    if menor % 2 == 0:
+        menor -= 1
+    mayor = menor + 2
+    m = round((12 * sigma * sigma - n * menor * menor - 4 * n * menor - 3 * n) / (-4 * menor - 4))
+    return [menor if i < m else mayor for i in range(n)]
+
+
+def _media_gaussiana(gris, block_size):
+    """Media ponderada gaussiana con la sigma que usa OpenCV para un bloque dado."""
+    sigma = 0.3 * ((block_size - 1) * 0.5 - 1) + 0.8
+    media = gris.astype(np.float32)
+    # cv2.blur es de costo constante por píxel: tres pasadas aproximan la gaussiana
+    for ancho in _anchos_cajas(sigma):
+        media = cv2.blur(media, (ancho, ancho), borderType=cv2.BORDER_REPLICATE)
+    return media
+
+
+@instrumentar
+def umbral_local(imagen, metodo='sauvola', block_size=25, C=0, k=None, R=R_SAUVOLA,
+                 integral=None, trabajadores=None):
+    """
+    Umbralización local por media, gaussiana, Sauvola, Niblack o Wolf.
+
+    Umbral T de cada píxel a partir de la media m y la desviación s de su ventana:
+    - media / gaussiano: T = m - C (m ponderada gaussiana en el segundo caso)
+    - niblack: T = m + k·s
+    - sauvola: T = m·(1 + k·(s / R - 1))
+    - wolf: T = (1 - k)·m + k·M + k·(s / s_max)·(m - M), con M el mínimo de la imagen
+
+    Args:
+        imagen: Imagen uint8 (se convierte a grises si es color BGR)
+        metodo: Uno de METODOS_UMBRAL_LOCAL
+        block_size: Lado de la ventana (impar)
+        C: Constante restada a la media (métodos media y gaussiano)
+        k: Sensibilidad (por defecto K_POR_METODO[metodo])
+        R: Rango dinámico de la desviación (Sauvola)
+        integral: ImagenIntegral de la misma imagen para reutilizar (opcional)
+        trabajadores: Número de hilos (None usa os.cpu_count())
+
+    Returns:
+        Imagen binarizada (255 donde el píxel supera el umbral)
+    """
+    if metodo not in METODOS_UMBRAL_LOCAL:
+        raise ValueError(f"Método desconocido: {metodo}. Opciones: {', '.join(METODOS_UMBRAL_LOCAL)}")
+    if block_size < 3 or block_size % 2 == 0:
+        raise ValueError("block_size debe ser impar y mayor o igual a 3")
+    gris = _gris(imagen)
+
+    if metodo == 'gaussiano':
+        if block_size <= BLOQUE_MAXIMO_GAUSSIANO_EXACTO:
+            return cv2.adaptiveThreshold(gris, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C,
+                                         cv2.THRESH_BINARY, block_size, C)
+        media = np.rint(_media_gaussiana(gris, block_size))
+        return np.where(gris > media - np.ceil(C), 255, 0).astype(np.uint8)
+
+    if integral is None:
+        integral = ImagenIntegral(gris, block_size // 2)
+    k = K_POR_METODO.get(metodo, 0.0) if k is None else k
+    alto = gris.shape[0]
+    bloques = [(y, min(y + FILAS_POR_BLOQUE, alto)) for y in range(0, alto, FILAS_POR_BLOQUE)]
+    resultado = np.empty(gris.shape, dtype=np.uint8)
+    media_total = desviacion_total = None
+    if metodo == 'wolf':
+        # Wolf necesita el máximo global de la desviación antes de umbralizar
+        media_total = np.empty(gris.shape, dtype=np.float64)
+        desviacion_total = np.empty(gris.shape, dtype=np.float64)
+
+    def umbralizar(bloque, media, desviacion):
+        y0, y1 = bloque
+        if metodo == 'media':
+            # Como cv2.adaptiveThreshold: media redondeada y C redondeada hacia arriba
+            umbral = np.rint(media) - np.ceil(C)
+        elif metodo == 'niblack':
+            umbral = media + k * desviacion
+        elif metodo == 'sauvola':
+            umbral = media * (1 + k * (desviacion / R - 1))
+        else:
+            relativa = desviacion / max(maximo_desviacion, 1e-12)
+            umbral = (1 - k) * media + k * minimo + k * relativa * (media - minimo)
+        resultado[y0:y1] = np.where(gris[y0:y1] > umbral, 255, 0)
+
+    def procesar(bloque):
+        media, desviacion = integral.media_desviacion(block_size, *bloque)
+        if metodo == 'wolf':
+            media_total[bloque[0]:bloque[1]] = media
+            desviacion_total[bloque[0]:bloque[1]] = desviacion
+        else:
+            umbralizar(bloque, media, desviacion)
+
+    with ThreadPoolExecutor(max_workers=trabajadores or os.cpu_count() or 1) as ejecutor:
+        list(ejecutor.map(procesar, bloques))
+        if metodo == 'wolf':
+            minimo = float(gris.min())
+            maximo_desviacion = float(desviacion_total.max())
+            list(ejecutor.map(lambda b: umbralizar(b, media_total[b[0]:b[1]], desviacion_total[b[0]:b[1]]),
+                              bloques))
+
+    return resultado
@@ -5,6 +5,7 @@ Cada operación tiene su propio botón con diálogo para seleccionar imagen obje
 """
 
 import sys
+import threading
 from PySide6.QtWidgets import (
     QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
     QPushButton, QLabel, QFileDialog, QMessageBox, QScrollArea,
@@ -37,6 +38,7 @@ from src.funciones.funciones_procesamiento import (
     etiquetar_componentes, extraer_componente_mas_grande, colorear_etiquetas,
     comparar_segmentaciones, dibujar_regiones_numeradas
 )
+from src.funciones import instrumentacion
 
 # Importar secciones modulares
 from src.interfaces.seccion_archivo import SeccionArchivo
@@ -66,6 +68,11 @@ class VentanaPrincipal(QMainWindow):
         self.imagen_resultado_logico = None  # Resultado de operaciones lógicas
         self.modo_actual = 'color'  # 'color', 'grises', 'binaria'
         self.init_ui()
+        
+        # Métricas por operación en la barra inferior
+        if INSTRUMENTACION_ACTIVA:
+            instrumentacion.activar(memoria=INSTRUMENTACION_MEMORIA)
+            instrumentacion.agregar_observador(self._mostrar_metricas)
     
     def init_ui(self):
         """Inicializar la interfaz gráfica con menú lateral izquierdo"""
@@ -262,7 +269,24 @@ class VentanaPrincipal(QMainWindow):
                 letter-spacing: 0.5px;
             }}
         """)
-        area_layout.addWidget(self.info_label)
+        
+        self.label_metricas = QLabel("")
+        self.label_metricas.setStyleSheet(f"""
+            QLabel {{
+                color: {COLOR_TEXT_SECONDARY};
+                background: {COLOR_OSCURO};
+                padding: 14px 24px;
+                border-top: 3px solid {COLOR_TEXT_PRIMARY};
+                font-size: 12px;
+                font-family: monospace;
+            }}
+        """)
+        
+        barra_inferior = QHBoxLayout()
+        barra_inferior.setSpacing(0)
+        barra_inferior.addWidget(self.info_label, 1)
+        barra_inferior.addWidget(self.label_metricas)
+        area_layout.addLayout(barra_inferior)
         
         main_layout.addWidget(area_principal, 1)
         
@@ -661,6 +685,30 @@ class VentanaPrincipal(QMainWindow):
         
         dialogo.exec()
     
+    def _mostrar_metricas(self, registro):
+        """Muestra las métricas de la última operación de nivel superior."""
+        # Solo operaciones lanzadas desde la interfaz (no llamadas internas ni hilos de trabajo)
+        if registro['profundidad'] != 0 or threading.current_thread() is not threading.main_thread():
+            return
+        self.label_metricas.setText(instrumentacion.formatear_registro(registro))
+    
+    def exportar_traza(self):
+        """Exportar los registros de instrumentación como traza JSON de Chrome"""
+        if not instrumentacion.obtener_registros():
+            QMessageBox.warning(self, "Advertencia", "No hay operaciones registradas")
+            return
+        
+        archivo, _ = QFileDialog.getSaveFileName(
+            self, "Exportar Traza", "traza.json", "JSON (*.json)"
+        )
+        
+        if archivo:
+            try:
+                instrumentacion.exportar_traza_chrome(archivo)
+                self.info_label.setText(f"Traza exportada: {archivo.split('/')[-1]} (abrir en chrome://tracing)")
+            except Exception as e:
+                QMessageBox.critical(self, "Error", f"Error al exportar la traza:\n{str(e)}")
+    
     def resetear_imagen(self):
         """Resetear imagen actual a la original"""
         if self.imagen_original_backup is not None:
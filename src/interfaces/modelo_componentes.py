@@ -0,0 +1,168 @@
+"""
+Modelo y diálogo de tabla para las estadísticas de componentes conexas.
+"""
+
+import numpy as np
+from PySide6.QtWidgets import (
+    QTableView, QHeaderView, QHBoxLayout, QPushButton, QFileDialog, QMessageBox
+)
+from PySide6.QtCore import Qt, QAbstractTableModel, QModelIndex
+from src.interfaces.dialogos_base import DialogoBase
+from src.config import (
+    COLOR_CARD, COLOR_BORDER, COLOR_TEXT_PRIMARY, COLOR_ADVERTENCIA, COLOR_EXITO, COLOR_ERROR
+)
+from src.funciones.funciones_procesamiento import exportar_tabla_componentes
+
+
+# Encabezados visibles de cada columna de tabla_componentes
+ENCABEZADOS = {
+    'etiqueta': "Etiqueta",
+    'area': "Área (px)",
+    'perimetro': "Perímetro",
+    'centroide_x': "Centroide X",
+    'centroide_y': "Centroide Y",
+    'bbox_x': "BBox X",
+    'bbox_y': "BBox Y",
+    'bbox_ancho': "BBox Ancho",
+    'bbox_alto': "BBox Alto",
+    'aspect_ratio': "Aspect Ratio",
+    'circularidad': "Circularidad",
+    'hu1': "Hu 1",
+    'hu2': "Hu 2",
+    'hu3': "Hu 3",
+    'hu4': "Hu 4",
+    'hu5': "Hu 5",
+    'hu6': "Hu 6",
+    'hu7': "Hu 7",
+    'orientacion': "Orientación (rad)",
+    'excentricidad': "Excentricidad",
+    'eje_mayor': "Eje Mayor",
+    'eje_menor': "Eje Menor",
+    'solidez': "Solidez",
+    'euler': "Euler",
+    'intensidad_media': "Intensidad Media",
+    'intensidad_std': "Intensidad Desv.",
+}
+
+
+class ModeloTablaComponentes(QAbstractTableModel):
+    """
+    Modelo de solo lectura sobre las columnas numpy de tabla_componentes.
+
+    La vista solo pide las celdas visibles y el ordenamiento se resuelve con
+    un argsort sobre la columna, sin crear objetos por fila.
+    """
+
+    def __init__(self, tabla, parent=None):
+        super().__init__(parent)
+        self.tabla = tabla
+        self.columnas = list(tabla)
+        self.orden = np.arange(len(tabla[self.columnas[0]]) if self.columnas else 0)
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.orden)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.columnas)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        if role == Qt.ItemDataRole.DisplayRole:
+            valor = self.tabla[self.columnas[index.column()]][self.orden[index.row()]]
+            if np.issubdtype(type(valor), np.integer):
+                return str(int(valor))
+            # Los momentos de Hu de orden alto son muy pequeños
+            if valor != 0 and abs(valor) < 0.01:
+                return f"{valor:.3e}"
+            return f"{valor:.2f}"
+        if role == Qt.ItemDataRole.TextAlignmentRole:
+            return int(Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter)
+        return None
+
+    def headerData(self, seccion, orientacion, role=Qt.ItemDataRole.DisplayRole):
+        if role != Qt.ItemDataRole.DisplayRole:
+            return None
+        if orientacion == Qt.Orientation.Horizontal:
+            return ENCABEZADOS.get(self.columnas[seccion], self.columnas[seccion])
+        return str(seccion + 1)
+
+    def sort(self, columna, orden=Qt.SortOrder.AscendingOrder):
+        """Ordena las filas por una columna."""
+        self.layoutAboutToBeChanged.emit()
+        self.orden = np.argsort(self.tabla[self.columnas[columna]], kind='stable')
+        if orden == Qt.SortOrder.DescendingOrder:
+            self.orden = self.orden[::-1]
+        self.layoutChanged.emit()
+
+
+class DialogoTablaComponentes(DialogoBase):
+    """Diálogo con la tabla ordenable de componentes y exportación CSV/Parquet."""
+
+    def __init__(self, parent, tabla, titulo="Tabla de Componentes"):
+        super().__init__(parent, titulo, 900)
+        self.setMinimumHeight(500)
+        self.tabla = tabla
+
+        self.modelo = ModeloTablaComponentes(tabla, self)
+        vista = QTableView()
+        vista.setModel(self.modelo)
+        vista.setSortingEnabled(True)
+        vista.sortByColumn(0, Qt.SortOrder.AscendingOrder)
+        vista.verticalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Fixed)
+        vista.verticalHeader().setDefaultSectionSize(24)
+        vista.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
+        vista.setStyleSheet(f"""
+            QTableView {{
+                background: {COLOR_CARD};
+                color: {COLOR_TEXT_PRIMARY};
+                gridline-color: {COLOR_BORDER};
+                border: 2px solid {COLOR_BORDER};
+                border-radius: 6px;
+                selection-background-color: {COLOR_ADVERTENCIA};
+            }}
+            QHeaderView::section {{
+                background: {COLOR_BORDER};
+                color: {COLOR_TEXT_PRIMARY};
+                padding: 4px;
+                font-weight: bold;
+            }}
+        """)
+        self.layout_principal.addWidget(vista, 1)
+
+        btn_layout = QHBoxLayout()
+
+        btn_exportar = QPushButton("Exportar")
+        btn_exportar.setStyleSheet(f"""
+            QPushButton {{
+                background: {COLOR_EXITO};
+                color: white;
+            }}
+        """)
+        btn_exportar.clicked.connect(self.exportar)
+
+        btn_cerrar = QPushButton("Cerrar")
+        btn_cerrar.setStyleSheet(f"""
+            QPushButton {{
+                background: {COLOR_ERROR};
+                color: white;
+            }}
+        """)
+        btn_cerrar.clicked.connect(self.accept)
+
+        btn_layout.addWidget(btn_exportar)
+        btn_layout.addWidget(btn_cerrar)
+        self.layout_principal.addLayout(btn_layout)
+
+    def exportar(self):
+        """Guarda la tabla completa en CSV o Parquet."""
+        archivo, _ = QFileDialog.getSaveFileName(
+            self, "Exportar Tabla", "componentes.csv", "CSV (*.csv);;Parquet (*.parquet)"
+        )
+        if not archivo:
+            return
+        try:
+            exportar_tabla_componentes(self.tabla, archivo)
+            QMessageBox.information(self, "Éxito", "Tabla exportada correctamente")
+        except Exception as e:
+            QMessageBox.critical(self, "Error", f"Error al exportar:\n{str(e)}")
@@ -3,7 +3,7 @@ Sección de operaciones de archivo (cargar, guardar, resetear, comparar).
 """
 
 from src.interfaces.seccion_base import SeccionBase
-from src.config import COLOR_PRIMARIO, COLOR_SECUNDARIO, COLOR_EXITO, COLOR_ERROR, COLOR_ACENTO
+from src.config import COLOR_PRIMARIO, COLOR_SECUNDARIO, COLOR_EXITO, COLOR_ERROR, COLOR_ACENTO, COLOR_INFO
 
 
 class SeccionArchivo(SeccionBase):
@@ -28,3 +28,6 @@ class SeccionArchivo(SeccionBase):
         
         self.crear_boton("Comparar", COLOR_ACENTO, 
                         self.ventana_principal.mostrar_comparacion)
+        
+        self.crear_boton("Exportar Traza", COLOR_INFO, 
+                        self.ventana_principal.exportar_traza)
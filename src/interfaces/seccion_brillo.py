@@ -2,15 +2,18 @@
 Sección de ajuste de brillo.
 """
 
-from PySide6.QtWidgets import QLabel, QHBoxLayout, QDoubleSpinBox, QPushButton, QMessageBox
+from PySide6.QtWidgets import QLabel, QHBoxLayout, QDoubleSpinBox, QSpinBox, QPushButton, QMessageBox, QCheckBox
 import cv2
 from src.interfaces.seccion_base import SeccionBase
 from src.interfaces.dialogos_base import DialogoBase
-from src.config import COLOR_INFO, COLOR_TEXT_PRIMARY, COLOR_CARD, COLOR_BORDER, COLOR_EXITO, COLOR_ERROR
+from src.config import (
+    COLOR_INFO, COLOR_TEXT_PRIMARY, COLOR_CARD, COLOR_BORDER, COLOR_EXITO, COLOR_ERROR,
+    CLAHE_LIMITE_DEFAULT, CLAHE_REJILLA_DEFAULT
+)
 from src.funciones.funciones_procesamiento import (
     ecualizacion_uniforme, ecualizacion_exponencial, ecualizacion_rayleigh,
     ecualizacion_hipercubica, ecualizacion_logaritmica_hiperbolica,
-    funcion_potencia, correccion_gamma
+    funcion_potencia, correccion_gamma, EcualizacionAdaptativa
 )
 
 
@@ -22,6 +25,11 @@ class SeccionBrillo(SeccionBase):
     
     def crear_botones(self):
         """Crea los botones de ajuste de brillo."""
+        # Sin marcar, las imágenes en color se convierten a grises como antes
+        self.color_checkbox = QCheckBox("Conservar color")
+        self.color_checkbox.setStyleSheet(f"color: {COLOR_TEXT_PRIMARY}; font-weight: bold;")
+        self.contenedor_layout.addWidget(self.color_checkbox)
+        
         self.crear_boton("Ecualización Uniforme", COLOR_INFO, 
                         lambda: self.aplicar_ajuste_brillo('uniforme'))
         
@@ -42,6 +50,9 @@ class SeccionBrillo(SeccionBase):
         
         self.crear_boton("Corrección Gamma", COLOR_INFO, 
                         lambda: self.mostrar_dialogo_gamma())
+        
+        self.crear_boton("CLAHE (Adaptativa)", COLOR_INFO, 
+                        lambda: self.mostrar_dialogo_clahe())
     
     def aplicar_ajuste_brillo(self, tipo):
         """Aplica técnicas de ajuste de brillo"""
@@ -50,20 +61,21 @@ class SeccionBrillo(SeccionBase):
             return
         
         try:
+            color = self.color_checkbox.isChecked()
             if tipo == 'uniforme':
-                resultado = ecualizacion_uniforme(self.ventana_principal.imagen_actual)
+                resultado = ecualizacion_uniforme(self.ventana_principal.imagen_actual, color=color)
                 self.ventana_principal.info_label.setText("Ecualización uniforme aplicada")
             elif tipo == 'exponencial':
-                resultado = ecualizacion_exponencial(self.ventana_principal.imagen_actual)
+                resultado = ecualizacion_exponencial(self.ventana_principal.imagen_actual, color=color)
                 self.ventana_principal.info_label.setText("Ecualización exponencial aplicada")
             elif tipo == 'rayleigh':
-                resultado = ecualizacion_rayleigh(self.ventana_principal.imagen_actual)
+                resultado = ecualizacion_rayleigh(self.ventana_principal.imagen_actual, color=color)
                 self.ventana_principal.info_label.setText("Ecualización Rayleigh aplicada")
             elif tipo == 'hipercubica':
-                resultado = ecualizacion_hipercubica(self.ventana_principal.imagen_actual)
+                resultado = ecualizacion_hipercubica(self.ventana_principal.imagen_actual, color=color)
                 self.ventana_principal.info_label.setText("Ecualización hipercúbica aplicada")
             elif tipo == 'logaritmica':
-                resultado = ecualizacion_logaritmica_hiperbolica(self.ventana_principal.imagen_actual)
+                resultado = ecualizacion_logaritmica_hiperbolica(self.ventana_principal.imagen_actual, color=color)
                 self.ventana_principal.info_label.setText("Ecualización logarítmica hiperbólica aplicada")
             
             # Convertir a BGR si es necesario para visualización
@@ -110,7 +122,8 @@ class SeccionBrillo(SeccionBase):
             
             try:
                 potencia_val = potencia_spin.value()
-                resultado = funcion_potencia(self.ventana_principal.imagen_actual, potencia_val)
+                resultado = funcion_potencia(self.ventana_principal.imagen_actual, potencia_val,
+                                             color=self.color_checkbox.isChecked())
                 
                 if len(resultado.shape) == 2:
                     resultado = cv2.cvtColor(resultado, cv2.COLOR_GRAY2BGR)
@@ -160,7 +173,8 @@ class SeccionBrillo(SeccionBase):
             
             try:
                 gamma_val = gamma_spin.value()
-                resultado = correccion_gamma(self.ventana_principal.imagen_actual, gamma_val)
+                resultado = correccion_gamma(self.ventana_principal.imagen_actual, gamma_val,
+                                             color=self.color_checkbox.isChecked())
                 
                 if len(resultado.shape) == 2:
                     resultado = cv2.cvtColor(resultado, cv2.COLOR_GRAY2BGR)
@@ -175,4 +189,99 @@ class SeccionBrillo(SeccionBase):
         
         dialogo.agregar_botones(aplicar)
         dialogo.exec()
-
+    
+    def mostrar_dialogo_clahe(self):
+        """Muestra diálogo para ecualización adaptativa (CLAHE) con vista previa"""
+        if self.ventana_principal.imagen_actual is None:
+            QMessageBox.warning(self.ventana_principal, "Advertencia", "Primero carga una imagen.")
+            return
+        
+        dialogo = DialogoBase(self.ventana_principal, "Ecualización Adaptativa (CLAHE)", 400)
+        imagen = self.ventana_principal.imagen_actual
+        color = self.color_checkbox.isChecked()
+        
+        # Límite de recorte
+        limite_layout = QHBoxLayout()
+        limite_label = QLabel("Límite de recorte (0.5-40):")
+        limite_label.setStyleSheet(f"color: {COLOR_TEXT_PRIMARY}; font-weight: bold;")
+        
+        limite_spin = QDoubleSpinBox()
+        limite_spin.setRange(0.5, 40.0)
+        limite_spin.setValue(CLAHE_LIMITE_DEFAULT)
+        limite_spin.setSingleStep(0.5)
+        limite_spin.setStyleSheet(f"""
+            QDoubleSpinBox {{
+                background: {COLOR_CARD};
+                color: {COLOR_TEXT_PRIMARY};
+                border: 2px solid {COLOR_BORDER};
+                border-radius: 6px;
+                padding: 6px;
+            }}
+        """)
+        
+        limite_layout.addWidget(limite_label)
+        limite_layout.addWidget(limite_spin, 1)
+        dialogo.layout_principal.addLayout(limite_layout)
+        
+        # Teselas por lado
+        rejilla_layout = QHBoxLayout()
+        rejilla_label = QLabel("Teselas por lado (1-32):")
+        rejilla_label.setStyleSheet(f"color: {COLOR_TEXT_PRIMARY}; font-weight: bold;")
+        
+        rejilla_spin = QSpinBox()
+        rejilla_spin.setRange(1, 32)
+        rejilla_spin.setValue(CLAHE_REJILLA_DEFAULT)
+        rejilla_spin.setStyleSheet(f"""
+            QSpinBox {{
+                background: {COLOR_CARD};
+                color: {COLOR_TEXT_PRIMARY};
+                border: 2px solid {COLOR_BORDER};
+                border-radius: 6px;
+                padding: 6px;
+            }}
+        """)
+        
+        rejilla_layout.addWidget(rejilla_label)
+        rejilla_layout.addWidget(rejilla_spin, 1)
+        dialogo.layout_principal.addLayout(rejilla_layout)
+        
+        # Los histogramas de las teselas se calculan una vez por rejilla; cambiar
+        # el límite solo recalcula las LUT y la interpolación
+        ecualizadores = {}
+        resultado = {}
+        
+        def actualizar_vista_previa():
+            rejilla = rejilla_spin.value()
+            if rejilla not in ecualizadores:
+                ecualizadores[rejilla] = EcualizacionAdaptativa(imagen, (rejilla, rejilla), color)
+            resultado['imagen'] = ecualizadores[rejilla].aplicar(limite_spin.value())
+            self.ventana_principal._mostrar_imagen(self.ventana_principal.label_imagen_principal,
+                                                   resultado['imagen'])
+        
+        def restaurar():
+            self.ventana_principal._mostrar_imagen(self.ventana_principal.label_imagen_principal, imagen)
+        
+        def aplicar():
+            try:
+                actualizar_vista_previa()
+                nuevo = resultado['imagen']
+                if len(nuevo.shape) == 2:
+                    nuevo = cv2.cvtColor(nuevo, cv2.COLOR_GRAY2BGR)
+                
+                self.ventana_principal.imagen_actual = nuevo
+                self.ventana_principal._mostrar_imagen(self.ventana_principal.label_imagen_principal, 
+                                                       self.ventana_principal.imagen_actual)
+                self.ventana_principal.info_label.setText(
+                    f"CLAHE aplicada (límite: {limite_spin.value():.1f}, "
+                    f"rejilla: {rejilla_spin.value()}x{rejilla_spin.value()})")
+                dialogo.accept()
+            except Exception as e:
+                QMessageBox.critical(dialogo, "Error", f"Error:\n{str(e)}")
+        
+        limite_spin.valueChanged.connect(actualizar_vista_previa)
+        rejilla_spin.valueChanged.connect(actualizar_vista_previa)
+        dialogo.rejected.connect(restaurar)
+        actualizar_vista_previa()
+        
+        dialogo.agregar_botones(aplicar)
+        dialogo.exec()
@@ -2,20 +2,33 @@
 Sección de análisis de componentes conexas.
 """
 
-from PySide6.QtWidgets import QLabel, QHBoxLayout, QSpinBox, QMessageBox, QComboBox, QCheckBox
+from PySide6.QtWidgets import (
+    QLabel, QHBoxLayout, QSpinBox, QDoubleSpinBox, QMessageBox, QComboBox, QCheckBox, QSlider, QToolTip
+)
+from PySide6.QtCore import Qt, QEvent
 import cv2
 import numpy as np
 from src.interfaces.seccion_base import SeccionBase
 from src.interfaces.dialogos_base import DialogoBase
-from src.config import COLOR_ADVERTENCIA, COLOR_TEXT_PRIMARY, COLOR_CARD, COLOR_BORDER
+from src.config import (
+    COLOR_ADVERTENCIA, COLOR_TEXT_PRIMARY, COLOR_CARD, COLOR_BORDER,
+    MORFOLOGIA_KERNEL_DEFAULT, SECUENCIAS_PREPROCESADO, DISTANCIA_VECINOS_DEFAULT
+)
 from src.funciones.funciones_procesamiento import (
     etiquetar_componentes,
     colorear_etiquetas,
     dibujar_regiones_numeradas,
     preprocesar_imagen,
     filtrar_componentes_pequenas,
-    obtener_estadisticas_componentes
+    tabla_componentes,
+    compactar_etiquetas,
+    ArbolComponentes,
+    SecuenciaMorfologica,
+    descriptores_componentes,
+    ComponentesRLE,
+    IndiceEspacial
 )
+from src.interfaces.modelo_componentes import DialogoTablaComponentes
 
 
 class SeccionComponentes(SeccionBase):
@@ -26,6 +39,18 @@ class SeccionComponentes(SeccionBase):
         # Variables para almacenar las etiquetas y la imagen binaria
         self.etiquetas_actuales = None
         self.imagen_binaria_original = None
+        self.tabla_actual = None
+        # Imagen en grises y conectividad del último etiquetado (para los descriptores)
+        self.imagen_gris_actual = None
+        self.conectividad_actual = 8
+        # Índice espacial de las etiquetas actuales (se construye al pasar el ratón)
+        self.indice_actual = None
+        self.cajas_actuales = None
+        self.areas_actuales = None
+        self.etiqueta_imagen = None
+        # Imagen coloreada producida por el último etiquetado; la inspección con
+        # el ratón solo responde mientras siga siendo la imagen actual
+        self.imagen_inspeccion = None
     
     def crear_botones(self):
         """Crea los botones de componentes conexas."""
@@ -34,6 +59,15 @@ class SeccionComponentes(SeccionBase):
         
         self.crear_boton("Colorear Etiquetas", COLOR_ADVERTENCIA, 
                         lambda: self.colorear_componentes())
+        
+        self.crear_boton("Umbral Interactivo", COLOR_ADVERTENCIA, 
+                        lambda: self.mostrar_dialogo_umbral_interactivo())
+        
+        self.crear_boton("Tabla de Componentes", COLOR_ADVERTENCIA, 
+                        lambda: self.mostrar_tabla_componentes())
+        
+        self.crear_boton("Descriptores de Forma", COLOR_ADVERTENCIA, 
+                        lambda: self.mostrar_descriptores())
     
     def mostrar_dialogo_etiquetar(self):
         """Muestra diálogo para etiquetar componentes conexas"""
@@ -79,6 +113,64 @@ class SeccionComponentes(SeccionBase):
         morfo_checkbox.setStyleSheet(f"color: {COLOR_TEXT_PRIMARY}; font-weight: bold;")
         dialogo.layout_principal.addWidget(morfo_checkbox)
         
+        # Secuencia morfológica y tamaño del kernel
+        morfo_layout = QHBoxLayout()
+        secuencia_combo = QComboBox()
+        secuencia_combo.addItems(list(SECUENCIAS_PREPROCESADO))
+        secuencia_combo.setStyleSheet(conectividad_combo.styleSheet())
+        
+        kernel_spinbox = QSpinBox()
+        kernel_spinbox.setRange(3, 99)
+        kernel_spinbox.setSingleStep(2)
+        kernel_spinbox.setValue(MORFOLOGIA_KERNEL_DEFAULT)
+        kernel_spinbox.setPrefix("Kernel: ")
+        kernel_spinbox.setStyleSheet(f"""
+            QSpinBox {{
+                background: {COLOR_CARD};
+                color: {COLOR_TEXT_PRIMARY};
+                border: 2px solid {COLOR_BORDER};
+                border-radius: 6px;
+                padding: 6px;
+            }}
+        """)
+        
+        morfo_layout.addWidget(secuencia_combo, 1)
+        morfo_layout.addWidget(kernel_spinbox)
+        dialogo.layout_principal.addLayout(morfo_layout)
+        
+        plan_label = QLabel()
+        plan_label.setStyleSheet(f"color: {COLOR_TEXT_PRIMARY}; font-size: 11px;")
+        dialogo.layout_principal.addWidget(plan_label)
+        
+        def obtener_secuencia():
+            tamano = kernel_spinbox.value()
+            operaciones = SECUENCIAS_PREPROCESADO[secuencia_combo.currentText()]
+            return SecuenciaMorfologica([(op, 'elipse', tamano) for op in operaciones])
+        
+        def actualizar_plan():
+            activo = morfo_checkbox.isChecked()
+            secuencia_combo.setEnabled(activo)
+            kernel_spinbox.setEnabled(activo)
+            plan_label.setText(obtener_secuencia().describir() if activo else "Sin preprocesamiento")
+        
+        # Reconstrucción morfológica previa al etiquetado
+        rellenar_checkbox = QCheckBox("Rellenar huecos de los objetos")
+        rellenar_checkbox.setStyleSheet(f"color: {COLOR_TEXT_PRIMARY}; font-weight: bold;")
+        dialogo.layout_principal.addWidget(rellenar_checkbox)
+        
+        borde_checkbox = QCheckBox("Eliminar objetos que tocan el borde")
+        borde_checkbox.setStyleSheet(f"color: {COLOR_TEXT_PRIMARY}; font-weight: bold;")
+        dialogo.layout_principal.addWidget(borde_checkbox)
+        
+        separar_checkbox = QCheckBox("Separar objetos que se tocan (watershed)")
+        separar_checkbox.setStyleSheet(f"color: {COLOR_TEXT_PRIMARY}; font-weight: bold;")
+        dialogo.layout_principal.addWidget(separar_checkbox)
+        
+        morfo_checkbox.toggled.connect(actualizar_plan)
+        secuencia_combo.currentIndexChanged.connect(actualizar_plan)
+        kernel_spinbox.valueChanged.connect(actualizar_plan)
+        actualizar_plan()
+        
         # Filtrado por área mínima
         area_layout = QHBoxLayout()
         area_label = QLabel("Área mínima (píxeles):")
@@ -106,6 +198,8 @@ class SeccionComponentes(SeccionBase):
             " IMPORTANTE:\n"
             "• La imagen se invertirá para detectar objetos oscuros\n"
             "• El preprocesamiento morfológico elimina ruido pequeño\n"
+            "• Rellenar huecos y eliminar borde usan reconstrucción morfológica\n"
+            "• Separar objetos corta con watershed sobre la distancia\n"
             "• El filtro de área elimina componentes muy pequeñas\n"
             "• Conectividad 4: solo vecinos laterales\n"
             "• Conectividad 8: incluye diagonales (recomendado)"
@@ -135,6 +229,7 @@ class SeccionComponentes(SeccionBase):
                 # Si es color, convertir a grises
                 if len(img.shape) == 3:
                     img = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+                gris = img.copy()
                 
                 # Asegurar que sea binaria (0 o 255)
                 if img.max() > 1 or img.dtype != np.uint8:
@@ -147,9 +242,14 @@ class SeccionComponentes(SeccionBase):
                 # INVERTIR la imagen para que objetos oscuros sean detectados como componentes
                 img = cv2.bitwise_not(img)
                 
-                # Aplicar preprocesamiento si está activado
-                if morfo_checkbox.isChecked():
-                    img = preprocesar_imagen(img, usar_morfo=True, kernel_size=3)
+                # Aplicar preprocesamiento y reconstrucción si están activados
+                opciones = (morfo_checkbox, rellenar_checkbox, borde_checkbox, separar_checkbox)
+                if any(opcion.isChecked() for opcion in opciones):
+                    img = preprocesar_imagen(img, usar_morfo=morfo_checkbox.isChecked(),
+                                             secuencia=obtener_secuencia(),
+                                             rellenar=rellenar_checkbox.isChecked(),
+                                             limpiar_borde=borde_checkbox.isChecked(),
+                                             separar=separar_checkbox.isChecked())
                 
                 # Etiquetar componentes con estadísticas
                 num_labels, labels, stats, centroids = etiquetar_componentes(img, conectividad)
@@ -162,17 +262,21 @@ class SeccionComponentes(SeccionBase):
                 else:
                     eliminadas = 0
                 
-                # Guardar etiquetas y la imagen binaria original
+                # Guardar etiquetas (con el dtype más pequeño) y la imagen binaria original
+                labels = compactar_etiquetas(labels)
                 self.etiquetas_actuales = labels
                 self.imagen_binaria_original = img
+                self.imagen_gris_actual = gris
+                self.conectividad_actual = conectividad
+                self._activar_inspeccion()
                 
-                # Obtener estadísticas detalladas
-                estadisticas = obtener_estadisticas_componentes(labels)
+                # La tabla de estadísticas se calcula al abrirla
+                self.tabla_actual = None
                 
                 # Mostrar resultado coloreado automáticamente
                 resultado = colorear_etiquetas(labels)
                 
-                self.ventana_principal.imagen_actual = resultado
+                self.ventana_principal.imagen_actual = self.imagen_inspeccion = resultado
                 self.ventana_principal._mostrar_imagen(self.ventana_principal.label_imagen_principal, 
                                                        self.ventana_principal.imagen_actual)
                 
@@ -183,29 +287,6 @@ class SeccionComponentes(SeccionBase):
                     f"Conectividad: {conectividad} | Filtradas: {eliminadas} | Coloreado automático"
                 )
                 
-                # Mostrar información adicional en consola
-                print(f"\n{'='*70}")
-                print(f"ANÁLISIS DE COMPONENTES CONEXAS")
-                print(f"{'='*70}")
-                print(f"Conectividad: {conectividad}")
-                print(f"Preprocesamiento morfológico: {'Sí' if morfo_checkbox.isChecked() else 'No'}")
-                print(f"Área mínima: {area_minima} px")
-                print(f"Componentes detectadas: {num_componentes}")
-                print(f"Componentes filtradas: {eliminadas}")
-                print(f"Dimensiones: {img.shape}")
-                print(f"\n{'='*70}")
-                print(f"ESTADÍSTICAS POR COMPONENTE:")
-                print(f"{'='*70}")
-                for stat in estadisticas:
-                    print(f"Componente {stat['etiqueta']}:")
-                    print(f"  Área: {stat['area']} px")
-                    print(f"  Perímetro: {stat['perimetro']:.2f} px")
-                    print(f"  Centroide: {stat['centroide']}")
-                    print(f"  Aspect Ratio: {stat['aspect_ratio']:.2f}")
-                    print(f"  Circularidad: {stat['circularidad']:.2f}")
-                    print(f"  BBox: {stat['bbox']}")
-                print(f"{'='*70}\n")
-                
                 dialogo.accept()
             except Exception as e:
                 QMessageBox.critical(dialogo, "Error", f"Error al etiquetar:\n{str(e)}\n\nAsegúrate de que la imagen esté en formato correcto.")
@@ -223,7 +304,7 @@ class SeccionComponentes(SeccionBase):
         try:
             resultado = colorear_etiquetas(self.etiquetas_actuales)
             
-            self.ventana_principal.imagen_actual = resultado
+            self.ventana_principal.imagen_actual = self.imagen_inspeccion = resultado
             self.ventana_principal._mostrar_imagen(self.ventana_principal.label_imagen_principal, 
                                                    self.ventana_principal.imagen_actual)
             
@@ -232,3 +313,277 @@ class SeccionComponentes(SeccionBase):
                 f" Componentes coloreadas con paleta aleatoria | Total: {num_componentes} componente(s)")
         except Exception as e:
             QMessageBox.critical(self.ventana_principal, "Error", f"Error al colorear:\n{str(e)}")
+    
+    def mostrar_tabla_componentes(self):
+        """Muestra las estadísticas de las componentes en una tabla ordenable"""
+        if self.etiquetas_actuales is None:
+            QMessageBox.warning(self.ventana_principal, "Advertencia", 
+                               "Primero etiqueta las componentes usando el botón 'Etiquetar'.")
+            return
+        
+        try:
+            if self.tabla_actual is None:
+                self.tabla_actual = tabla_componentes(self.etiquetas_actuales)
+            
+            dialogo = DialogoTablaComponentes(self.ventana_principal, self.tabla_actual)
+            dialogo.exec()
+        except Exception as e:
+            QMessageBox.critical(self.ventana_principal, "Error", f"Error al calcular estadísticas:\n{str(e)}")
+    
+    def _activar_inspeccion(self):
+        """Invalida el índice espacial y activa la inspección con el ratón sobre la imagen principal"""
+        self.indice_actual = None
+        # Hasta que las nuevas etiquetas se muestren como imagen actual
+        self.imagen_inspeccion = None
+        if self.etiqueta_imagen is None:
+            self.etiqueta_imagen = self.ventana_principal.label_imagen_principal.findChild(QLabel, "imagen_contenedor")
+            self.etiqueta_imagen.setMouseTracking(True)
+            self.etiqueta_imagen.installEventFilter(self)
+    
+    def _obtener_indice(self):
+        """Índice espacial de las etiquetas actuales (se construye una vez por etiquetado)"""
+        if self.indice_actual is None:
+            rle = ComponentesRLE.desde_etiquetas(self.etiquetas_actuales)
+            self.cajas_actuales = rle.cajas()
+            self.areas_actuales = rle.areas()
+            self.indice_actual = IndiceEspacial.desde_estadisticas(self.cajas_actuales)
+        return self.indice_actual
+    
+    def _pixel_bajo_cursor(self, pos):
+        """Convierte una posición sobre la imagen mostrada en coordenadas (x, y) de las etiquetas"""
+        imagen = self.ventana_principal.imagen_actual
+        pixmap = self.etiqueta_imagen.pixmap()
+        # Cualquier otra imagen (filtro, archivo nuevo, restauración) desactiva la inspección
+        if (self.etiquetas_actuales is None or imagen is None or imagen is not self.imagen_inspeccion
+                or pixmap is None or pixmap.isNull()):
+            return None
+        
+        # La imagen escalada está centrada dentro del área de contenido
+        alto, ancho = self.etiquetas_actuales.shape
+        area = self.etiqueta_imagen.contentsRect()
+        x0 = area.x() + (area.width() - pixmap.width()) / 2
+        y0 = area.y() + (area.height() - pixmap.height()) / 2
+        x = int((pos.x() - x0) * ancho / pixmap.width())
+        y = int((pos.y() - y0) * alto / pixmap.height())
+        if 0 <= x < ancho and 0 <= y < alto:
+            return x, y
+        return None
+    
+    def eventFilter(self, objeto, evento):
+        """Tooltip con la componente bajo el cursor y selección con clic"""
+        if objeto is self.etiqueta_imagen and evento.type() in (QEvent.Type.MouseMove,
+                                                                  QEvent.Type.MouseButtonPress):
+            pixel = self._pixel_bajo_cursor(evento.position())
+            if pixel is not None:
+                if evento.type() == QEvent.Type.MouseMove:
+                    self._mostrar_tooltip(pixel, evento.globalPosition().toPoint())
+                elif evento.button() == Qt.MouseButton.LeftButton:
+                    self.seleccionar_componente(*pixel)
+            else:
+                QToolTip.hideText()
+        return super().eventFilter(objeto, evento)
+    
+    def _mostrar_tooltip(self, pixel, posicion_global):
+        """Muestra área y caja de la componente bajo el cursor"""
+        x, y = pixel
+        etiqueta = int(self.etiquetas_actuales[y, x])
+        indice = self._obtener_indice()
+        if etiqueta == 0:
+            # En el fondo se indican las cajas que contienen el punto
+            cajas = indice.en_punto(x, y)
+            texto = f"Fondo ({x}, {y})"
+            if cajas.size:
+                texto += "\nDentro de la caja de: " + ", ".join(str(c) for c in cajas[:10])
+        else:
+            bx, by, bw, bh = self.cajas_actuales[etiqueta]
+            texto = (f"Componente {etiqueta}\nÁrea: {self.areas_actuales[etiqueta]} px\n"
+                     f"Caja: ({bx}, {by}) {bw}x{bh}")
+        QToolTip.showText(posicion_global, texto, self.etiqueta_imagen)
+    
+    def seleccionar_componente(self, x, y):
+        """Resalta la componente en (x, y) y las cercanas a su caja envolvente"""
+        etiqueta = int(self.etiquetas_actuales[y, x])
+        resultado = colorear_etiquetas(self.etiquetas_actuales)
+        if etiqueta == 0:
+            self.ventana_principal._mostrar_imagen(self.ventana_principal.label_imagen_principal, resultado)
+            return
+        
+        indice = self._obtener_indice()
+        vecinos = indice.vecinos(etiqueta, DISTANCIA_VECINOS_DEFAULT)
+        for vecino in vecinos:
+            bx, by, bw, bh = (int(v) for v in self.cajas_actuales[vecino])
+            cv2.rectangle(resultado, (bx, by), (bx + bw - 1, by + bh - 1), (200, 200, 200), 1)
+        bx, by, bw, bh = (int(v) for v in self.cajas_actuales[etiqueta])
+        cv2.rectangle(resultado, (bx, by), (bx + bw - 1, by + bh - 1), (0, 255, 255), 2)
+        
+        self.ventana_principal._mostrar_imagen(self.ventana_principal.label_imagen_principal, resultado)
+        self.ventana_principal.info_label.setText(
+            f" Componente {etiqueta} | Área: {self.areas_actuales[etiqueta]} px | "
+            f"{vecinos.size} vecina(s) a menos de {DISTANCIA_VECINOS_DEFAULT} px"
+        )
+    
+    def mostrar_descriptores(self):
+        """Muestra los descriptores de forma e intensidad de cada componente"""
+        if self.etiquetas_actuales is None:
+            QMessageBox.warning(self.ventana_principal, "Advertencia", 
+                               "Primero etiqueta las componentes usando el botón 'Etiquetar'.")
+            return
+        
+        try:
+            descriptores = descriptores_componentes(self.etiquetas_actuales, self.imagen_gris_actual,
+                                                    self.conectividad_actual)
+            dialogo = DialogoTablaComponentes(self.ventana_principal, descriptores, "Descriptores de Componentes")
+            dialogo.exec()
+        except Exception as e:
+            QMessageBox.critical(self.ventana_principal, "Error", f"Error al calcular descriptores:\n{str(e)}")
+    
+    def mostrar_dialogo_umbral_interactivo(self):
+        """Muestra diálogo para explorar las componentes en función del umbral"""
+        if self.ventana_principal.imagen_actual is None:
+            QMessageBox.warning(self.ventana_principal, "Advertencia", "Primero carga una imagen.")
+            return
+        
+        img = self.ventana_principal.imagen_actual
+        if len(img.shape) == 3:
+            img = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+        
+        dialogo = DialogoBase(self.ventana_principal, "Umbral Interactivo", 450)
+        
+        # El árbol se construye una vez por orientación y se reutiliza en cada umbral
+        arboles = {}
+        
+        invertir_checkbox = QCheckBox("Invertir (detectar objetos oscuros)")
+        invertir_checkbox.setChecked(True)
+        invertir_checkbox.setStyleSheet(f"color: {COLOR_TEXT_PRIMARY}; font-weight: bold;")
+        dialogo.layout_principal.addWidget(invertir_checkbox)
+        
+        conectividad_checkbox = QCheckBox("Conectividad 8 (incluye diagonales)")
+        conectividad_checkbox.setChecked(True)
+        conectividad_checkbox.setStyleSheet(f"color: {COLOR_TEXT_PRIMARY}; font-weight: bold;")
+        dialogo.layout_principal.addWidget(conectividad_checkbox)
+        
+        umbral_layout = QHBoxLayout()
+        umbral_label = QLabel("Umbral: 127")
+        umbral_label.setStyleSheet(f"color: {COLOR_TEXT_PRIMARY}; font-weight: bold;")
+        umbral_label.setMinimumWidth(90)
+        
+        umbral_slider = QSlider(Qt.Orientation.Horizontal)
+        umbral_slider.setRange(0, 255)
+        umbral_slider.setValue(127)
+        
+        umbral_layout.addWidget(umbral_label)
+        umbral_layout.addWidget(umbral_slider, 1)
+        dialogo.layout_principal.addLayout(umbral_layout)
+        
+        # Filtros por atributos evaluados sobre los nodos del árbol
+        estilo_spin = f"""
+            QSpinBox, QDoubleSpinBox {{
+                background: {COLOR_CARD};
+                color: {COLOR_TEXT_PRIMARY};
+                border: 2px solid {COLOR_BORDER};
+                border-radius: 6px;
+                padding: 6px;
+            }}
+        """
+        area_layout = QHBoxLayout()
+        area_label = QLabel("Área mínima (píxeles):")
+        area_label.setStyleSheet(f"color: {COLOR_TEXT_PRIMARY}; font-weight: bold;")
+        area_spinbox = QSpinBox()
+        area_spinbox.setRange(0, 1000000)
+        area_spinbox.setValue(0)
+        area_spinbox.setStyleSheet(estilo_spin)
+        area_layout.addWidget(area_label)
+        area_layout.addWidget(area_spinbox, 1)
+        dialogo.layout_principal.addLayout(area_layout)
+        
+        circularidad_layout = QHBoxLayout()
+        circularidad_label = QLabel("Circularidad mínima:")
+        circularidad_label.setStyleSheet(f"color: {COLOR_TEXT_PRIMARY}; font-weight: bold;")
+        circularidad_spinbox = QDoubleSpinBox()
+        circularidad_spinbox.setRange(0.0, 1.0)
+        circularidad_spinbox.setSingleStep(0.05)
+        circularidad_spinbox.setValue(0.0)
+        circularidad_spinbox.setStyleSheet(estilo_spin)
+        circularidad_layout.addWidget(circularidad_label)
+        circularidad_layout.addWidget(circularidad_spinbox, 1)
+        dialogo.layout_principal.addLayout(circularidad_layout)
+        
+        conteo_label = QLabel("")
+        conteo_label.setStyleSheet(f"""
+            QLabel {{
+                color: {COLOR_TEXT_PRIMARY}; 
+                font-size: 12px; 
+                padding: 12px;
+                background: {COLOR_CARD};
+                border: 1px solid {COLOR_ADVERTENCIA};
+                border-radius: 6px;
+            }}
+        """)
+        dialogo.layout_principal.addWidget(conteo_label)
+        
+        def obtener_arbol():
+            clave = (invertir_checkbox.isChecked(), conectividad_checkbox.isChecked())
+            if clave not in arboles:
+                base = cv2.bitwise_not(img) if clave[0] else img
+                arboles[clave] = ArbolComponentes(base, 8 if clave[1] else 4)
+            return arboles[clave]
+        
+        def obtener_validos(arbol):
+            if area_spinbox.value() == 0 and circularidad_spinbox.value() == 0:
+                return None
+            return arbol.nodos_validos(area_minima=area_spinbox.value(),
+                                       circularidad_minima=circularidad_spinbox.value())
+        
+        def actualizar_conteo():
+            umbral = umbral_slider.value()
+            umbral_label.setText(f"Umbral: {umbral}")
+            try:
+                arbol = obtener_arbol()
+                conteo_label.setText(f"Componentes: {arbol.numero_componentes(umbral, obtener_validos(arbol))}")
+            except Exception as e:
+                conteo_label.setText(f"Error: {str(e)}")
+        
+        def mostrar_etiquetas():
+            try:
+                arbol = obtener_arbol()
+                umbral = umbral_slider.value()
+                num_labels, labels, tabla = arbol.componentes(umbral, obtener_validos(arbol))
+                
+                self.etiquetas_actuales = labels = compactar_etiquetas(labels)
+                self.imagen_binaria_original = (labels > 0).astype(np.uint8) * 255
+                self.tabla_actual = tabla
+                self.imagen_gris_actual = img
+                self.conectividad_actual = arbol.conectividad
+                self._activar_inspeccion()
+                
+                self.ventana_principal._mostrar_imagen(self.ventana_principal.label_imagen_principal,
+                                                       colorear_etiquetas(labels))
+                self.ventana_principal.info_label.setText(
+                    f" Umbral interactivo: {umbral} | {num_labels - 1} componente(s) | "
+                    f"Conectividad: {arbol.conectividad}"
+                )
+            except Exception as e:
+                QMessageBox.critical(dialogo, "Error", f"Error al etiquetar:\n{str(e)}")
+        
+        def aplicar():
+            mostrar_etiquetas()
+            self.ventana_principal.imagen_actual = self.imagen_inspeccion = colorear_etiquetas(
+                self.etiquetas_actuales)
+            dialogo.accept()
+        
+        def restaurar():
+            self.ventana_principal._mostrar_imagen(self.ventana_principal.label_imagen_principal,
+                                                   self.ventana_principal.imagen_actual)
+        
+        # El conteo es inmediato; la vista previa se actualiza al soltar el control
+        umbral_slider.valueChanged.connect(actualizar_conteo)
+        umbral_slider.sliderReleased.connect(mostrar_etiquetas)
+        invertir_checkbox.toggled.connect(actualizar_conteo)
+        conectividad_checkbox.toggled.connect(actualizar_conteo)
+        area_spinbox.valueChanged.connect(actualizar_conteo)
+        circularidad_spinbox.valueChanged.connect(actualizar_conteo)
+        dialogo.rejected.connect(restaurar)
+        
+        actualizar_conteo()
+        dialogo.agregar_botones(aplicar)
+        dialogo.exec()
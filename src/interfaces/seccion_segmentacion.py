@@ -2,14 +2,20 @@
 Sección de técnicas de segmentación.
 """
 
-from PySide6.QtWidgets import QLabel, QHBoxLayout, QSpinBox, QMessageBox
+from PySide6.QtWidgets import QLabel, QHBoxLayout, QSpinBox, QMessageBox, QComboBox, QCheckBox
 import cv2
 from src.interfaces.seccion_base import SeccionBase
 from src.interfaces.dialogos_base import DialogoBase
-from src.config import COLOR_PELIGRO, COLOR_TEXT_PRIMARY, COLOR_CARD, COLOR_BORDER
+from src.config import (
+    COLOR_PELIGRO, COLOR_TEXT_PRIMARY, COLOR_CARD, COLOR_BORDER,
+    ESPACIOS_SEGMENTACION_COLOR, MAXIMOS_CANALES_COLOR, KMEANS_COLORES_DEFAULT,
+    MEAN_SHIFT_ANCHO_BANDA_DEFAULT
+)
 from src.funciones.funciones_procesamiento import (
     segmentacion_otsu, segmentacion_kapur, segmentacion_minimo_histograma,
-    segmentacion_media, segmentacion_multiples_umbrales, segmentacion_umbral_banda
+    segmentacion_media, segmentacion_multiples_umbrales, segmentacion_umbral_banda,
+    segmentacion_otsu_multinivel, segmentacion_rango_color, cuantizacion_color_kmeans,
+    cuantizacion_color_mean_shift, regiones_clusters, colorear_etiquetas
 )
 
 
@@ -38,6 +44,18 @@ class SeccionSegmentacion(SeccionBase):
         
         self.crear_boton("Umbral Banda", COLOR_PELIGRO, 
                         lambda: self.mostrar_dialogo_segmentacion_banda())
+        
+        self.crear_boton("Otsu Multinivel", COLOR_PELIGRO, 
+                        lambda: self.mostrar_dialogo_otsu_multinivel())
+        
+        self.crear_boton("Rango de Color", COLOR_PELIGRO, 
+                        lambda: self.mostrar_dialogo_rango_color())
+        
+        self.crear_boton("Cuantización K-means", COLOR_PELIGRO, 
+                        lambda: self.mostrar_dialogo_kmeans())
+        
+        self.crear_boton("Mean-shift (Color)", COLOR_PELIGRO, 
+                        lambda: self.mostrar_dialogo_mean_shift())
     
     def aplicar_segmentacion(self, tipo):
         """Aplica técnicas de segmentación"""
@@ -222,3 +240,263 @@ class SeccionSegmentacion(SeccionBase):
         
         dialogo.agregar_botones(aplicar)
         dialogo.exec()
+    
+    def mostrar_dialogo_otsu_multinivel(self):
+        """Muestra diálogo para segmentación por Otsu multinivel"""
+        dialogo = DialogoBase(self.ventana_principal, "Otsu Multinivel", 400)
+        
+        n_layout = QHBoxLayout()
+        n_label = QLabel("Número de umbrales (2-4):")
+        n_label.setStyleSheet(f"color: {COLOR_TEXT_PRIMARY}; font-weight: bold;")
+        
+        n_spin = QSpinBox()
+        n_spin.setRange(2, 4)
+        n_spin.setValue(2)
+        n_spin.setStyleSheet(f"""
+            QSpinBox {{
+                background: {COLOR_CARD};
+                color: {COLOR_TEXT_PRIMARY};
+                border: 2px solid {COLOR_BORDER};
+                border-radius: 6px;
+                padding: 6px;
+            }}
+        """)
+        
+        n_layout.addWidget(n_label)
+        n_layout.addWidget(n_spin, 1)
+        dialogo.layout_principal.addLayout(n_layout)
+        
+        def aplicar():
+            if self.ventana_principal.imagen_actual is None:
+                QMessageBox.warning(dialogo, "Advertencia", "Primero carga una imagen.")
+                return
+            
+            try:
+                resultado, umbrales = segmentacion_otsu_multinivel(self.ventana_principal.imagen_actual,
+                                                                   n_spin.value())
+                
+                if len(resultado.shape) == 2:
+                    resultado = cv2.cvtColor(resultado, cv2.COLOR_GRAY2BGR)
+                
+                self.ventana_principal.imagen_actual = resultado
+                self.ventana_principal._mostrar_imagen(self.ventana_principal.label_imagen_principal, 
+                                                       self.ventana_principal.imagen_actual)
+                self.ventana_principal.info_label.setText(
+                    f"Segmentación Otsu multinivel (umbrales: {', '.join(str(u) for u in umbrales)})")
+                dialogo.accept()
+            except Exception as e:
+                QMessageBox.critical(dialogo, "Error", f"Error:\n{str(e)}")
+        
+        dialogo.agregar_botones(aplicar)
+        dialogo.exec()
+    
+    def _crear_combo_espacio(self, dialogo):
+        """Agrega al diálogo el selector de espacio de color y lo retorna."""
+        espacio_layout = QHBoxLayout()
+        espacio_label = QLabel("Espacio de color:")
+        espacio_label.setStyleSheet(f"color: {COLOR_TEXT_PRIMARY}; font-weight: bold;")
+        
+        espacio_combo = QComboBox()
+        espacio_combo.addItems(list(ESPACIOS_SEGMENTACION_COLOR))
+        espacio_combo.setStyleSheet(f"""
+            QComboBox {{
+                background: {COLOR_CARD};
+                color: {COLOR_TEXT_PRIMARY};
+                border: 2px solid {COLOR_BORDER};
+                border-radius: 6px;
+                padding: 6px;
+            }}
+        """)
+        
+        espacio_layout.addWidget(espacio_label)
+        espacio_layout.addWidget(espacio_combo, 1)
+        dialogo.layout_principal.addLayout(espacio_layout)
+        return espacio_combo
+    
+    def mostrar_dialogo_rango_color(self):
+        """Muestra diálogo para segmentación por rango de color"""
+        dialogo = DialogoBase(self.ventana_principal, "Segmentación por Rango de Color", 450)
+        espacio_combo = self._crear_combo_espacio(dialogo)
+        
+        # Mínimo y máximo de cada canal
+        spins = []
+        for canal in range(3):
+            canal_layout = QHBoxLayout()
+            canal_label = QLabel()
+            canal_label.setStyleSheet(f"color: {COLOR_TEXT_PRIMARY}; font-weight: bold;")
+            canal_layout.addWidget(canal_label)
+            
+            par = []
+            for prefijo in ("Mín: ", "Máx: "):
+                spin = QSpinBox()
+                spin.setPrefix(prefijo)
+                spin.setStyleSheet(f"""
+                    QSpinBox {{
+                        background: {COLOR_CARD};
+                        color: {COLOR_TEXT_PRIMARY};
+                        border: 2px solid {COLOR_BORDER};
+                        border-radius: 6px;
+                        padding: 6px;
+                    }}
+                """)
+                canal_layout.addWidget(spin, 1)
+                par.append(spin)
+            spins.append((canal_label, *par))
+            dialogo.layout_principal.addLayout(canal_layout)
+        
+        nota_label = QLabel("En HSV, un tono mínimo mayor que el máximo da la vuelta (rojos: 170 a 10)")
+        nota_label.setWordWrap(True)
+        nota_label.setStyleSheet(f"color: {COLOR_TEXT_PRIMARY}; font-size: 9px;")
+        dialogo.layout_principal.addWidget(nota_label)
+        
+        def actualizar_canales():
+            espacio = ESPACIOS_SEGMENTACION_COLOR[espacio_combo.currentText()]
+            for nombre, maximo, (label, spin_min, spin_max) in zip(espacio.upper(), MAXIMOS_CANALES_COLOR[espacio], spins):
+                label.setText(f"{nombre}:")
+                spin_min.setRange(0, maximo)
+                spin_max.setRange(0, maximo)
+                spin_min.setValue(0)
+                spin_max.setValue(maximo)
+        
+        espacio_combo.currentTextChanged.connect(actualizar_canales)
+        actualizar_canales()
+        
+        def aplicar():
+            if self.ventana_principal.imagen_actual is None:
+                QMessageBox.warning(dialogo, "Advertencia", "Primero carga una imagen.")
+                return
+            
+            try:
+                espacio = ESPACIOS_SEGMENTACION_COLOR[espacio_combo.currentText()]
+                inferior = [spin_min.value() for _, spin_min, _ in spins]
+                superior = [spin_max.value() for _, _, spin_max in spins]
+                resultado = segmentacion_rango_color(self.ventana_principal.imagen_actual,
+                                                     inferior, superior, espacio)
+                
+                if len(resultado.shape) == 2:
+                    resultado = cv2.cvtColor(resultado, cv2.COLOR_GRAY2BGR)
+                
+                self.ventana_principal.imagen_actual = resultado
+                self.ventana_principal._mostrar_imagen(self.ventana_principal.label_imagen_principal, 
+                                                       self.ventana_principal.imagen_actual)
+                self.ventana_principal.info_label.setText(
+                    f"Segmentación por rango de color ({espacio_combo.currentText()}: {inferior} - {superior})")
+                dialogo.accept()
+            except Exception as e:
+                QMessageBox.critical(dialogo, "Error", f"Error:\n{str(e)}")
+        
+        dialogo.agregar_botones(aplicar)
+        dialogo.exec()
+    
+    def mostrar_dialogo_kmeans(self):
+        """Muestra diálogo para cuantización de color por k-means"""
+        dialogo = DialogoBase(self.ventana_principal, "Cuantización K-means", 400)
+        espacio_combo = self._crear_combo_espacio(dialogo)
+        espacio_combo.setCurrentText("Lab")
+        
+        k_layout = QHBoxLayout()
+        k_label = QLabel("Número de colores (2-32):")
+        k_label.setStyleSheet(f"color: {COLOR_TEXT_PRIMARY}; font-weight: bold;")
+        
+        k_spin = QSpinBox()
+        k_spin.setRange(2, 32)
+        k_spin.setValue(KMEANS_COLORES_DEFAULT)
+        k_spin.setStyleSheet(f"""
+            QSpinBox {{
+                background: {COLOR_CARD};
+                color: {COLOR_TEXT_PRIMARY};
+                border: 2px solid {COLOR_BORDER};
+                border-radius: 6px;
+                padding: 6px;
+            }}
+        """)
+        
+        k_layout.addWidget(k_label)
+        k_layout.addWidget(k_spin, 1)
+        dialogo.layout_principal.addLayout(k_layout)
+        regiones_checkbox = self._crear_checkbox_regiones(dialogo)
+        
+        def aplicar():
+            if self.ventana_principal.imagen_actual is None:
+                QMessageBox.warning(dialogo, "Advertencia", "Primero carga una imagen.")
+                return
+            
+            try:
+                espacio = ESPACIOS_SEGMENTACION_COLOR[espacio_combo.currentText()]
+                resultado, etiquetas, _ = cuantizacion_color_kmeans(self.ventana_principal.imagen_actual,
+                                                                    k_spin.value(), espacio)
+                self._mostrar_agrupamiento(resultado, etiquetas, regiones_checkbox.isChecked(),
+                                           f"Cuantización k-means ({k_spin.value()} colores, "
+                                           f"{espacio_combo.currentText()})")
+                dialogo.accept()
+            except Exception as e:
+                QMessageBox.critical(dialogo, "Error", f"Error:\n{str(e)}")
+        
+        dialogo.agregar_botones(aplicar)
+        dialogo.exec()
+    
+    def _crear_checkbox_regiones(self, dialogo):
+        """Agrega al diálogo la opción de mostrar las regiones conexas de cada clase."""
+        regiones_checkbox = QCheckBox("Colorear regiones conexas de cada clase")
+        regiones_checkbox.setStyleSheet(f"color: {COLOR_TEXT_PRIMARY}; font-weight: bold;")
+        dialogo.layout_principal.addWidget(regiones_checkbox)
+        return regiones_checkbox
+    
+    def _mostrar_agrupamiento(self, resultado, etiquetas, colorear_regiones, texto):
+        """Muestra la imagen cuantizada o, si se pide, las regiones conexas de cada clase."""
+        if colorear_regiones:
+            num_labels, regiones, _, _, _ = regiones_clusters(etiquetas)
+            resultado = colorear_etiquetas(regiones)
+            texto += f" - {num_labels - 1} regiones"
+        
+        self.ventana_principal.imagen_actual = resultado
+        self.ventana_principal._mostrar_imagen(self.ventana_principal.label_imagen_principal, 
+                                               self.ventana_principal.imagen_actual)
+        self.ventana_principal.info_label.setText(texto)
+    
+    def mostrar_dialogo_mean_shift(self):
+        """Muestra diálogo para segmentación de color por mean-shift"""
+        dialogo = DialogoBase(self.ventana_principal, "Mean-shift (Color)", 400)
+        espacio_combo = self._crear_combo_espacio(dialogo)
+        espacio_combo.setCurrentText("Lab")
+        
+        banda_layout = QHBoxLayout()
+        banda_label = QLabel("Ancho de banda (4-128):")
+        banda_label.setStyleSheet(f"color: {COLOR_TEXT_PRIMARY}; font-weight: bold;")
+        
+        banda_spin = QSpinBox()
+        banda_spin.setRange(4, 128)
+        banda_spin.setValue(MEAN_SHIFT_ANCHO_BANDA_DEFAULT)
+        banda_spin.setStyleSheet(f"""
+            QSpinBox {{
+                background: {COLOR_CARD};
+                color: {COLOR_TEXT_PRIMARY};
+                border: 2px solid {COLOR_BORDER};
+                border-radius: 6px;
+                padding: 6px;
+            }}
+        """)
+        
+        banda_layout.addWidget(banda_label)
+        banda_layout.addWidget(banda_spin, 1)
+        dialogo.layout_principal.addLayout(banda_layout)
+        regiones_checkbox = self._crear_checkbox_regiones(dialogo)
+        
+        def aplicar():
+            if self.ventana_principal.imagen_actual is None:
+                QMessageBox.warning(dialogo, "Advertencia", "Primero carga una imagen.")
+                return
+            
+            try:
+                espacio = ESPACIOS_SEGMENTACION_COLOR[espacio_combo.currentText()]
+                resultado, etiquetas, modos = cuantizacion_color_mean_shift(self.ventana_principal.imagen_actual,
+                                                                            banda_spin.value(), espacio)
+                self._mostrar_agrupamiento(resultado, etiquetas, regiones_checkbox.isChecked(),
+                                           f"Mean-shift ({len(modos)} modos, ancho de banda "
+                                           f"{banda_spin.value()}, {espacio_combo.currentText()})")
+                dialogo.accept()
+            except Exception as e:
+                QMessageBox.critical(dialogo, "Error", f"Error:\n{str(e)}")
+        
+        dialogo.agregar_botones(aplicar)
+        dialogo.exec()
@@ -2,14 +2,15 @@
 Sección de umbralización.
 """
 
-from PySide6.QtWidgets import QLabel, QHBoxLayout, QSpinBox, QComboBox, QMessageBox
+from PySide6.QtWidgets import QLabel, QHBoxLayout, QSpinBox, QDoubleSpinBox, QComboBox, QMessageBox, QPushButton
 from src.interfaces.seccion_base import SeccionBase
 from src.interfaces.dialogos_base import DialogoBase
 from src.config import (
     COLOR_TERCIARIO, COLOR_TEXT_PRIMARY, COLOR_CARD, COLOR_BORDER,
-    UMBRAL_DEFAULT
+    UMBRAL_DEFAULT, METODOS_UMBRAL_ADAPTATIVO
 )
-from src.funciones.funciones_procesamiento import umbral_fijo, umbral_adaptativo
+from src.funciones.funciones_procesamiento import umbral_fijo, umbral_adaptativo, BarridoUmbral
+from src.funciones.umbral_local import K_POR_METODO
 
 
 class SeccionUmbral(SeccionBase):
@@ -51,19 +52,109 @@ class SeccionUmbral(SeccionBase):
                 }}
             """)
             
+            btn_otsu = QPushButton("Otsu")
+            btn_otsu.setStyleSheet(f"""
+                QPushButton {{
+                    background: {COLOR_TERCIARIO};
+                    color: white;
+                }}
+            """)
+            
             umbral_layout.addWidget(umbral_label)
             umbral_layout.addWidget(umbral_spin, 1)
+            umbral_layout.addWidget(btn_otsu)
             dialogo.layout_principal.addLayout(umbral_layout)
             
+            estadisticas_label = QLabel("")
+            estadisticas_label.setStyleSheet(f"""
+                QLabel {{
+                    color: {COLOR_TEXT_PRIMARY};
+                    font-size: 12px;
+                    padding: 12px;
+                    background: {COLOR_CARD};
+                    border: 1px solid {COLOR_TERCIARIO};
+                    border-radius: 6px;
+                }}
+            """)
+            dialogo.layout_principal.addWidget(estadisticas_label)
+            
+            # Un barrido por imagen: cambiar el umbral solo aplica una LUT sobre la imagen reducida
+            barridos = {}
+            mostrada = {}
+            
+            def obtener_barrido():
+                imagen, label = dialogo.obtener_imagen_seleccionada()
+                if imagen is None:
+                    return None, None, None
+                if id(imagen) not in barridos:
+                    barridos[id(imagen)] = BarridoUmbral(imagen)
+                return barridos[id(imagen)], imagen, label
+            
+            def restaurar():
+                if mostrada:
+                    self.ventana_principal._mostrar_imagen(mostrada['label'], mostrada['imagen'])
+                    mostrada.clear()
+            
+            def actualizar_vista_previa():
+                barrido, imagen, label = obtener_barrido()
+                if barrido is None:
+                    return
+                if mostrada and mostrada['label'] is not label:
+                    restaurar()
+                mostrada.update(label=label, imagen=imagen)
+                
+                umbral = umbral_spin.value()
+                self.ventana_principal._mostrar_imagen(label, barrido.vista_previa(umbral))
+                estadisticas_label.setText(
+                    f"Primer plano: {100 * barrido.fraccion_primer_plano()[umbral]:.1f}% | "
+                    f"Separabilidad: {barrido.separabilidad()[umbral]:.3f}\n"
+                    f"Componentes ≈ {barrido.componentes()[umbral]} | Otsu: {barrido.umbral_otsu()}"
+                )
+            
+            def usar_otsu():
+                barrido, _, _ = obtener_barrido()
+                if barrido is not None:
+                    umbral_spin.setValue(barrido.umbral_otsu())
+            
+            umbral_spin.valueChanged.connect(actualizar_vista_previa)
+            btn_otsu.clicked.connect(usar_otsu)
+            for radio in (dialogo.radio_img1, dialogo.radio_img2, dialogo.radio_resultado):
+                radio.toggled.connect(lambda activo: activo and actualizar_vista_previa())
+            dialogo.rejected.connect(restaurar)
+            if self.ventana_principal.imagen_actual is not None:
+                actualizar_vista_previa()
+            
             params = {'umbral': umbral_spin}
             
         else:  # adaptativo
+            metodo_layout = QHBoxLayout()
+            metodo_label = QLabel("Método:")
+            metodo_label.setStyleSheet(f"color: {COLOR_TEXT_PRIMARY}; font-weight: bold;")
+            
+            metodo_combo = QComboBox()
+            metodo_combo.addItems(list(METODOS_UMBRAL_ADAPTATIVO))
+            metodo_combo.setStyleSheet(f"""
+                QComboBox {{
+                    background: {COLOR_CARD};
+                    color: {COLOR_TEXT_PRIMARY};
+                    border: 2px solid {COLOR_BORDER};
+                    border-radius: 6px;
+                    padding: 6px;
+                }}
+            """)
+            
+            metodo_layout.addWidget(metodo_label)
+            metodo_layout.addWidget(metodo_combo, 1)
+            dialogo.layout_principal.addLayout(metodo_layout)
+            
             block_layout = QHBoxLayout()
             block_label = QLabel("Tamaño bloque (impar):")
             block_label.setStyleSheet(f"color: {COLOR_TEXT_PRIMARY}; font-weight: bold;")
             
             block_combo = QComboBox()
-            block_combo.addItems(['3', '5', '7', '9', '11', '13', '15', '17', '19', '21'])
+            # Con imágenes integrales el costo no depende del tamaño de bloque
+            block_combo.addItems(['3', '5', '7', '9', '11', '13', '15', '17', '19', '21',
+                                  '31', '51', '101', '201'])
             block_combo.setCurrentText('11')
             block_combo.setStyleSheet(f"""
                 QComboBox {{
@@ -100,7 +191,40 @@ class SeccionUmbral(SeccionBase):
             c_layout.addWidget(c_spin, 1)
             dialogo.layout_principal.addLayout(c_layout)
             
-            params = {'block_size': block_combo, 'C': c_spin}
+            k_layout = QHBoxLayout()
+            k_label = QLabel("Sensibilidad k:")
+            k_label.setStyleSheet(f"color: {COLOR_TEXT_PRIMARY}; font-weight: bold;")
+            
+            k_spin = QDoubleSpinBox()
+            k_spin.setRange(-2.0, 2.0)
+            k_spin.setSingleStep(0.05)
+            k_spin.setStyleSheet(f"""
+                QDoubleSpinBox {{
+                    background: {COLOR_CARD};
+                    color: {COLOR_TEXT_PRIMARY};
+                    border: 2px solid {COLOR_BORDER};
+                    border-radius: 6px;
+                    padding: 6px;
+                }}
+            """)
+            
+            k_layout.addWidget(k_label)
+            k_layout.addWidget(k_spin, 1)
+            dialogo.layout_principal.addLayout(k_layout)
+            
+            def actualizar_metodo():
+                # C aplica a media y gaussiano; k a Sauvola, Niblack y Wolf
+                metodo = METODOS_UMBRAL_ADAPTATIVO[metodo_combo.currentText()]
+                usa_k = metodo in K_POR_METODO
+                c_spin.setEnabled(not usa_k)
+                k_spin.setEnabled(usa_k)
+                if usa_k:
+                    k_spin.setValue(K_POR_METODO[metodo])
+            
+            metodo_combo.currentTextChanged.connect(actualizar_metodo)
+            actualizar_metodo()
+            
+            params = {'metodo': metodo_combo, 'block_size': block_combo, 'C': c_spin, 'k': k_spin}
         
         def aplicar():
             imagen, label = dialogo.obtener_imagen_seleccionada()
@@ -110,13 +234,19 @@ class SeccionUmbral(SeccionBase):
             try:
                 if tipo == 'fijo':
                     umbral_val = params['umbral'].value()
-                    resultado = umbral_fijo(imagen, umbral_val)
+                    barrido = barridos.get(id(imagen))
+                    resultado = barrido.mascara(umbral_val) if barrido else umbral_fijo(imagen, umbral_val)
                     self.ventana_principal.info_label.setText(f"Umbral fijo aplicado (valor: {umbral_val})")
                 else:
+                    nombre = params['metodo'].currentText()
+                    metodo = METODOS_UMBRAL_ADAPTATIVO[nombre]
                     block_size = int(params['block_size'].currentText())
                     C = params['C'].value()
-                    resultado = umbral_adaptativo(imagen, block_size, C)
-                    self.ventana_principal.info_label.setText(f"Umbral adaptativo aplicado (block: {block_size}, C: {C})")
+                    k = params['k'].value()
+                    resultado = umbral_adaptativo(imagen, block_size, C, metodo, k if metodo in K_POR_METODO else None)
+                    detalle = f"k: {k:.2f}" if metodo in K_POR_METODO else f"C: {C}"
+                    self.ventana_principal.info_label.setText(
+                        f"Umbral adaptativo {nombre} aplicado (block: {block_size}, {detalle})")
                 
                 dialogo.actualizar_imagen_seleccionada(resultado)
                 dialogo.accept()
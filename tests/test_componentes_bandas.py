@@ -0,0 +1,63 @@
+"""
+Pruebas de estadisticas_por_bandas contra tabla_componentes sobre la imagen completa.
+
+Se ejecutan desde la raíz del repositorio con: python -m pytest tests
+"""
+
+import cv2
+import numpy as np
+import pytest
+
+from src.funciones.componentes_bandas import estadisticas_por_bandas
+from src.funciones.componentes_conexas import tabla_componentes
+
+
+def _imagenes():
+    """Ruido de varias densidades, regiones suavizadas, anillos anidados y casos extremos."""
+    rng = np.random.default_rng(0)
+    imagenes = {
+        'vacia': np.zeros((20, 17), dtype=np.uint8),
+        'llena': np.ones((21, 16), dtype=np.uint8),
+        'fila': (rng.random((1, 90)) < 0.5).astype(np.uint8),
+    }
+    for densidad in (0.3, 0.5, 0.6):
+        imagenes[f'ruido_{densidad}'] = (rng.random((77, 61)) < densidad).astype(np.uint8)
+    suave = cv2.GaussianBlur(rng.random((150, 130)), (0, 0), 3)
+    imagenes['suave'] = (suave > np.median(suave)).astype(np.uint8)
+    anillos = np.zeros((120, 140), dtype=np.uint8)
+    for k in range(4):
+        cv2.circle(anillos, (40 + 20 * k, 60), 35 - 4 * k, 1, 2)
+    cv2.circle(anillos, (70, 60), 10, 1, -1)
+    cv2.circle(anillos, (70, 60), 4, 0, -1)
+    imagenes['anillos'] = anillos
+    return imagenes
+
+
+IMAGENES = _imagenes()
+
+
+@pytest.mark.parametrize('nombre', sorted(IMAGENES))
+@pytest.mark.parametrize('conectividad', (4, 8))
+@pytest.mark.parametrize('alto_banda', (1, 2, 5, 1024))
+def test_bandas_igual_a_tabla(nombre, conectividad, alto_banda):
+    imagen = IMAGENES[nombre]
+    _, labels = cv2.connectedComponents(imagen, connectivity=conectividad)
+    referencia = tabla_componentes(labels)
+    tabla = estadisticas_por_bandas(imagen, alto_banda, conectividad)
+
+    assert set(tabla) == set(referencia)
+    for columna in ('etiqueta', 'area', 'bbox_x', 'bbox_y', 'bbox_ancho', 'bbox_alto'):
+        np.testing.assert_array_equal(tabla[columna], referencia[columna])
+    for columna in ('centroide_x', 'centroide_y', 'aspect_ratio'):
+        np.testing.assert_allclose(tabla[columna], referencia[columna])
+    # tabla_componentes mide el contorno con puntos float32
+    np.testing.assert_allclose(tabla['perimetro'], referencia['perimetro'], atol=1e-4)
+    np.testing.assert_allclose(tabla['circularidad'], referencia['circularidad'], atol=1e-6)
+
+
+def test_bandas_desde_iterable():
+    imagen = IMAGENES['anillos']
+    _, labels = cv2.connectedComponents(imagen, connectivity=8)
+    referencia = tabla_componentes(labels)
+    tabla = estadisticas_por_bandas(imagen[i:i + 6] for i in range(0, imagen.shape[0], 6))
+    np.testing.assert_allclose(tabla['perimetro'], referencia['perimetro'], atol=1e-4)
@@ -0,0 +1,77 @@
+"""
+Pruebas de etiquetar_componentes_paralelo contra cv2.connectedComponentsWithStats.
+
+Se ejecutan desde la raíz del repositorio con: python -m pytest tests
+"""
+
+import cv2
+import numpy as np
+import pytest
+
+from src.funciones import componentes_conexas
+from src.funciones.componentes_conexas import etiquetar_componentes, etiquetar_componentes_paralelo
+
+
+def _imagenes():
+    """Imágenes de prueba: ruido con varias densidades, alturas impares y casos extremos."""
+    rng = np.random.default_rng(0)
+    imagenes = {
+        'vacia': np.zeros((101, 64), dtype=np.uint8),
+        'llena': np.ones((101, 64), dtype=np.uint8),
+        'fila': (rng.random((1, 200)) < 0.5).astype(np.uint8),
+        'columna': (rng.random((157, 1)) < 0.5).astype(np.uint8),
+    }
+    for alto, densidad in ((97, 0.3), (128, 0.5), (251, 0.6), (300, 0.45)):
+        imagenes[f'ruido_{alto}_{densidad}'] = (rng.random((alto, 173)) < densidad).astype(np.uint8)
+    # Objetos grandes que cruzan muchas costuras
+    objetos = np.zeros((333, 211), dtype=np.uint8)
+    cv2.circle(objetos, (100, 160), 90, 1, -1)
+    cv2.circle(objetos, (100, 160), 40, 0, -1)
+    cv2.line(objetos, (0, 0), (210, 332), 1, 1)
+    cv2.line(objetos, (210, 0), (0, 332), 1, 2)
+    imagenes['objetos'] = objetos
+    return imagenes
+
+
+IMAGENES = _imagenes()
+
+
+@pytest.fixture(autouse=True)
+def franjas_pequenas(monkeypatch):
+    """Franjas de pocas filas para que las imágenes de prueba tengan muchas costuras."""
+    monkeypatch.setattr(componentes_conexas, 'FILAS_MINIMAS_FRANJA', 3)
+
+
+def _comparar(resultado, referencia):
+    num, labels, stats, centroids = resultado
+    num_ref, labels_ref, stats_ref, centroids_ref = referencia
+    assert num == num_ref
+    assert labels.dtype == labels_ref.dtype
+    np.testing.assert_array_equal(labels, labels_ref)
+    np.testing.assert_array_equal(stats, stats_ref)
+    # Igualdad exacta, NaN incluidos (centroide de un fondo vacío)
+    assert centroids.dtype == centroids_ref.dtype
+    assert centroids.tobytes() == centroids_ref.tobytes()
+
+
+@pytest.mark.parametrize('nombre', sorted(IMAGENES))
+@pytest.mark.parametrize('conectividad', (4, 8))
+@pytest.mark.parametrize('trabajadores', (1, 2, 3, 7, 64))
+def test_paralelo_igual_a_opencv(nombre, conectividad, trabajadores):
+    imagen = IMAGENES[nombre]
+    referencia = cv2.connectedComponentsWithStats(imagen, connectivity=conectividad)
+    _comparar(etiquetar_componentes_paralelo(imagen, conectividad, trabajadores), referencia)
+
+
+@pytest.mark.parametrize('conectividad', (4, 8))
+def test_etiquetar_componentes_despacha_al_paralelo(conectividad):
+    imagen = IMAGENES['objetos'] * 255
+    referencia = cv2.connectedComponentsWithStats(imagen, connectivity=conectividad)
+    _comparar(etiquetar_componentes(imagen, conectividad, trabajadores=4), referencia)
+    _comparar(etiquetar_componentes(imagen, conectividad, trabajadores=1), referencia)
+
+
+def test_imagen_booleana():
+    imagen = IMAGENES['ruido_251_0.6'].astype(bool)
+    referencia = cv2.connectedComponentsWithStats(imagen.astype(np.uint8), connectivity=8)
+    _comparar(etiquetar_componentes_paralelo(imagen, 8, 4), referencia)